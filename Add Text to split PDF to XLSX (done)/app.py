@@ -1,30 +1,23 @@
 import os
 import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext, messagebox
-import PyPDF2
-import pandas as pd
-from PIL import Image, ImageTk
+from PIL import ImageTk
 import fitz  # PyMuPDF
-import re
 import json
+from functools import partial
+import app_paths
+app_paths.setup()
+from pdf_core.file_index import DirectoryIndex, DirectoryWatcher, split_parent
+from pdf_core.page_cache import cache_key, shared_cache
+from pdf_core.profiling import profiler, span, timed
+from pdf_core.rendering import fit_zoom, pixmap_to_image, render_pixmap
+from pdf_core.sections import clean_cell, write_xlsx
+from pdf_core.text_extraction import BACKENDS, TextExtractor
+from page_store import PageTextStore
+from session_store import SessionStore
 
 SECTION_BREAK = "<<<SECTION_BREAK>>>"
 
-def clean_text_for_excel(text):
-    # Loại bỏ ký tự điều khiển ngoại trừ \n và \t
-    text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f]', '', text)
-    
-    # Thay thế các ký tự Unicode không hợp lệ bằng '?'
-    text = text.encode('ascii', 'replace').decode('ascii')
-    
-    # Xử lý ký tự '=' ở đầu ô
-    text = re.sub(r'(?m)^=', "'=", text)
-    
-    # Loại bỏ các ký tự không in được
-    text = ''.join(char for char in text if char.isprintable() or char in '\n\t')
-    
-    return text
-
 class PDFManagerApp:
     def __init__(self, master):
         self.master = master
@@ -37,9 +30,18 @@ class PDFManagerApp:
         self.current_page = 0
         self.total_pages = 0
         self.pdf_content = {}
+        self.warm_up_job = None
+        self.session = None
+        self.profile_job = None
+        self.file_index = None
+        self.file_watcher = None
+        self.tree_root = None
+        self.extractor = TextExtractor()
+        self.backend_var = tk.StringVar(value=self.extractor.backend)
         self.quick_edit_mode = tk.BooleanVar()
         self.clean_text_var = tk.BooleanVar()
         self.clean_text_var.set(True)  # Mặc định là làm sạch văn bản
+        self.keep_unicode_var = tk.BooleanVar()
 
         # Create Data directory if it doesn't exist
         self.data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Data")
@@ -47,6 +49,7 @@ class PDFManagerApp:
 
         self.setup_ui()
         self.bind_events()
+        self.poll_file_tree()
 
     def setup_ui(self):
         # Main frame
@@ -92,6 +95,18 @@ class PDFManagerApp:
 
         # Clean Text checkbox
         ttk.Checkbutton(bottom_frame, text="Clean Text", variable=self.clean_text_var).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(bottom_frame, text="Keep Unicode", variable=self.keep_unicode_var).pack(side=tk.LEFT, padx=5)
+
+        # Text extraction backend, used for files opened from now on
+        ttk.Label(bottom_frame, text="Text Backend:").pack(side=tk.LEFT, padx=(15, 0))
+        backend_box = ttk.Combobox(bottom_frame, textvariable=self.backend_var, values=list(BACKENDS),
+                                   state="readonly", width=10)
+        backend_box.pack(side=tk.LEFT, padx=5)
+        backend_box.bind("<<ComboboxSelected>>", self.on_backend_change)
+
+        # Timing overlay: F12 shows or hides it, Shift+F12 saves the recent spans as JSONL
+        self.profile_label = ttk.Label(self.master, anchor=tk.W, font=("Consolas", 9))
+        self.profile_from_env = profiler.enabled
 
     def bind_events(self):
         self.text_editor.bind("<<Modified>>", self.on_text_modified)
@@ -103,6 +118,15 @@ class PDFManagerApp:
         self.pdf_canvas.bind("<Button-1>", self.on_pdf_click)
         self.pdf_canvas.bind("<MouseWheel>", self.on_mouse_wheel)
 
+        self.master.bind_all("<F12>", self.toggle_profiling)
+        self.master.bind_all("<Shift-F12>", self.save_trace)
+        self.master.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_backend_change(self, event):
+        if self.extractor.timings:
+            print(self.extractor.timing_report())
+        self.extractor.backend = self.backend_var.get()
+
     def on_pdf_click(self, event):
         if self.current_pdf:
             self.next_page()
@@ -150,35 +174,44 @@ class PDFManagerApp:
             self.display_pdf(file_path)
 
     def update_file_tree(self, selected_file):
-        self.file_tree.delete(*self.file_tree.get_children())
-        
-        def sort_key(file):
-            match = re.search(r'split_(\d+)_(\d+)', file)
-            if match:
-                return int(match.group(1)), int(match.group(2))
-            return (0, 0)  # For non-split files or files that don't match the pattern
-        
+        # The folder is indexed once and then watched; the tree shows the selected file's
+        # family, the original with its split outputs, in split order
+        if self.file_index is None or self.file_index.root != self.pdf_dir:
+            if self.file_watcher is not None:
+                self.file_watcher.stop()
+            self.file_index = DirectoryIndex(self.pdf_dir, recursive=False)
+            self.file_watcher = DirectoryWatcher(self.file_index)
+        self.file_index.scan()
+
         base_name = os.path.basename(selected_file)
-        base_name_without_ext = os.path.splitext(base_name)[0]
-        
-        files_to_display = [f for f in os.listdir(self.pdf_dir) if f.startswith(base_name_without_ext) and f.endswith('.pdf')]
-        sorted_files = sorted(files_to_display, key=sort_key)
-        
-        for file in sorted_files:
-            file_path = os.path.join(self.pdf_dir, file)
-            if "_split_" in file:
-                parent_file = base_name
-                parent_id = parent_file  # Use the filename as the ID
-                
-                if not self.file_tree.exists(parent_id):
-                    self.file_tree.insert('', 'end', parent_id, text=parent_file, open=True)
-                
-                self.file_tree.insert(parent_id, 'end', file, text=file)
-            else:
-                self.file_tree.insert('', 'end', file, text=file, open=True)
+        self.tree_root = split_parent(base_name) or base_name
+        self.file_tree.delete(*self.file_tree.get_children())
+        with self.file_index.lock:
+            self.file_index.take_changes()  # the tree is rebuilt from the current state below
+            if self.tree_root in self.file_index:
+                self.file_tree.insert('', 'end', self.tree_root, text=self.tree_root, open=True)
+                for file in self.file_index.child_ids(self.tree_root):
+                    self.file_tree.insert(self.tree_root, 'end', file, text=file)
         
         # Select the initially selected file
-        self.file_tree.selection_set(base_name)
+        if self.file_tree.exists(base_name):
+            self.file_tree.selection_set(base_name)
+
+    def poll_file_tree(self):
+        self.apply_file_changes()
+        self.master.after(1000, self.poll_file_tree)
+
+    def apply_file_changes(self):
+        # Files added or removed in the folder by the watcher, limited to the family shown
+        if self.file_index is None:
+            return
+        for change in self.file_index.take_changes():
+            if change[0] == "insert":
+                _, parent, index, file, text = change
+                if parent == self.tree_root or (not parent and file == self.tree_root):
+                    self.file_tree.insert(parent, index if parent else 'end', file, text=text, open=True)
+            elif self.file_tree.exists(change[1]):
+                self.file_tree.delete(change[1])
 
     def on_tree_select(self, event):
         selected_items = self.file_tree.selection()
@@ -192,22 +225,32 @@ class PDFManagerApp:
             self.display_pdf(self.current_pdf)
 
     def display_pdf(self, pdf_path):
+        for store in self.pdf_content.values():
+            store.detach()
         self.doc = fitz.open(pdf_path)
+        self.doc_mtime = os.path.getmtime(pdf_path)
         self.total_pages = len(self.doc)
         if pdf_path not in self.pdf_content:
             self.load_pdf_content(pdf_path)
+        self.pdf_content[pdf_path].attach(self.doc)
         self.show_current_page()
+        self.schedule_warm_up()
 
+    @timed()
     def show_current_page(self):
         if 0 <= self.current_page < self.total_pages:
-            page = self.doc.load_page(self.current_page)
-            pix = page.get_pixmap()
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            
-            # Scale the image to fit the canvas
             canvas_width = self.pdf_canvas.winfo_width()
             canvas_height = self.pdf_canvas.winfo_height()
-            img.thumbnail((canvas_width, canvas_height), Image.LANCZOS)
+            key = cache_key(self.doc.name, self.doc_mtime, self.current_page, size=(canvas_width, canvas_height))
+            img = shared_cache.get(key)
+            if img is None:
+                page = self.doc.load_page(self.current_page)
+                
+                # Render straight at the size that fits the canvas (never above 100%, like
+                # the old thumbnail) instead of downscaling a full-size render
+                pix = render_pixmap(page, fit_zoom(page, canvas_width, canvas_height, max_zoom=1.0))
+                img = pixmap_to_image(pix)
+                shared_cache.put(key, img, img.width * img.height * 3)
             
             photo = ImageTk.PhotoImage(image=img)
             self.pdf_canvas.delete("all")
@@ -217,13 +260,29 @@ class PDFManagerApp:
             # Update text editor with current page content
             self.update_text_editor()
 
+    @timed()
     def load_pdf_content(self, pdf_path):
+        # Nothing is extracted here; pages are read on demand and warmed up in the background
         if pdf_path not in self.pdf_content:
-            reader = PyPDF2.PdfReader(pdf_path)
-            content = []
-            for page in reader.pages:
-                content.append(page.extract_text())
-            self.pdf_content[pdf_path] = content
+            self.extractor.reset_stats()
+            self.pdf_content[pdf_path] = PageTextStore.open(pdf_path, self.extractor, self.doc)
+
+    def schedule_warm_up(self):
+        # The rest of the file is extracted in the worker pool; only the file on screen is warmed up
+        if self.warm_up_job is not None:
+            self.master.after_cancel(self.warm_up_job)
+        for store in self.pdf_content.values():
+            store.cancel_warm_up()
+        store = self.pdf_content.get(self.current_pdf)
+        if store is not None:
+            store.start_warm_up()
+            self.warm_up_job = self.master.after(100, self.poll_warm_up)
+
+    def poll_warm_up(self):
+        self.warm_up_job = None
+        store = self.pdf_content.get(self.current_pdf)
+        if store is not None and store.collect_warm_up():
+            self.warm_up_job = self.master.after(100, self.poll_warm_up)
 
     def update_text_editor(self):
         if self.current_pdf in self.pdf_content:
@@ -237,24 +296,30 @@ class PDFManagerApp:
         self.update_pdf_content()  # Save changes after adding section break
 
     def export_to_excel(self):
-        data = []
-        for pdf_file in self.selected_files:
-            if pdf_file in self.pdf_content:
-                content = "\n".join(self.pdf_content[pdf_file])
-                sections = content.split(SECTION_BREAK)
-                for section in sections:
-                    if self.clean_text_var.get():
-                        cleaned_section = clean_text_for_excel(section.strip())
-                    else:
-                        cleaned_section = section.strip()
-                    data.append({"File": os.path.basename(pdf_file), "Content": cleaned_section})
+        # Pages not extracted yet, including files selected together but never opened,
+        # are extracted through the worker pool before the export
+        with span("export_to_excel", files=len(self.selected_files)):
+            self.extractor.reset_stats()
+            for pdf_file in self.selected_files:
+                if pdf_file not in self.pdf_content:
+                    self.pdf_content[pdf_file] = PageTextStore.open(pdf_file, self.extractor)
+                self.pdf_content[pdf_file].fill()
+            print(self.extractor.summary())
+
+            data = []
+            for pdf_file in self.selected_files:
+                if pdf_file in self.pdf_content:
+                    content = "\n".join(self.pdf_content[pdf_file])
+                    sections = content.split(SECTION_BREAK)
+                    for section in sections:
+                        cleaned_section = clean_cell(section.strip(), self.clean_text_var.get(), self.keep_unicode_var.get())
+                        data.append([os.path.basename(pdf_file), cleaned_section])
         
         if data:
-            df = pd.DataFrame(data)
             excel_file = filedialog.asksaveasfilename(defaultextension=".xlsx")
             if excel_file:
                 try:
-                    df.to_excel(excel_file, index=False, engine='openpyxl')
+                    write_xlsx(excel_file, ["File", "Content"], data)
                     messagebox.showinfo("Export Complete", f"Data exported to {excel_file}")
                 except Exception as e:
                     messagebox.showerror("Export Error", f"An error occurred while exporting: {str(e)}")
@@ -270,13 +335,15 @@ class PDFManagerApp:
             for file_path in self.selected_files:
                 try:
                     os.remove(file_path)
-                    self.file_tree.delete(os.path.basename(file_path))
+                    if self.file_index is not None:
+                        self.file_index.forget(os.path.basename(file_path))
                     if file_path in self.pdf_content:
                         del self.pdf_content[file_path]
                 except Exception as e:
                     messagebox.showerror("Delete Error", f"Error deleting {file_path}: {str(e)}")
             
             self.selected_files = []
+            self.apply_file_changes()
             messagebox.showinfo("Delete Complete", "Selected file(s) have been deleted.")
             
             # If we deleted the current PDF, clear the display
@@ -297,38 +364,100 @@ class PDFManagerApp:
             self.current_page += 1
             self.show_current_page()
 
-    def save_session(self):
-        session_data = {
+    def toggle_profiling(self, event=None):
+        if self.profile_job is None:
+            profiler.enable()
+            self.profile_label.pack(side=tk.BOTTOM, fill=tk.X, padx=10)
+            self.update_profile_label()
+        else:
+            self.master.after_cancel(self.profile_job)
+            self.profile_job = None
+            self.profile_label.pack_forget()
+            # Profiling switched on through the environment keeps running without the overlay
+            if not self.profile_from_env:
+                profiler.disable()
+
+    def update_profile_label(self):
+        self.profile_label.config(text=profiler.summary(
+            ["show_current_page", "render_pixmap", "load_pdf_content", "export_to_excel", "write_xlsx"]))
+        self.profile_job = self.master.after(500, self.update_profile_label)
+
+    def save_trace(self, event=None):
+        file_path = filedialog.asksaveasfilename(defaultextension=".jsonl", filetypes=[("JSONL trace", "*.jsonl")],
+                                                 initialdir=self.data_dir)
+        if file_path:
+            count = profiler.dump_trace(file_path)
+            print(profiler.report())
+            messagebox.showinfo("Save Trace", f"{count} spans written to {file_path}")
+
+    def session_state(self):
+        return {
             "pdf_dir": self.pdf_dir,
             "selected_files": self.selected_files,
             "current_pdf": self.current_pdf,
             "current_page": self.current_page,
-            "pdf_content": self.pdf_content
         }
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".json",
-            filetypes=[("JSON files", "*.json")],
-            initialdir=self.data_dir
-        )
-        if file_path:
-            with open(file_path, 'w') as f:
-                json.dump(session_data, f)
-            messagebox.showinfo("Session Saved", f"Current session has been saved to {file_path}")
+
+    def save_session(self):
+        self.update_pdf_content()
+        full = False
+        if self.session is None:
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".session",
+                filetypes=[("Session files", "*.session")],
+                initialdir=self.data_dir
+            )
+            if not file_path:
+                return
+            self.session = SessionStore(file_path)
+            full = True
+            # Sessions imported from JSON carry every page; keep only the real edits
+            for store in self.pdf_content.values():
+                if store.full_copy and os.path.exists(store.pdf_path):
+                    store.drop_unchanged_edits()
+
+        # Later saves only write the pages edited since the previous one
+        written = self.session.save(self.session_state(), self.pdf_content.values(), full)
+        messagebox.showinfo("Session Saved", f"{written} edited page(s) saved to {self.session.path}")
 
     def load_session(self):
         file_path = filedialog.askopenfilename(
-            filetypes=[("JSON files", "*.json")],
+            filetypes=[("Session files", "*.session"), ("JSON sessions", "*.json")],
             initialdir=self.data_dir
         )
         if file_path:
-            with open(file_path, 'r') as f:
-                session_data = json.load(f)
+            if self.session is not None:
+                self.session.close()
+                self.session = None
+
+            for store in self.pdf_content.values():
+                store.cancel_warm_up()
+            if file_path.lower().endswith(".json"):
+                # Older JSON sessions are imported; the next save writes a .session file
+                with open(file_path, 'r') as f:
+                    session_data = json.load(f)
+                self.pdf_content = {
+                    pdf_path: PageTextStore.from_session(pdf_path, data, self.extractor)
+                    for pdf_path, data in session_data["pdf_content"].items()
+                }
+            else:
+                self.session = SessionStore(file_path)
+                session_data = self.session.load_state()
+                self.pdf_content = {}
+                for pdf_path, file_hash, page_count in self.session.load_files():
+                    if self.session.changed(pdf_path, file_hash):
+                        # Its pages and page count may differ, so the file is opened afresh
+                        print(f"{pdf_path} changed since the session was saved, its edits were not applied")
+                        self.pdf_content[pdf_path] = PageTextStore.open(pdf_path, self.extractor)
+                        continue
+                    store = PageTextStore(pdf_path, page_count, self.extractor)
+                    store.edit_source = partial(self.session.load_edits, pdf_path, file_hash)
+                    self.pdf_content[pdf_path] = store
             
             self.pdf_dir = session_data["pdf_dir"]
             self.selected_files = session_data["selected_files"]
             self.current_pdf = session_data["current_pdf"]
             self.current_page = session_data["current_page"]
-            self.pdf_content = session_data["pdf_content"]
 
             if self.current_pdf:
                 self.update_file_tree(self.current_pdf)
@@ -336,6 +465,13 @@ class PDFManagerApp:
             
             messagebox.showinfo("Session Loaded", f"Session has been loaded from {file_path}")
 
+    def on_close(self):
+        # Queued warm-up chunks are dropped so closing does not wait for the whole file
+        for store in self.pdf_content.values():
+            store.cancel_warm_up()
+        self.extractor.close()
+        self.master.destroy()
+
 # Đoạn code này nên nằm ngoài class PDFManagerApp
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,65 @@
+import argparse
+import glob
+import os
+import shutil
+import tempfile
+import fitz
+import app_paths
+app_paths.setup()
+from pdf_core.text_extraction import BACKENDS, TextExtractor
+
+# Times every text extraction backend on the PDFs in Data/ (or --pdf files), one process,
+# no pool, so the numbers compare the backends themselves.
+
+
+def make_document(path, pages):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Chapter {i}", fontsize=18)
+        page.insert_textbox(fitz.Rect(72, 100, 300, 760), "Left column text. " * 60, fontsize=9)
+        page.insert_textbox(fitz.Rect(310, 100, 540, 760), "Right column text. " * 60, fontsize=9)
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def main():
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Data")
+    parser = argparse.ArgumentParser(description="Compare PDFManagerApp text extraction backends.")
+    parser.add_argument("--pdf", nargs="+", help="PDFs to extract (default: Data/*.pdf)")
+    parser.add_argument("--pages", type=int, default=300, help="pages in the generated document when no PDF is found")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_backends_")
+    pdf_paths = args.pdf or sorted(glob.glob(os.path.join(data_dir, "*.pdf")))
+    if not pdf_paths:
+        pdf_paths = [os.path.join(work_dir, "sample.pdf")]
+        make_document(pdf_paths[0], args.pages)
+        print(f"No PDFs in {data_dir}, using a generated {args.pages}-page document")
+
+    try:
+        compare_backends(pdf_paths)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def compare_backends(pdf_paths):
+    for pdf_path in pdf_paths:
+        print(os.path.basename(pdf_path))
+        extractor = TextExtractor(workers=1)
+        results = {}
+        for name in BACKENDS:
+            extractor.backend = name
+            extractor.reset_stats()
+            chars = sum(len(text) for text in extractor.extract_pages(pdf_path))
+            results[name] = extractor.seconds
+            print(f"  {name:8} {extractor.seconds:8.3f}s  {extractor.pages_per_second:8.0f} pages/s  {chars} chars")
+        baseline = results.get("pypdf2")
+        if baseline:
+            for name, seconds in results.items():
+                if name != "pypdf2" and seconds:
+                    print(f"  {name} is {baseline / seconds:.1f}x faster than pypdf2")
+
+
+if __name__ == "__main__":
+    main()
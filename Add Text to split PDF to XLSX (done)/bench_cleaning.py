@@ -0,0 +1,45 @@
+import argparse
+import re
+import time
+import app_paths
+app_paths.setup()
+from pdf_core.text_cleaning import clean_text_for_excel
+
+# Times the single-pass cleaning against the old four-pass clean_text_for_excel on
+# export-sized sections. tests/test_text_cleaning.py checks that their outputs agree.
+
+
+def clean_text_four_pass(text):
+    # The clean_text_for_excel implementation text_cleaning replaced, as the baseline
+    text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f]', '', text)
+    text = text.encode('ascii', 'replace').decode('ascii')
+    text = re.sub(r'(?m)^=', "'=", text)
+    text = ''.join(char for char in text if char.isprintable() or char in '\n\t')
+    return text
+
+
+def timed(function, values):
+    start_time = time.perf_counter()
+    function(values)
+    return time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time clean_text_for_excel.")
+    parser.add_argument("--sections", type=int, default=2000, help="sections in the timing run")
+    args = parser.parse_args()
+
+    page = ("Điều 1. Phạm vi điều chỉnh\n=SUM(A1:A3) \x0c\r\n" + "Lorem ipsum dolor sit amet. " * 60 + "\n") * 4
+    sections = [page] * args.sections
+    print(f"{args.sections} sections of {len(page)} chars")
+    results = {
+        "four-pass": timed(lambda values: [clean_text_four_pass(text) for text in values], sections),
+        "single-pass": timed(lambda values: [clean_text_for_excel(text) for text in values], sections),
+        "keep-unicode": timed(lambda values: [clean_text_for_excel(text, True) for text in values], sections),
+    }
+    for name, seconds in results.items():
+        print(f"  {name:12} {seconds:8.3f}s  {results['four-pass'] / seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
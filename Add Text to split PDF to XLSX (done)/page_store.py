@@ -0,0 +1,152 @@
+from pdf_core.text_extraction import count_pages
+
+
+def page_ranges(pdf_path, pages):
+    # Sorted page numbers -> (pdf_path, start, end) jobs of consecutive pages
+    ranges = []
+    for page_num in pages:
+        if ranges and ranges[-1][2] == page_num:
+            ranges[-1][2] = page_num + 1
+        else:
+            ranges.append([pdf_path, page_num, page_num + 1])
+    return ranges
+
+
+# Page texts of one PDF, extracted only when a page is read. Text typed by the user is
+# kept apart in self.edits, so untouched pages never have to be extracted just to be
+# saved; self.dirty holds the edits made since the last session save. Behaves like the
+# list of page texts it replaces: store[page], len(store) and iteration all work.
+# Every page is extracted with the backend chosen when the store was created, so a
+# backend change in the app only applies to files opened after it.
+class PageTextStore:
+    def __init__(self, pdf_path, page_count, extractor, backend=None):
+        self.pdf_path = pdf_path
+        self.page_count = page_count
+        self.extractor = extractor
+        self.backend = backend or extractor.backend
+        self.doc = None
+        self.extracted = {}
+        self.edits = {}
+        self.dirty = set()
+        # Callable returning saved edits, read the first time the store is used
+        self.edit_source = None
+        # True when edits hold every page, as imported from a JSON session
+        self.full_copy = False
+        # (pdf_path, start, future) chunks queued by start_warm_up()
+        self.warm_up_jobs = []
+
+    @classmethod
+    def open(cls, pdf_path, extractor, doc=None, backend=None):
+        page_count = len(doc) if doc is not None else count_pages(pdf_path)
+        store = cls(pdf_path, page_count, extractor, backend)
+        store.attach(doc)
+        return store
+
+    def attach(self, doc):
+        # The viewer's open fitz document is reused for on-demand extraction
+        self.doc = doc
+
+    def detach(self):
+        self.doc = None
+
+    def __len__(self):
+        return self.page_count
+
+    def __iter__(self):
+        for page_num in range(self.page_count):
+            yield self[page_num]
+
+    def load_edits(self):
+        if self.edit_source is not None:
+            edit_source, self.edit_source = self.edit_source, None
+            self.edits = {**edit_source(), **self.edits}
+
+    def __getitem__(self, page_num):
+        self.load_edits()
+        if page_num in self.edits:
+            return self.edits[page_num]
+        if page_num not in self.extracted:
+            self.extracted[page_num] = self.extract(page_num)
+        return self.extracted[page_num]
+
+    def __setitem__(self, page_num, text):
+        # The editor strips the text it hands back, so an unchanged page is not an edit, and
+        # an edit reverted to the PDF's text is dropped (dirty, so the session deletes it)
+        self.load_edits()
+        if self.edits.get(page_num) == text:
+            return
+        if page_num not in self.extracted:
+            self.extracted[page_num] = self.extract(page_num)
+        original = self.extracted[page_num]
+        if text in (original, original.strip()):
+            if self.edits.pop(page_num, None) is not None:
+                self.dirty.add(page_num)
+            return
+        self.edits[page_num] = text
+        self.dirty.add(page_num)
+
+    def extract(self, page_num):
+        if self.doc is not None:
+            return self.extractor.page_text(self.doc, page_num, self.backend)
+        return self.extractor.extract_local(self.pdf_path, page_num, page_num + 1, backend=self.backend)[0]
+
+    def missing_pages(self):
+        self.load_edits()
+        return [p for p in range(self.page_count) if p not in self.edits and p not in self.extracted]
+
+    def start_warm_up(self):
+        # Queues every missing page on the extractor's worker pool; collect_warm_up() picks
+        # up the chunks as they finish, so nothing is extracted on the caller's thread
+        self.cancel_warm_up()
+        self.warm_up_jobs = self.extractor.submit(page_ranges(self.pdf_path, self.missing_pages()), self.backend)
+
+    def collect_warm_up(self):
+        # Stores the finished chunks; returns True while chunks are still running
+        running = []
+        for job in self.warm_up_jobs:
+            _, start, future = job
+            if not future.done():
+                running.append(job)
+            elif not future.cancelled() and future.exception() is None:
+                for offset, text in enumerate(future.result()):
+                    self.extracted.setdefault(start + offset, text)
+        self.warm_up_jobs = running
+        return bool(running)
+
+    def cancel_warm_up(self):
+        for _, _, future in self.warm_up_jobs:
+            future.cancel()
+        self.warm_up_jobs = []
+
+    def fill(self):
+        # Bulk extraction of every missing page through the extractor's worker pool
+        ranges = page_ranges(self.pdf_path, self.missing_pages())
+        for _, page_num, text in self.extractor.iter_pages(ranges, self.doc, self.backend):
+            self.extracted[page_num] = text
+
+    def drop_unchanged_edits(self):
+        # Edits identical to the PDF's own text are not deltas; used after importing old
+        # sessions, which stored every page. Those pages hold PyPDF2's extract_text()
+        # output, so they are compared with the pypdf2 backend, whatever the store uses.
+        try:
+            for _, page_num, original in self.extractor.iter_pages(page_ranges(self.pdf_path, sorted(self.edits)),
+                                                                   backend="pypdf2"):
+                if self.edits[page_num] in (original, original.strip()):
+                    del self.edits[page_num]
+                    self.dirty.discard(page_num)
+        except ImportError:
+            # Without PyPDF2 the legacy text cannot be reproduced; keep every page
+            return
+        self.full_copy = False
+
+    @classmethod
+    def from_session(cls, pdf_path, data, extractor):
+        if isinstance(data, list):
+            # Pre-delta sessions stored every page; keep them all as edits so nothing is lost
+            store = cls(pdf_path, len(data), extractor)
+            store.edits = dict(enumerate(data))
+            store.full_copy = True
+            return store
+        store = cls(pdf_path, data["page_count"], extractor)
+        store.edits = {int(p): text for p, text in data["edits"].items()}
+        return store
@@ -0,0 +1,70 @@
+import json
+import os
+import sqlite3
+from pdf_core.file_hashes import cached_file_hash, setup_table
+
+
+# A session file is a small SQLite database holding the app state plus the pages the
+# user edited, stored as deltas against the source PDF and keyed by its content hash.
+# Untouched pages are never written; they are extracted from the PDF again on load.
+class SessionStore:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS files
+                (path TEXT PRIMARY KEY, file_hash TEXT, page_count INTEGER);
+            CREATE TABLE IF NOT EXISTS edits
+                (file_hash TEXT, page INTEGER, text TEXT, PRIMARY KEY (file_hash, page));
+        ''')
+        setup_table(self.conn)
+        self.conn.commit()
+
+    def file_hash(self, pdf_path):
+        # Hashes are cached by (mtime, size) so a file is only read again after it changes
+        if not os.path.exists(pdf_path):
+            return "path:" + pdf_path
+        return cached_file_hash(self.conn, pdf_path)
+
+    def save(self, state, stores, full=False):
+        # Writes the app state and the pages edited since the last save (every edit when full)
+        written = 0
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                                  [(key, json.dumps(value)) for key, value in state.items()])
+            for store in stores:
+                pages = set(store.edits) | store.dirty if full else store.dirty
+                if not pages and not full:
+                    continue
+                file_hash = self.file_hash(store.pdf_path)
+                self.conn.execute("INSERT OR REPLACE INTO files (path, file_hash, page_count) VALUES (?, ?, ?)",
+                                  (store.pdf_path, file_hash, store.page_count))
+                self.conn.executemany("INSERT OR REPLACE INTO edits (file_hash, page, text) VALUES (?, ?, ?)",
+                                      [(file_hash, p, store.edits[p]) for p in pages if p in store.edits])
+                # Dirty pages without an edit were reverted to the PDF's text
+                self.conn.executemany("DELETE FROM edits WHERE file_hash=? AND page=?",
+                                      [(file_hash, p) for p in pages if p not in store.edits])
+                written += len(pages)
+                store.dirty = set()
+        return written
+
+    def load_state(self):
+        return {key: json.loads(value) for key, value in self.conn.execute("SELECT key, value FROM state")}
+
+    def load_files(self):
+        return self.conn.execute("SELECT path, file_hash, page_count FROM files").fetchall()
+
+    def changed(self, pdf_path, file_hash):
+        # True when the PDF no longer has the content the session's edits were made against
+        return os.path.exists(pdf_path) and self.file_hash(pdf_path) != file_hash
+
+    def load_edits(self, pdf_path, file_hash):
+        if self.changed(pdf_path, file_hash):
+            # The edits stay in the session file under the old hash
+            return {}
+        return dict(self.conn.execute("SELECT page, text FROM edits WHERE file_hash=?", (file_hash,)))
+
+    def close(self):
+        self.conn.close()
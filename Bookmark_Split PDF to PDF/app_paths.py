@@ -0,0 +1,16 @@
+import os
+import sys
+
+# The app runs as a script from its own folder; the shared pdf_core package lives in the
+# repository root
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(APP_DIR)
+
+# Next to the app rather than in whatever directory it was started from
+BOOKMARKS_DB = os.path.join(APP_DIR, "bookmarks.db")
+
+
+def setup():
+    # Called by each entry script before it imports pdf_core
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
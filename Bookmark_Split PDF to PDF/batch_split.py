@@ -0,0 +1,236 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+import fitz
+import app_paths
+app_paths.setup()
+from pdf_core.bookmark_store import BookmarkStore, load_manifest, load_sidecar
+from pdf_core.optimize import optimize_pdf, summarize
+from pdf_core.search_index import SearchIndex
+from pdf_core.sections import export_sections
+from pdf_core.split_detection import detect_split_points
+from pdf_core.splitting import PDFSplitter
+
+# Headless counterpart of MainApp.split_pdf for large overnight runs.
+# Page numbers in bookmarks.db, sidecars and manifests are 0-based, same as PDFReader.
+
+
+def collect_jobs(source, db_path):
+    if os.path.isfile(source):
+        jobs = load_manifest(source)
+        pdf_paths = sorted(jobs)
+    else:
+        jobs = {}
+        pdf_paths = [os.path.join(source, f) for f in sorted(os.listdir(source))
+                     if f.lower().endswith('.pdf') and "_split_" not in f]
+
+    store = BookmarkStore(db_path) if os.path.exists(db_path) else None
+    try:
+        for pdf_path in pdf_paths:
+            if jobs.get(pdf_path):
+                continue
+            pages = load_sidecar(pdf_path)
+            if pages is None:
+                pages = store.load(pdf_path) if store else set()
+            jobs[pdf_path] = pages
+    finally:
+        if store:
+            # Bookmarks adopted from the old basename-keyed table are written in one transaction
+            store.close()
+    return [(pdf_path, sorted(jobs[pdf_path])) for pdf_path in pdf_paths]
+
+
+def split_one(pdf_path, bookmarks, output_dir, split_options=None, detect=False, xlsx=False, optimize_options=None,
+              incremental=False, search_db=None):
+    summary = {"pdf": pdf_path, "bookmarks": len(bookmarks)}
+    start_time = time.perf_counter()
+    try:
+        # What the run was asked to do, so a restart can tell whether it is still done
+        summary["pages"] = list(bookmarks)
+        summary["mtime"] = os.stat(pdf_path).st_mtime
+        if not bookmarks and detect:
+            detected = detect_split_points(pdf_path)
+            bookmarks = sorted(detected["pages"])
+            summary["bookmarks"] = len(bookmarks)
+            summary["detected"] = detected["pages"]
+            summary["detect_seconds"] = detected["seconds"]
+        if not bookmarks:
+            summary["status"] = "skipped"
+            return summary
+        if xlsx:
+            os.makedirs(output_dir, exist_ok=True)
+            xlsx_path = os.path.join(output_dir, os.path.splitext(os.path.basename(pdf_path))[0] + ".xlsx")
+            pdf_document = fitz.open(pdf_path)
+            try:
+                summary["sections"] = export_sections(pdf_document, bookmarks, xlsx_path)
+            finally:
+                pdf_document.close()
+            summary["outputs"] = [{"file": os.path.basename(xlsx_path), "bytes": os.path.getsize(xlsx_path)}]
+        else:
+            # With --optimize the outputs are indexed for search once they have their final bytes
+            splitter = PDFSplitter(pdf_path, output_dir, search_db if optimize_options is None else None)
+            try:
+                if incremental:
+                    output_paths, plan = splitter.resplit(bookmarks, **(split_options or {}))
+                    written = [output_paths[i] for i, _, _ in plan["write"]]
+                    removed = [old_path for _, old_path, _ in plan["rename"]] + plan["stale"]
+                    summary["written"] = len(written)
+                    summary["removed"] = [os.path.basename(path) for path in plan["stale"]]
+                else:
+                    output_paths = written = splitter.split_pdf(bookmarks, **(split_options or {}))
+                    removed = []
+                summary["outputs"] = [
+                    {"file": os.path.basename(path), "bytes": os.path.getsize(path)} for path in output_paths
+                ]
+                if optimize_options is not None:
+                    # One file after the other: the batch already runs one PDF per worker. Files
+                    # kept by an incremental split were optimized when they were written.
+                    reports = {path: optimize_pdf(path, **optimize_options) for path in written}
+                    for path, output in zip(output_paths, summary["outputs"]):
+                        if path not in reports:
+                            continue
+                        report = reports[path]
+                        output.update(bytes=report["bytes_after"], bytes_saved=report["bytes_saved"],
+                                      optimize_seconds=report["seconds"], optimize_status=report["status"])
+                    summary["optimize"] = summarize(list(reports.values()))
+                    splitter.search_db = search_db
+                    splitter.index_outputs(output_paths, splitter.get_split_points(bookmarks), removed)
+            finally:
+                splitter.close()
+        summary["status"] = "ok"
+        summary["input_bytes"] = os.path.getsize(pdf_path)
+        summary["output_bytes"] = sum(o["bytes"] for o in summary["outputs"])
+    except Exception as e:
+        summary["status"] = "error"
+        summary["error"] = str(e)
+    finally:
+        summary["seconds"] = round(time.perf_counter() - start_time, 4)
+    return summary
+
+
+def job_key(pdf_path, pages, mtime):
+    return pdf_path, tuple(pages), mtime
+
+
+def load_completed(summary_path):
+    # Keys of jobs listed as done. A PDF whose bookmarks or mtime have changed since
+    # has a different key and is split again; so is one from a summary without them.
+    done = set()
+    if os.path.exists(summary_path):
+        with open(summary_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # partial line left behind by a crash
+                if record.get("status") in ("ok", "skipped") and "mtime" in record:
+                    done.add(job_key(record["pdf"], record["pages"], record["mtime"]))
+    return done
+
+
+def is_done(done, pdf_path, bookmarks):
+    try:
+        mtime = os.stat(pdf_path).st_mtime
+    except OSError:
+        return False  # split_one records the error
+    return job_key(pdf_path, bookmarks, mtime) in done
+
+
+def run_batch(jobs, output_dir, summary_path, workers=None, split_options=None, detect=False, xlsx=False,
+              optimize_options=None, incremental=False, search_db=None):
+    workers = workers or os.cpu_count() or 1
+    done = load_completed(summary_path)
+    pending_jobs = [job for job in jobs if not is_done(done, *job)]
+    print(f"{len(jobs)} PDFs, {len(jobs) - len(pending_jobs)} already done, {len(pending_jobs)} to split")
+
+    counts = {}
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        with open(summary_path, 'a', encoding='utf-8') as summary_file:
+            queue = iter(pending_jobs)
+            running = {}
+            while True:
+                # Keep at most 2 jobs per worker in flight so huge manifests are not queued up front
+                for pdf_path, bookmarks in queue:
+                    future = pool.submit(split_one, pdf_path, bookmarks, output_dir, split_options, detect, xlsx,
+                                         optimize_options, incremental, search_db)
+                    running[future] = pdf_path
+                    if len(running) >= workers * 2:
+                        break
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                if any(isinstance(future.exception(), BrokenProcessPool) for future in finished):
+                    # A worker died (a crash inside MuPDF, or killed for memory). Every job still
+                    # in the pool fails with it and is retried on the next run; the batch goes on
+                    # with a new pool.
+                    finished, _ = wait(running)
+                    pool.shutdown(wait=False)
+                    pool = ProcessPoolExecutor(max_workers=workers)
+                for future in finished:
+                    pdf_path = running.pop(future)
+                    try:
+                        summary = future.result()
+                    except BrokenProcessPool as e:
+                        summary = {"pdf": pdf_path, "status": "error", "error": f"worker process died: {e}"}
+                    counts[summary["status"]] = counts.get(summary["status"], 0) + 1
+                    summary_file.write(json.dumps(summary) + "\n")
+                    summary_file.flush()
+                    seconds = f" ({summary['seconds']}s)" if "seconds" in summary else ""
+                    print(f"[{summary['status']}] {summary['pdf']}{seconds}")
+    finally:
+        pool.shutdown()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Split PDFs at their bookmarks without the GUI.")
+    parser.add_argument("source", help="directory of PDFs, or a JSON/CSV manifest of PDFs and bookmark pages")
+    parser.add_argument("-o", "--output-dir", help="where split files are written (default: the source directory or the manifest's directory)")
+    parser.add_argument("--db", default=app_paths.BOOKMARKS_DB, help="bookmark database used when a PDF has no sidecar")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--summary", default="batch_summary.jsonl",
+                        help="per-file summary; PDFs already listed as done are skipped on restart")
+    parser.add_argument("--in-memory", action="store_true", help="read each source into memory before splitting")
+    parser.add_argument("--garbage", type=int, default=0, choices=range(5), help="garbage collection level for saved segments")
+    parser.add_argument("--deflate", action="store_true", help="compress streams in saved segments")
+    parser.add_argument("--incremental", action="store_true",
+                        help="keep split files whose page range is unchanged, write the new ones and remove the rest")
+    parser.add_argument("--optimize", action="store_true",
+                        help="shrink each segment after splitting: subset fonts, downsample images, garbage collect")
+    parser.add_argument("--dpi", type=int, default=150, help="with --optimize, downsample images above this resolution")
+    parser.add_argument("--jpeg-quality", type=int, default=80, help="with --optimize, JPEG quality of downsampled images")
+    parser.add_argument("--xlsx", action="store_true",
+                        help="write one XLSX per PDF with a row per section instead of split PDFs")
+    parser.add_argument("--detect", action="store_true",
+                        help="detect split points from the outline, headings and blank pages for PDFs without bookmarks")
+    parser.add_argument("--search-db",
+                        help="also add the split files to this full-text index (e.g. the viewer's search.db); "
+                             "their text is extracted in the workers, which makes the run much slower. "
+                             "Without it, the viewer indexes new files in its folder in the background")
+    args = parser.parse_args(argv)
+
+    jobs = collect_jobs(args.source, args.db)
+    if args.output_dir:
+        output_dir = args.output_dir
+    elif os.path.isdir(args.source):
+        output_dir = args.source
+    else:
+        output_dir = os.path.dirname(os.path.abspath(args.source))
+    split_options = {"in_memory": args.in_memory, "garbage": args.garbage, "deflate": args.deflate}
+    optimize_options = {"dpi": args.dpi, "jpeg_quality": args.jpeg_quality} if args.optimize else None
+    search_db = None
+    if args.search_db and not args.xlsx:
+        search_db = os.path.abspath(args.search_db)
+        # Creates the tables once, before the workers write to them
+        SearchIndex(search_db).close()
+    counts = run_batch(jobs, output_dir, args.summary, args.workers, split_options, args.detect, args.xlsx,
+                       optimize_options, args.incremental, search_db)
+    print(", ".join(f"{status}: {n}" for status, n in sorted(counts.items())) or "Nothing to do")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import fitz
+import app_paths
+app_paths.setup()
+from pdf_core.bench import peak_rss_mb
+from pdf_core.splitting import PDFSplitter
+
+# Compares the per-segment split loop with the in-memory-source and parallel modes of PDFSplitter.split_pdf.
+# Each mode runs in its own process so peak RSS is not shared between them. There is no
+# single-pass mode: every mode, in-memory included, copies each segment's fonts and images
+# with its own insert_pdf, so the in-memory row only measures reading the source from RAM.
+
+
+def make_catalog(path, pages):
+    # Every page shares one image and one font, like a product catalog
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 600, 600), 0)
+    for y in range(0, 600, 20):
+        for x in range(0, 600, 20):
+            pix.set_rect(fitz.IRect(x, y, x + 20, y + 20), ((x * 7) % 256, (y * 5) % 256, (x + y) % 256))
+    image = pix.tobytes("png")
+
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Product {i}", fontsize=20)
+        page.insert_textbox(fitz.Rect(72, 100, 520, 300), f"Description of product {i}. " * 20)
+        page.insert_image(fitz.Rect(72, 320, 372, 620), stream=image)
+    doc.save(path)
+    doc.close()
+
+
+def run_mode(pdf_path, output_dir, every, in_memory, garbage, deflate, workers=1):
+    start_time = time.perf_counter()
+    splitter = PDFSplitter(pdf_path, output_dir)
+    bookmarks = range(0, len(splitter.pdf_document), every)
+    output_paths = splitter.split_pdf(bookmarks, in_memory=in_memory, garbage=garbage, deflate=deflate,
+                                      workers=workers)
+    splitter.close()
+    return {
+        "seconds": round(time.perf_counter() - start_time, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "files": len(output_paths),
+        "output_mb": round(sum(os.path.getsize(p) for p in output_paths) / (1024 * 1024), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDFSplitter split modes.")
+    parser.add_argument("--pdf", help="PDF to split (default: a generated catalog)")
+    parser.add_argument("--pages", type=int, default=2000, help="pages in the generated catalog")
+    parser.add_argument("--every", type=int, default=10, help="put a bookmark every N pages")
+    parser.add_argument("--garbage", type=int, default=0)
+    parser.add_argument("--deflate", action="store_true")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes for the parallel mode")
+    parser.add_argument("--mode", choices=["loop", "in-memory", "parallel"], help=argparse.SUPPRESS)
+    parser.add_argument("--output-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        workers = args.workers if args.mode == "parallel" else 1
+        result = run_mode(args.pdf, args.output_dir, args.every, args.mode == "in-memory",
+                          args.garbage, args.deflate, workers)
+        print(json.dumps(result))
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="bench_split_")
+    try:
+        pdf_path = args.pdf
+        if not pdf_path:
+            pdf_path = os.path.join(work_dir, "catalog.pdf")
+            make_catalog(pdf_path, args.pages)
+        print(f"{pdf_path}: {os.path.getsize(pdf_path) / (1024 * 1024):.1f} MB, bookmark every {args.every} pages")
+
+        for mode in ("loop", "in-memory", "parallel"):
+            output_dir = os.path.join(work_dir, mode)
+            command = [sys.executable, os.path.abspath(__file__), "--mode", mode, "--pdf", pdf_path,
+                       "--output-dir", output_dir, "--every", str(args.every), "--garbage", str(args.garbage),
+                       "--workers", str(args.workers)]
+            if args.deflate:
+                command.append("--deflate")
+            output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:12} {result['seconds']:8.3f}s  peak RSS {result['peak_rss_mb']:7.1f} MB  "
+                  f"{result['files']} files, {result['output_mb']} MB")
+            shutil.rmtree(output_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,21 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
+import multiprocessing
 import os
-import shutil
+import queue
+from concurrent.futures import ProcessPoolExecutor
+import app_paths
+app_paths.setup()
 from pdf_reader import PDFReader
-from pdf_splitter import PDFSplitter
+from pdf_core.file_index import split_parent
+from pdf_core.library_store import LibraryStore
+from pdf_core.optimize import format_reports, summarize
+from pdf_core.profiling import profiler
+from pdf_core.sections import export_file, set_progress_queue
+from pdf_core.splitting import PDFSplitter, merge_split_outputs
+
+# Options of the post-split optimization stage behind the "Optimize outputs" check box
+OPTIMIZE_OPTIONS = {"dpi": 150, "subset_fonts": True, "jpeg_quality": 80}
 
 class MainApp:
     def __init__(self, master):
@@ -18,7 +30,16 @@ class MainApp:
             os.makedirs(self.pdf_dir)
 
         self.pdf_reader = PDFReader(self.master, self.pdf_dir)
+        # Content hashes of imports and split outputs, so duplicates are linked instead of copied
+        self.library = LibraryStore(
+            os.path.join(os.path.dirname(self.pdf_reader.bookmark_store.db_path), 'library.db'), self.pdf_dir)
+        self.profile_job = None
+        # Split to XLSX runs in a worker process that reports each section on export_queue
+        self.export_pool = None
+        self.export_queue = None
+        self.export_job = None
         self.setup_ui()
+        self.master.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def setup_ui(self):
         # File management buttons
@@ -31,44 +52,185 @@ class MainApp:
         self.btn_split = tk.Button(self.button_frame, text="Split PDF", command=self.split_pdf, state=tk.DISABLED)
         self.btn_split.pack(side=tk.LEFT)
 
+        self.btn_split_xlsx = tk.Button(self.button_frame, text="Split to XLSX", command=self.split_to_xlsx, state=tk.DISABLED)
+        self.btn_split_xlsx.pack(side=tk.LEFT)
+
+        self.btn_merge = tk.Button(self.button_frame, text="Merge Splits", command=self.merge_splits)
+        self.btn_merge.pack(side=tk.LEFT)
+
+        self.optimize_var = tk.BooleanVar(value=False)
+        self.chk_optimize = tk.Checkbutton(self.button_frame, text="Optimize outputs", variable=self.optimize_var)
+        self.chk_optimize.pack(side=tk.LEFT)
+
         # Update split button state when bookmarks change
         self.pdf_reader.bookmark_changed_callback = self.update_split_button_state
 
+        # Timing overlay: F12 shows or hides it, Shift+F12 saves the recent spans as JSONL
+        self.profile_label = tk.Label(self.master, anchor=tk.W, font=("Consolas", 9))
+        self.master.bind_all("<F12>", self.toggle_profiling)
+        self.master.bind_all("<Shift-F12>", self.save_trace)
+        self.profile_from_env = profiler.enabled
+
     def open_pdf(self):
         file_path = filedialog.askopenfilename(filetypes=[("PDF files", "*.pdf")])
         if file_path:
-            # Copy file to pdf_dir if it's not already there
+            # Import the file into pdf_dir if it's not already there; content already in the
+            # library is opened or linked instead of copied again
             if not file_path.startswith(self.pdf_dir):
-                new_file_path = os.path.join(self.pdf_dir, self.get_next_filename(os.path.basename(file_path)))
-                shutil.copy2(file_path, new_file_path)
-                file_path = new_file_path
-                self.pdf_reader.update_file_tree()
+                file_path, how = self.library.import_file(file_path)
+                if how != "existing":
+                    self.pdf_reader.update_file_tree()
 
             self.pdf_reader.open_pdf(file_path)
 
     def get_next_filename(self, filename):
-        name, ext = os.path.splitext(filename)
-        counter = 1
-        while os.path.exists(os.path.join(self.pdf_dir, f"{counter:03d}_{name}{ext}")):
-            counter += 1
-        return f"{counter:03d}_{name}{ext}"
+        return self.library.next_filename(filename)
 
     def update_split_button_state(self):
         if self.pdf_reader.pdf_document and self.pdf_reader.get_bookmarks():
             self.btn_split.config(state=tk.NORMAL)
+            self.btn_split_xlsx.config(state=tk.DISABLED if self.export_job else tk.NORMAL)
         else:
             self.btn_split.config(state=tk.DISABLED)
+            self.btn_split_xlsx.config(state=tk.DISABLED)
 
     def split_pdf(self):
         if self.pdf_reader.pdf_document and self.pdf_reader.get_bookmarks():
             pdf_path = self.pdf_reader.pdf_document.name
             splitter = PDFSplitter(pdf_path, self.pdf_dir)
-            splitter.split_pdf(self.pdf_reader.get_bookmarks())
+            try:
+                # Segments already split from the same content and pages are kept, not rewritten,
+                # and split files of ranges the bookmarks no longer produce are removed
+                optimize = OPTIMIZE_OPTIONS if self.optimize_var.get() else None
+                output_paths, report = self.library.split(splitter, self.pdf_reader.get_bookmarks(), optimize)
+                split_points = splitter.get_split_points(self.pdf_reader.get_bookmarks())
+            finally:
+                splitter.close()
+            # The outputs' text is copied from the source's search rows, not extracted again
+            self.pdf_reader.search_index.ensure_split(
+                pdf_path, [(path, start, end) for path, (start, end) in zip(output_paths, split_points)])
             self.pdf_reader.update_file_tree()
-            messagebox.showinfo("Split PDF", f"PDF split successfully. Output directory: {self.pdf_dir}")
+            message = (f"PDF split successfully ({report['reused']} of {len(output_paths)} files unchanged, "
+                       f"{len(report['removed'])} old split files removed).")
+            if report["optimized"]:
+                print(format_reports(report["optimized"]))
+                total = summarize(report["optimized"])
+                message += (f" Optimizing {total['files']} files saved {total['bytes_saved'] / 1e6:.1f} MB "
+                            f"in {total['seconds']:.1f}s.")
+            messagebox.showinfo("Split PDF", f"{message} Output directory: {self.pdf_dir}")
         else:
             messagebox.showwarning("Split PDF", "Please open a PDF and add bookmarks before splitting.")
 
+    def merge_splits(self):
+        # Rebuilds the selected file, or the parent of the selected split file, from its split
+        # files by copying their pages; also brings back a parent that was deleted
+        selection = self.pdf_reader.file_tree.selection()
+        if not selection:
+            messagebox.showwarning("Merge Splits", "Please select a file or one of its split files.")
+            return
+        if self.export_job is not None:
+            # The export worker has the open file, maybe the parent, open until it is done
+            messagebox.showwarning("Merge Splits", "Please wait for Split to XLSX to finish.")
+            return
+        parent = split_parent(selection[0]) or selection[0]
+        parent_path = os.path.join(self.pdf_dir, parent)
+        if os.path.exists(parent_path) and not messagebox.askyesno(
+                "Merge Splits", f"Replace {parent} with the merge of its split files?"):
+            return
+        base_name = os.path.splitext(os.path.basename(parent))[0]
+        # Bookmarks are keyed by content hash, which the merge changes; "path:..." if missing
+        old_hash, _ = self.pdf_reader.bookmark_store.file_key(parent_path)
+        # The parent is replaced by rename, which Windows refuses while any process has it open
+        self.pdf_reader.close_document(release_workers=True)
+        self.pdf_reader.release_file(parent_path)
+        self.update_split_button_state()
+        try:
+            _, chain = merge_split_outputs(base_name, os.path.dirname(parent_path), parent_path)
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Merge Splits", str(e))
+            return
+        self.pdf_reader.bookmark_store.rekey(parent_path, old_hash)
+        self.pdf_reader.update_file_tree()
+        self.pdf_reader.open_pdf(parent_path)
+        messagebox.showinfo("Merge Splits", f"{parent} rebuilt from {len(chain)} split files.")
+
+    def split_to_xlsx(self):
+        # One row per section, without writing the split PDFs first
+        if self.pdf_reader.pdf_document and self.pdf_reader.get_bookmarks():
+            pdf_path = self.pdf_reader.pdf_document.name
+            xlsx_path = filedialog.asksaveasfilename(
+                defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx")], initialdir=self.pdf_dir,
+                initialfile=os.path.splitext(os.path.basename(pdf_path))[0] + ".xlsx")
+            if xlsx_path:
+                if self.export_pool is None:
+                    self.export_queue = multiprocessing.Queue()
+                    self.export_pool = ProcessPoolExecutor(
+                        max_workers=1, initializer=set_progress_queue, initargs=(self.export_queue,))
+                future = self.export_pool.submit(export_file, pdf_path, set(self.pdf_reader.get_bookmarks()), xlsx_path)
+                self.export_job = (xlsx_path, future)
+                self.btn_split_xlsx.config(state=tk.DISABLED)
+                self.master.after(100, self.poll_export)
+        else:
+            messagebox.showwarning("Split to XLSX", "Please open a PDF and add bookmarks before splitting.")
+
+    def poll_export(self):
+        # Shows the latest progress on the button until the worker is done
+        xlsx_path, future = self.export_job
+        counts = None
+        try:
+            while True:
+                counts = self.export_queue.get_nowait()
+        except queue.Empty:
+            pass
+        if counts is not None:
+            self.btn_split_xlsx.config(text="Split to XLSX ({}/{})".format(*counts))
+        if not future.done():
+            self.master.after(100, self.poll_export)
+            return
+        self.export_job = None
+        self.btn_split_xlsx.config(text="Split to XLSX")
+        self.update_split_button_state()
+        try:
+            rows = future.result()
+        except Exception as e:
+            messagebox.showerror("Split to XLSX", f"Error exporting sections: {str(e)}")
+            return
+        messagebox.showinfo("Split to XLSX", f"{rows} sections exported to {xlsx_path}")
+
+    def toggle_profiling(self, event=None):
+        if self.profile_job is None:
+            profiler.enable()
+            self.profile_label.pack(side=tk.BOTTOM, fill=tk.X, before=self.pdf_reader.main_frame)
+            self.update_profile_label()
+        else:
+            self.master.after_cancel(self.profile_job)
+            self.profile_job = None
+            self.profile_label.pack_forget()
+            # Profiling switched on through the environment keeps running without the overlay
+            if not self.profile_from_env:
+                profiler.disable()
+
+    def update_profile_label(self):
+        self.profile_label.config(text=profiler.summary(["show_pages", "render_page", "split_pdf", "optimize_pdf"]))
+        self.profile_job = self.master.after(500, self.update_profile_label)
+
+    def save_trace(self, event=None):
+        file_path = filedialog.asksaveasfilename(defaultextension=".jsonl", filetypes=[("JSONL trace", "*.jsonl")])
+        if file_path:
+            count = profiler.dump_trace(file_path)
+            print(profiler.report())
+            messagebox.showinfo("Save Trace", f"{count} spans written to {file_path}")
+
+    def on_close(self):
+        # Writes bookmarks still waiting for their batched commit
+        if self.profile_job is not None:
+            self.master.after_cancel(self.profile_job)
+        if self.export_pool is not None:
+            self.export_pool.shutdown(wait=False, cancel_futures=True)
+        self.pdf_reader.close()
+        self.library.close()
+        self.master.destroy()
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = MainApp(root)
@@ -0,0 +1,98 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
+from PIL import Image
+from pdf_core.page_cache import cache_key, shared_cache
+from pdf_core.profiling import profiler
+from pdf_core.rendering import render_page
+
+
+# MuPDF is not thread safe, so pages are rasterized in a small process pool. Finished
+# pages are collected on the Tk main loop with master.after() polling and reported
+# through on_rendered(page_num). Rendered pages live in the shared page cache, keyed by
+# the zoom they were rendered at.
+# The time from request to arrival of each page is recorded as the render_page span.
+class PageRenderer:
+    def __init__(self, master, on_rendered, workers=2, poll_ms=10, cache=shared_cache):
+        self.master = master
+        self.on_rendered = on_rendered
+        self.workers = workers
+        self.poll_ms = poll_ms
+        self.cache = cache
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+
+        self.file_path = None
+        self.mtime = None
+        self.zoom = 1.0
+        self.wanted = []
+        self.running = {}
+        self.submitted = {}
+        self.polling = False
+
+    def open(self, file_path):
+        for future in self.running.values():
+            future.cancel()
+        self.file_path = file_path
+        self.mtime = os.path.getmtime(file_path)
+        self.wanted = []
+        self.running = {}
+        self.submitted = {}
+
+    def set_zoom(self, zoom):
+        # Work for the old zoom is dropped; pages already cached at it simply age out
+        if zoom != self.zoom:
+            for future in self.running.values():
+                future.cancel()
+            self.zoom = zoom
+            self.wanted = []
+            self.running = {}
+            self.submitted = {}
+
+    def key(self, page_num):
+        return cache_key(self.file_path, self.mtime, page_num, self.zoom)
+
+    def request(self, visible, prefetch=()):
+        # Pending work outside the requested pages is dropped
+        self.wanted = [p for p in list(visible) + list(prefetch)
+                       if self.key(p) not in self.cache and p not in self.running]
+        self.submit()
+
+    def get(self, page_num):
+        return self.cache.get(self.key(page_num))
+
+    def submit(self):
+        while self.wanted and len(self.running) < self.workers:
+            page_num = self.wanted.pop(0)
+            self.running[page_num] = self.pool.submit(render_page, self.file_path, self.mtime, page_num, self.zoom)
+            self.submitted[page_num] = time.perf_counter()
+        if self.running and not self.polling:
+            self.polling = True
+            self.master.after(self.poll_ms, self.poll)
+
+    def poll(self):
+        self.polling = False
+        for page_num, future in list(self.running.items()):
+            if not future.done():
+                continue
+            del self.running[page_num]
+            started = self.submitted.pop(page_num)
+            if future.cancelled() or future.exception() is not None:
+                continue
+            width, height, samples = future.result()
+            img = Image.frombytes("RGB", [width, height], samples)
+            self.cache.put(self.key(page_num), img, len(samples))
+            profiler.record("render_page", time.perf_counter() - started, page=page_num)
+            self.on_rendered(page_num)
+        self.submit()
+
+    def release(self):
+        # Workers keep their last document open, which on Windows blocks replacing or
+        # deleting the file; a fresh pool starts with none open
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.wanted = []
+        self.running = {}
+        self.submitted = {}
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -1,9 +1,20 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import fitz
-from PIL import Image, ImageTk
+from PIL import ImageTk
 import os
-import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+import app_paths
+app_paths.setup()
+from pdf_core.bookmark_store import BookmarkStore
+from pdf_core.file_index import DirectoryIndex, DirectoryWatcher
+from pdf_core.page_layout import PageLayout, page_sizes
+from pdf_core.profiling import timed
+from pdf_core.search_index import SearchIndex
+from pdf_core.split_detection import detect_split_points, summarize
+from page_renderer import PageRenderer
+from thumbnail_store import ThumbnailStore
 
 class PDFReader:
     def __init__(self, master, pdf_dir):
@@ -17,10 +28,33 @@ class PDFReader:
         self.view_mode = True
 
         self.bookmark_changed_callback = None
+        self.flush_job = None
+        self.detect_pool = None
+        self.detect_job = None
+        self.renderer = PageRenderer(self.master, self.on_page_rendered)
+        self.file_index = DirectoryIndex(self.pdf_dir)
+        self.file_watcher = None
+        self.file_poll_job = None
+
+        # Continuous view: page positions come from the layout, and only the pages that
+        # meet the viewport own canvas items, recycled through free_slots as they scroll out
+        self.layout = None
+        self.columns = 4
+        self.visible = range(0)
+        self.slots = {}
+        self.free_slots = []
+        self.viewport_job = None
+        self.resize_job = None
+
+        self.search_hits = []
 
         self.setup_ui()
         self.setup_database()
 
+        # The first scan runs in the watcher thread; the tree fills in as poll_file_tree applies it
+        self.file_watcher = DirectoryWatcher(self.file_index)
+        self.poll_file_tree()
+
     def setup_ui(self):
         self.main_frame = tk.PanedWindow(self.master, orient=tk.HORIZONTAL)
         self.main_frame.pack(fill=tk.BOTH, expand=True)
@@ -29,6 +63,21 @@ class PDFReader:
         self.file_frame = tk.Frame(self.main_frame, width=200)
         self.main_frame.add(self.file_frame)
 
+        # Full-text search over the library; selecting a hit opens the file at that page
+        self.search_entry = tk.Entry(self.file_frame)
+        self.search_entry.pack(side=tk.TOP, fill=tk.X)
+        self.search_entry.bind("<Return>", self.run_search)
+
+        self.search_label = tk.Label(self.file_frame, anchor=tk.W)
+        self.search_label.pack(side=tk.BOTTOM, fill=tk.X)
+
+        self.search_results = ttk.Treeview(self.file_frame, columns=("File", "Page", "Match"), show="headings", height=8)
+        for column, width in (("File", 120), ("Page", 40), ("Match", 300)):
+            self.search_results.heading(column, text=column)
+            self.search_results.column(column, width=width, stretch=column == "Match")
+        self.search_results.pack(side=tk.BOTTOM, fill=tk.X)
+        self.search_results.bind('<<TreeviewSelect>>', self.on_search_select)
+
         self.file_tree = ttk.Treeview(self.file_frame)
         self.file_tree.pack(fill=tk.BOTH, expand=True)
         self.file_tree.bind('<<TreeviewSelect>>', self.on_file_select)
@@ -40,12 +89,16 @@ class PDFReader:
         self.canvas_frame = tk.Frame(self.pdf_frame)
         self.canvas_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.canvases = []
-        for i in range(4):
-            canvas = tk.Canvas(self.canvas_frame)
-            canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            canvas.bind("<Button-1>", lambda e, i=i: self.on_canvas_click(e, i))
-            self.canvases.append(canvas)
+        self.canvas = tk.Canvas(self.canvas_frame, bg="gray75", yscrollincrement=40)
+        self.scrollbar = tk.Scrollbar(self.canvas_frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Button-1>", self.on_canvas_click)
+        self.canvas.bind("<Configure>", self.on_canvas_resize)
+        self.canvas.bind("<MouseWheel>", lambda e: self.canvas.yview_scroll(-1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
 
         # Bookmark tree
         self.bookmark_frame = tk.Frame(self.pdf_frame)
@@ -65,54 +118,74 @@ class PDFReader:
         self.btn_next = tk.Button(self.button_frame, text="Next", command=self.next_page, state=tk.DISABLED)
         self.btn_next.pack(side=tk.LEFT)
 
+        self.page_entry = tk.Entry(self.button_frame, width=6)
+        self.page_entry.pack(side=tk.LEFT)
+        self.page_entry.bind("<Return>", self.on_page_entry)
+        tk.Button(self.button_frame, text="Go", command=self.on_page_entry).pack(side=tk.LEFT)
+
+        tk.Button(self.button_frame, text="Zoom In", command=lambda: self.set_columns(self.columns - 1)).pack(side=tk.LEFT)
+        tk.Button(self.button_frame, text="Zoom Out", command=lambda: self.set_columns(self.columns + 1)).pack(side=tk.LEFT)
+
         self.btn_bookmark = tk.Button(self.button_frame, text="Bookmark", command=self.toggle_bookmark_mode)
         self.btn_bookmark.pack(side=tk.LEFT)
 
         self.btn_remove_bookmark = tk.Button(self.button_frame, text="Remove Bookmark", command=self.remove_bookmark)
         self.btn_remove_bookmark.pack(side=tk.LEFT)
 
+        self.btn_detect = tk.Button(self.button_frame, text="Detect Splits", command=self.detect_splits)
+        self.btn_detect.pack(side=tk.LEFT)
+
         self.btn_delete_file = tk.Button(self.button_frame, text="Delete File", command=self.delete_file)
         self.btn_delete_file.pack(side=tk.LEFT)
 
         self.page_label = tk.Label(self.button_frame, text="Pages: 0-0 / 0")
         self.page_label.pack(side=tk.RIGHT)
 
-        self.update_file_tree()
-
     def setup_database(self):
-        self.conn = sqlite3.connect('bookmarks.db')
-        self.cursor = self.conn.cursor()
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS bookmarks
-            (filename TEXT, page INTEGER, PRIMARY KEY (filename, page))
-        ''')
-        self.conn.commit()
+        self.bookmark_store = BookmarkStore(app_paths.BOOKMARKS_DB)
+        self.thumbnails = ThumbnailStore(os.path.join(os.path.dirname(self.bookmark_store.db_path), 'thumbnails.db'))
+        self.search_index = SearchIndex(os.path.join(os.path.dirname(self.bookmark_store.db_path), 'search.db'))
 
     def update_file_tree(self):
-        self.file_tree.delete(*self.file_tree.get_children())
-        for root, dirs, files in os.walk(self.pdf_dir):
-            parent = ''
-            if root != self.pdf_dir:
-                parent = os.path.relpath(os.path.dirname(root), self.pdf_dir)
-            for file in sorted(files):
-                if file.endswith('.pdf'):
-                    file_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(file_path, self.pdf_dir)
-                    
-                    # Check if the file is a split file
-                    if "_split_" in file:
-                        parent_file = file.split("_split_")[0] + ".pdf"
-                        parent_path = os.path.join(os.path.dirname(relative_path), parent_file)
-                        
-                        # If parent doesn't exist in the tree, add it
-                        if not self.file_tree.exists(parent_path):
-                            self.file_tree.insert('', 'end', parent_path, text=parent_file, open=True)
-                        
-                        # Insert the split file as a child of its parent
-                        self.file_tree.insert(parent_path, 'end', relative_path, text=file)
-                    else:
-                        # Insert non-split files at the root level
-                        self.file_tree.insert('', 'end', relative_path, text=file, open=True)
+        # Rescans now, after this app wrote files; only folders that changed are listed
+        self.file_index.scan()
+        self.apply_file_changes()
+
+    def poll_file_tree(self):
+        self.apply_file_changes()
+        self.file_poll_job = self.master.after(500, self.poll_file_tree)
+
+    def apply_file_changes(self):
+        # Only the nodes that changed are touched; split files sit under their parent file.
+        # Files that appear or disappear are (re)indexed for search in the background.
+        for change in self.file_index.take_changes():
+            if change[0] == "insert":
+                _, parent, index, node_id, text = change
+                self.file_tree.insert(parent, index, node_id, text=text, open=True)
+            elif self.file_tree.exists(change[1]):
+                self.file_tree.delete(change[1])
+            node_id = change[3] if change[0] == "insert" else change[1]
+            if change[0] == "delete" or node_id in self.file_index.files:
+                self.search_index.ensure(os.path.join(self.pdf_dir, node_id))
+
+    def run_search(self, event=None):
+        start_time = time.perf_counter()
+        self.search_hits = self.search_index.search(self.search_entry.get())
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.search_results.delete(*self.search_results.get_children())
+        for i, (path, page, snippet) in enumerate(self.search_hits):
+            self.search_results.insert("", "end", iid=str(i), values=(os.path.basename(path), page + 1, snippet))
+        pending = self.search_index.pending()
+        self.search_label.config(text=f"{len(self.search_hits)} hits in {elapsed_ms:.0f} ms"
+                                      + (f" (still indexing {pending} files)" if pending else ""))
+
+    def on_search_select(self, event):
+        selection = self.search_results.selection()
+        if selection:
+            path, page, _ = self.search_hits[int(selection[0])]
+            if not self.pdf_document or os.path.abspath(self.pdf_document.name) != path:
+                self.open_pdf(path)
+            self.go_to_page(page)
 
     def on_file_select(self, event):
         selection = self.file_tree.selection()
@@ -122,59 +195,159 @@ class PDFReader:
 
     def open_pdf(self, file_path):
         self.pdf_document = fitz.open(file_path)
+        self.renderer.open(file_path)
+        self.thumbnails.ensure(file_path)
         self.current_page = 0
-        self.bookmarks = self.load_bookmarks(os.path.basename(file_path))
-        self.show_pages()
+        self.bookmarks = self.load_bookmarks(file_path)
+        self.layout = PageLayout(page_sizes(self.pdf_document), self.columns, max(self.canvas.winfo_width(), 200))
+        self.apply_layout(0)
         self.btn_prev.config(state=tk.NORMAL)
         self.btn_next.config(state=tk.NORMAL)
-        self.update_page_label()
         self.update_bookmark_tree()
 
-    def load_bookmarks(self, filename):
-        self.cursor.execute("SELECT page FROM bookmarks WHERE filename=?", (filename,))
-        return {row[0] for row in self.cursor.fetchall()}
+    def load_bookmarks(self, file_path):
+        return self.bookmark_store.load(file_path)
+
+    def save_bookmark(self, file_path, page):
+        self.bookmark_store.add(file_path, page)
+        self.schedule_flush()
+
+    def remove_bookmark_from_db(self, file_path, page):
+        self.bookmark_store.remove(file_path, page)
+        self.schedule_flush()
+
+    def schedule_flush(self):
+        # Clicks within a second of each other are written in one transaction
+        if self.flush_job is None:
+            self.flush_job = self.master.after(1000, self.flush_bookmarks)
+
+    def flush_bookmarks(self):
+        self.flush_job = None
+        self.bookmark_store.flush()
+
+    def apply_layout(self, first_page):
+        # After the layout changed: new scroll region and zoom, every slot redrawn, and the
+        # view scrolled back to first_page
+        self.recycle_slots(list(self.slots))
+        self.renderer.set_zoom(round(self.layout.zoom, 3))
+        self.canvas.configure(scrollregion=(0, 0, self.layout.width, self.layout.total_height))
+        self.canvas.yview_moveto(self.layout.page_top(first_page) / self.layout.total_height)
+        self.show_pages()
+
+    def on_canvas_resize(self, event):
+        # Re-layout once resizing stops, not on every Configure event
+        if self.resize_job is not None:
+            self.master.after_cancel(self.resize_job)
+        self.resize_job = self.master.after(150, self.relayout)
 
-    def save_bookmark(self, filename, page):
-        self.cursor.execute("INSERT OR IGNORE INTO bookmarks (filename, page) VALUES (?, ?)", (filename, page))
-        self.conn.commit()
+    def relayout(self, columns=None):
+        self.resize_job = None
+        if self.layout is not None:
+            self.layout.set_geometry(max(self.canvas.winfo_width(), 200), columns)
+            self.apply_layout(self.current_page)
 
-    def remove_bookmark_from_db(self, filename, page):
-        self.cursor.execute("DELETE FROM bookmarks WHERE filename=? AND page=?", (filename, page))
-        self.conn.commit()
+    def set_columns(self, columns):
+        self.columns = min(8, max(1, columns))
+        self.relayout(self.columns)
 
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self.viewport_job is None:
+            self.viewport_job = self.master.after_idle(self.show_pages)
+
+    @timed()
     def show_pages(self):
+        self.viewport_job = None
+        if not self.pdf_document:
+            self.recycle_slots(list(self.slots))
+            self.canvas.configure(scrollregion=(0, 0, 0, 0))
+            return
+
+        top = self.canvas.canvasy(0)
+        height = self.canvas.winfo_height()
+        self.visible = self.layout.pages_in(top, top + height)
+        if not self.visible:
+            return
+        self.current_page = self.visible.start
+        # Prefetch a screen below, then a screen above, so scrolling does not wait on MuPDF
+        prefetch = [p for p in self.layout.pages_in(top + height, top + 2 * height) if p not in self.visible]
+        prefetch += [p for p in reversed(self.layout.pages_in(top - height, top)) if p not in self.visible]
+        self.renderer.request(self.visible, prefetch)
+
+        self.recycle_slots([p for p in self.slots if p not in self.visible])
+        for page_num in self.visible:
+            self.draw_page(page_num)
+        self.update_page_label()
+
+    def recycle_slots(self, page_nums):
+        for page_num in page_nums:
+            slot = self.slots.pop(page_num)
+            for item in slot["items"]:
+                self.canvas.itemconfigure(item, state=tk.HIDDEN)
+            slot["photo"] = None
+            slot["full"] = False
+            self.free_slots.append(slot)
+
+    def draw_page(self, page_num):
+        slot = self.slots.get(page_num)
+        if slot is None:
+            slot = self.free_slots.pop() if self.free_slots else {
+                "items": (self.canvas.create_rectangle(0, 0, 0, 0, fill="white", outline="gray50"),
+                          self.canvas.create_image(0, 0, anchor=tk.NW),
+                          self.canvas.create_rectangle(0, 0, 20, 20, outline="red", fill="red")),
+                "photo": None, "full": False,
+            }
+            self.slots[page_num] = slot
+            x0, y0, x1, y1 = self.layout.page_rect(page_num)
+            background, image, marker = slot["items"]
+            self.canvas.coords(background, x0, y0, x1, y1)
+            self.canvas.coords(image, x0, y0)
+            self.canvas.coords(marker, x0, y0, x0 + 20, y0 + 20)
+            self.canvas.itemconfigure(background, state=tk.NORMAL)
+            self.canvas.itemconfigure(image, state=tk.NORMAL, image="")
+
+        if not slot["full"]:
+            img = self.renderer.get(page_num)
+            slot["full"] = img is not None
+            if img is None and slot["photo"] is None:
+                # Show the stored thumbnail, blown up to page size, until the full render arrives
+                thumbnail = self.thumbnails.get(self.pdf_document.name, page_num)
+                if thumbnail is not None:
+                    x0, y0, x1, y1 = self.layout.page_rect(page_num)
+                    img = thumbnail[0].resize((x1 - x0, y1 - y0))
+            if img is not None:
+                slot["photo"] = ImageTk.PhotoImage(img)
+                self.canvas.itemconfigure(slot["items"][1], image=slot["photo"])
+        self.draw_bookmarks(page_num)
+
+    def on_page_rendered(self, page_num):
+        if self.pdf_document and page_num in self.slots:
+            self.draw_page(page_num)
+
+    def go_to_page(self, page_num):
         if self.pdf_document:
-            for i in range(4):
-                page_num = self.current_page + i
-                if page_num < len(self.pdf_document):
-                    page = self.pdf_document[page_num]
-                    pix = page.get_pixmap()
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    photo = ImageTk.PhotoImage(img)
-                    self.canvases[i].delete("all")
-                    self.canvases[i].create_image(0, 0, anchor=tk.NW, image=photo)
-                    self.canvases[i].image = photo
-                    self.draw_bookmarks(i)
-                else:
-                    self.canvases[i].delete("all")
+            page_num = min(max(page_num, 0), len(self.pdf_document) - 1)
+            self.canvas.yview_moveto(self.layout.page_top(page_num) / self.layout.total_height)
+            self.show_pages()
+
+    def on_page_entry(self, event=None):
+        try:
+            self.go_to_page(int(self.page_entry.get()) - 1)
+        except ValueError:
+            pass
 
     def prev_page(self):
-        if self.current_page > 0:
-            self.current_page -= 4
-            if self.current_page < 0:
-                self.current_page = 0
-            self.show_pages()
-            self.update_page_label()
+        # One row up or down; the scroll bar, wheel and page box move freely
+        self.go_to_page(self.current_page - self.layout.columns)
 
     def next_page(self):
-        if self.current_page + 4 < len(self.pdf_document):
-            self.current_page += 4
-            self.show_pages()
-            self.update_page_label()
+        self.go_to_page(self.current_page + self.layout.columns)
 
     def update_page_label(self):
-        end_page = min(self.current_page + 3, len(self.pdf_document) - 1)
-        self.page_label.config(text=f"Pages: {self.current_page + 1}-{end_page + 1} / {len(self.pdf_document)}")
+        if not self.pdf_document:
+            self.page_label.config(text="Pages: 0-0 / 0")
+            return
+        self.page_label.config(text=f"Pages: {self.visible.start + 1}-{self.visible.stop} / {len(self.pdf_document)}")
 
     def toggle_bookmark_mode(self):
         self.bookmark_mode = not self.bookmark_mode
@@ -183,24 +356,21 @@ class PDFReader:
         else:
             self.btn_bookmark.config(relief=tk.RAISED)
 
-    def on_canvas_click(self, event, canvas_index):
+    def on_canvas_click(self, event):
         if self.bookmark_mode and self.pdf_document:
-            page_num = self.current_page + canvas_index
-            if page_num not in self.bookmarks:
+            page_num = self.layout.page_at(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+            if page_num is not None and page_num not in self.bookmarks:
                 self.bookmarks.add(page_num)
-                self.save_bookmark(os.path.basename(self.pdf_document.name), page_num)
-                self.draw_bookmarks(canvas_index)
+                self.save_bookmark(self.pdf_document.name, page_num)
+                self.draw_bookmarks(page_num)
                 self.update_bookmark_tree()
                 if self.bookmark_changed_callback:
                     self.bookmark_changed_callback()
 
-    def draw_bookmarks(self, canvas_index):
-        page_num = self.current_page + canvas_index
-        if page_num in self.bookmarks:
-            self.canvases[canvas_index].create_rectangle(
-                0, 0, 20, 20,
-                outline="red", fill="red"
-            )
+    def draw_bookmarks(self, page_num):
+        slot = self.slots.get(page_num)
+        if slot is not None:
+            self.canvas.itemconfigure(slot["items"][2], state=tk.NORMAL if page_num in self.bookmarks else tk.HIDDEN)
 
     def update_bookmark_tree(self):
         self.bookmark_tree.delete(*self.bookmark_tree.get_children())
@@ -214,27 +384,108 @@ class PDFReader:
             page_str = item['values'][0]
             page_num = int(page_str.split()[1]) - 1
             self.bookmarks.remove(page_num)
-            self.remove_bookmark_from_db(os.path.basename(self.pdf_document.name), page_num)
+            self.remove_bookmark_from_db(self.pdf_document.name, page_num)
+            self.update_bookmark_tree()
+            self.show_pages()
+            if self.bookmark_changed_callback:
+                self.bookmark_changed_callback()
+
+    def detect_splits(self):
+        # Runs in a worker process; the result is picked up by poll_detection
+        if not self.pdf_document or self.detect_job is not None:
+            return
+        if self.detect_pool is None:
+            self.detect_pool = ProcessPoolExecutor(max_workers=1)
+        file_path = self.pdf_document.name
+        self.detect_job = (file_path, self.detect_pool.submit(detect_split_points, file_path))
+        self.btn_detect.config(state=tk.DISABLED)
+        self.master.after(100, self.poll_detection)
+
+    def poll_detection(self):
+        file_path, future = self.detect_job
+        if not future.done():
+            self.master.after(100, self.poll_detection)
+            return
+        self.detect_job = None
+        self.btn_detect.config(state=tk.NORMAL)
+        if future.cancelled():
+            # Dropped by release_file
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            messagebox.showerror("Detect Splits", f"Error detecting split points: {str(e)}")
+            return
+
+        is_open = self.pdf_document is not None and self.pdf_document.name == file_path
+        bookmarks = self.bookmarks if is_open else self.load_bookmarks(file_path)
+        new_pages = sorted(set(result["pages"]) - bookmarks)
+        for page_num in new_pages:
+            bookmarks.add(page_num)
+            self.save_bookmark(file_path, page_num)
+        if is_open:
             self.update_bookmark_tree()
             self.show_pages()
             if self.bookmark_changed_callback:
                 self.bookmark_changed_callback()
+        messagebox.showinfo("Detect Splits", f"{len(new_pages)} bookmarks added. {summarize(result)}")
 
     def delete_file(self):
         selection = self.file_tree.selection()
         if selection:
             file_path = os.path.join(self.pdf_dir, selection[0])
-            self.file_tree.delete(selection[0])
+            # The index queues the node's removal behind any change still waiting to be applied
+            self.file_index.forget(selection[0])
+            self.apply_file_changes()
             if self.pdf_document and self.pdf_document.name == file_path:
-                self.pdf_document = None
-                self.current_page = 0
-                self.bookmarks = set()
-                self.show_pages()
-                self.btn_prev.config(state=tk.DISABLED)
-                self.btn_next.config(state=tk.DISABLED)
-                self.update_page_label()
-                self.update_bookmark_tree()
-                
+                self.close_document()
+
+    def close_document(self, release_workers=False):
+        # Empties the view and closes the open file; release_workers also closes it in the
+        # render workers, so the file can be replaced even on Windows
+        self.bookmark_store.flush()
+        if self.pdf_document:
+            self.pdf_document.close()
+        self.pdf_document = None
+        self.layout = None
+        self.current_page = 0
+        self.visible = range(0)
+        self.bookmarks = set()
+        self.show_pages()
+        self.btn_prev.config(state=tk.DISABLED)
+        self.btn_next.config(state=tk.DISABLED)
+        self.update_page_label()
+        self.update_bookmark_tree()
+        if release_workers:
+            self.renderer.release()
+
+    def release_file(self, file_path):
+        # Background jobs reading file_path are cancelled or waited for, so that, with the
+        # render workers released by close_document, no process has it open
+        self.thumbnails.release(file_path)
+        self.search_index.release(file_path)
+        if self.detect_job is not None and os.path.abspath(self.detect_job[0]) == os.path.abspath(file_path):
+            future = self.detect_job[1]
+            if not future.cancel():
+                wait([future])
 
     def get_bookmarks(self):
-        return self.bookmarks
\ No newline at end of file
+        return self.bookmarks
+
+    def close(self):
+        for job in (self.viewport_job, self.resize_job):
+            if job is not None:
+                self.master.after_cancel(job)
+        if self.file_poll_job is not None:
+            self.master.after_cancel(self.file_poll_job)
+            self.file_poll_job = None
+        self.file_watcher.stop()
+        if self.flush_job is not None:
+            self.master.after_cancel(self.flush_job)
+            self.flush_job = None
+        if self.detect_pool is not None:
+            self.detect_pool.shutdown(wait=False, cancel_futures=True)
+        self.bookmark_store.close()
+        self.thumbnails.close()
+        self.search_index.close()
+        self.renderer.close()
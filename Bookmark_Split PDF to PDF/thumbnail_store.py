@@ -0,0 +1,117 @@
+from concurrent.futures import ProcessPoolExecutor, wait
+import io
+import os
+import sqlite3
+import fitz
+from PIL import Image
+from pdf_core.page_cache import PageCache
+
+THUMBNAIL_ZOOM = 0.25
+
+
+def setup_tables(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS thumbnail_files
+        (path TEXT PRIMARY KEY, mtime REAL, size INTEGER, page_count INTEGER)
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS thumbnails
+        (path TEXT, page INTEGER, zoom REAL, data BLOB, PRIMARY KEY (path, page))
+    ''')
+    conn.commit()
+
+
+def generate_thumbnails(db_path, file_path, zoom=THUMBNAIL_ZOOM, batch_size=32):
+    # Runs in a worker process; commits every batch_size pages so the viewer can use
+    # thumbnails while the rest of the document is still being rendered
+    stat = os.stat(file_path)
+    conn = sqlite3.connect(db_path, timeout=30)
+    doc = fitz.open(file_path)
+    try:
+        row = conn.execute("SELECT mtime, size FROM thumbnail_files WHERE path=?", (file_path,)).fetchone()
+        if row != (stat.st_mtime, stat.st_size):
+            with conn:
+                conn.execute("DELETE FROM thumbnails WHERE path=?", (file_path,))
+                conn.execute("INSERT OR REPLACE INTO thumbnail_files (path, mtime, size, page_count) VALUES (?, ?, ?, ?)",
+                             (file_path, stat.st_mtime, stat.st_size, len(doc)))
+        done = {r[0] for r in conn.execute("SELECT page FROM thumbnails WHERE path=?", (file_path,))}
+
+        matrix = fitz.Matrix(zoom, zoom)
+        rows = []
+        for page_num in range(len(doc)):
+            if page_num in done:
+                continue
+            pix = doc[page_num].get_pixmap(matrix=matrix)
+            rows.append((file_path, page_num, zoom, pix.tobytes("png")))
+            if len(rows) >= batch_size:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO thumbnails (path, page, zoom, data) VALUES (?, ?, ?, ?)", rows)
+                rows = []
+        if rows:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO thumbnails (path, page, zoom, data) VALUES (?, ?, ?, ?)", rows)
+        return len(doc) - len(done)
+    finally:
+        doc.close()
+        conn.close()
+
+
+# Low-resolution page images kept in a SQLite file next to bookmarks.db. Thumbnails are
+# generated once per file in a background process and thrown away when the file's
+# mtime or size changes. Decoded thumbnails are kept in a small LRU, and a file's mtime
+# and size are read when it is opened (ensure), not on every draw.
+class ThumbnailStore:
+    def __init__(self, db_path='thumbnails.db', cache_bytes=32 * 1024 * 1024):
+        self.db_path = os.path.abspath(db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        # WAL lets the viewer read while the worker process writes
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        setup_tables(self.conn)
+        self.pool = ProcessPoolExecutor(max_workers=1)
+        self.jobs = {}
+        self.cache = PageCache(cache_bytes)
+        self.file_stats = {}
+
+    def file_stat(self, file_path, refresh=False):
+        file_stat = self.file_stats.get(file_path)
+        if file_stat is None or refresh:
+            stat = os.stat(file_path)
+            file_stat = self.file_stats[file_path] = (stat.st_mtime, stat.st_size)
+        return file_stat
+
+    def ensure(self, file_path):
+        file_path = os.path.abspath(file_path)
+        self.file_stat(file_path, refresh=True)
+        job = self.jobs.get(file_path)
+        if job is None or job.done():
+            self.jobs[file_path] = self.pool.submit(generate_thumbnails, self.db_path, file_path)
+
+    def release(self, file_path):
+        # Like SearchIndex.release: after this no worker has the file open
+        job = self.jobs.pop(os.path.abspath(file_path), None)
+        if job is not None and not job.cancel():
+            wait([job])
+
+    def get(self, file_path, page_num):
+        file_path = os.path.abspath(file_path)
+        mtime, size = self.file_stat(file_path)
+        key = (file_path, mtime, size, page_num)
+        thumbnail = self.cache.get(key)
+        if thumbnail is not None:
+            return thumbnail
+        row = self.conn.execute('''
+            SELECT t.zoom, t.data FROM thumbnails t JOIN thumbnail_files f ON f.path = t.path
+            WHERE t.path=? AND t.page=? AND f.mtime=? AND f.size=?
+        ''', (file_path, page_num, mtime, size)).fetchone()
+        if row is None:
+            return None
+        zoom, data = row
+        img = Image.open(io.BytesIO(data))
+        img.load()
+        thumbnail = (img, zoom)
+        self.cache.put(key, thumbnail, img.width * img.height * len(img.getbands()))
+        return thumbnail
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.conn.close()
@@ -1,18 +1,184 @@
 import sys
-from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QFileDialog, QLabel, QScrollArea, QGridLayout, QListWidget, QListWidgetItem
-from PyQt5.QtGui import QPixmap, QImage
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QFileDialog, QLabel, QAbstractScrollArea, QLineEdit, QListWidget, QListWidgetItem, QMessageBox, QShortcut
+from PyQt5.QtGui import QPixmap, QImage, QKeySequence, QPainter, QColor
+from PyQt5.QtCore import QRect, QTimer
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import app_paths
+app_paths.setup()
+from pdf_core.page_cache import cache_key, shared_cache
+from pdf_core.page_layout import PageLayout, page_sizes
+from pdf_core.profiling import profiler, timed
+from pdf_core.rendering import render_page
+from pdf_core.sections import export_sections
+from pdf_core.split_detection import detect_split_points, summarize
+from pdf_core.text_extraction import TextExtractor
 import fitz  # PyMuPDF
-import openpyxl
+
+class PageView(QAbstractScrollArea):
+    # Continuous scroll view over the whole document. Page positions come from PageLayout,
+    # and paintEvent draws only the pages that meet the viewport, so no widget exists per
+    # page and the cost follows the viewport size, not the page count. Pages not rendered
+    # yet are drawn as blank placeholders and rasterized in a process pool, as in the Tk
+    # viewer's PageRenderer; a QTimer collects them and repaints.
+    def __init__(self, on_page_clicked, columns=3, workers=2):
+        super().__init__()
+        self.on_page_clicked = on_page_clicked
+        self.columns = columns
+        self.pdf_document = None
+        self.pdf_mtime = None
+        self.page_layout = None
+        self.bookmarks = set()
+        self.verticalScrollBar().setSingleStep(40)
+
+        self.workers = workers
+        self.render_pool = None
+        self.wanted = []
+        self.running = {}
+        self.submitted = {}
+        self.render_timer = QTimer(self)
+        self.render_timer.timeout.connect(self.collect_pages)
+
+        # Re-layout once the window stops resizing, not on every resizeEvent
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.timeout.connect(self.relayout)
+
+    def set_document(self, pdf_document, pdf_mtime):
+        for future in self.running.values():
+            future.cancel()
+        self.wanted = []
+        self.running = {}
+        self.submitted = {}
+        self.pdf_document = pdf_document
+        self.pdf_mtime = pdf_mtime
+        self.page_layout = PageLayout(page_sizes(pdf_document), self.columns, max(self.viewport().width(), 200))
+        self.update_scroll_range()
+        self.scroll_to_page(0)
+        self.viewport().update()
+
+    def relayout(self, columns=None):
+        if self.page_layout is not None:
+            first_page = self.first_visible_page()
+            self.page_layout.set_geometry(max(self.viewport().width(), 200), columns)
+            self.update_scroll_range()
+            self.scroll_to_page(first_page)
+            self.viewport().update()
+
+    def set_columns(self, columns):
+        self.columns = min(8, max(1, columns))
+        self.relayout(self.columns)
+
+    def update_scroll_range(self):
+        bar = self.verticalScrollBar()
+        bar.setRange(0, max(0, self.page_layout.total_height - self.viewport().height()))
+        bar.setPageStep(self.viewport().height())
+
+    def visible_pages(self):
+        if self.page_layout is None:
+            return range(0)
+        top = self.verticalScrollBar().value()
+        return self.page_layout.pages_in(top, top + self.viewport().height())
+
+    def first_visible_page(self):
+        visible = self.visible_pages()
+        return visible.start if visible else 0
+
+    def scroll_to_page(self, page_num):
+        if self.page_layout is not None and self.page_layout.page_count:
+            page_num = min(max(page_num, 0), self.page_layout.page_count - 1)
+            self.verticalScrollBar().setValue(self.page_layout.page_top(page_num))
+
+    def page_key(self, page_num):
+        return cache_key(self.pdf_document.name, self.pdf_mtime, page_num, round(self.page_layout.zoom, 3))
+
+    def request_pages(self, keys):
+        # Pending work for pages that scrolled away or for another zoom is dropped
+        self.wanted = [key for key in keys if key not in self.running]
+        if self.render_pool is None:
+            self.render_pool = ProcessPoolExecutor(max_workers=self.workers)
+        while self.wanted and len(self.running) < self.workers:
+            key = self.wanted.pop(0)
+            file_path, mtime, page_num, zoom = key[:4]
+            self.running[key] = self.render_pool.submit(render_page, file_path, mtime, page_num, zoom)
+            self.submitted[key] = time.perf_counter()
+        if self.running and not self.render_timer.isActive():
+            self.render_timer.start(10)
+
+    def collect_pages(self):
+        arrived = False
+        for key, future in list(self.running.items()):
+            if not future.done():
+                continue
+            del self.running[key]
+            started = self.submitted.pop(key)
+            if future.cancelled() or future.exception() is not None:
+                continue
+            width, height, samples = future.result()
+            # fromImage makes the only copy of the samples
+            pixmap = QPixmap.fromImage(QImage(samples, width, height, width * 3, QImage.Format_RGB888))
+            shared_cache.put(key, pixmap, pixmap.width() * pixmap.height() * 4)
+            profiler.record("render_page", time.perf_counter() - started, page=key[2])
+            arrived = True
+        if not self.running:
+            self.render_timer.stop()
+        if arrived:
+            # The repaint requests whatever is still missing
+            self.viewport().update()
+        elif self.wanted:
+            self.request_pages(self.wanted)
+
+    def stop_rendering(self):
+        self.render_timer.stop()
+        if self.render_pool is not None:
+            self.render_pool.shutdown(wait=False, cancel_futures=True)
+
+    @timed("paint_pages")
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.fillRect(event.rect(), QColor("gray"))
+        top = self.verticalScrollBar().value()
+        missing = []
+        for page_num in self.visible_pages():
+            x0, y0, x1, y1 = self.page_layout.page_rect(page_num)
+            target = QRect(x0, y0 - top, x1 - x0, y1 - y0)
+            if not target.intersects(event.rect()):
+                continue
+            key = self.page_key(page_num)
+            pixmap = shared_cache.get(key)
+            if pixmap is None:
+                painter.fillRect(target, QColor("white"))
+                missing.append(key)
+            else:
+                painter.drawPixmap(target, pixmap)
+            if page_num in self.bookmarks:
+                painter.fillRect(QRect(x0, y0 - top, 20, 20), QColor("red"))
+        painter.end()
+        if missing:
+            self.request_pages(missing)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resize_timer.start(150)
+
+    def mousePressEvent(self, event):
+        if self.page_layout is not None:
+            page_num = self.page_layout.page_at(event.x(), event.y() + self.verticalScrollBar().value())
+            if page_num is not None:
+                self.on_page_clicked(page_num)
 
 class PDFReaderApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.initUI()
+        self.extractor = TextExtractor()
         self.pdf_document = None
-        self.current_page = 0
         self.bookmarks = set()
+        self.page_view.bookmarks = self.bookmarks
         self.bookmark_mode = False
+        self.detect_pool = None
+        self.detect_job = None
 
     def initUI(self):
         self.setWindowTitle('PDF Reader')
@@ -36,29 +202,28 @@ class PDFReaderApp(QMainWindow):
         self.next_button = QPushButton('Next')
         self.bookmark_toggle = QPushButton('Toggle Bookmark Mode')
         self.export_button = QPushButton('Export XLSX')
+        self.detect_button = QPushButton('Detect Splits')
+        self.page_edit = QLineEdit()
+        self.page_edit.setPlaceholderText('Go to page')
+        self.page_edit.setMaximumWidth(90)
+        self.zoom_in_button = QPushButton('Zoom In')
+        self.zoom_out_button = QPushButton('Zoom Out')
 
         button_layout.addWidget(self.load_button)
         button_layout.addWidget(self.prev_button)
         button_layout.addWidget(self.next_button)
         button_layout.addWidget(self.bookmark_toggle)
         button_layout.addWidget(self.export_button)
+        button_layout.addWidget(self.detect_button)
+        button_layout.addWidget(self.page_edit)
+        button_layout.addWidget(self.zoom_in_button)
+        button_layout.addWidget(self.zoom_out_button)
 
         left_layout.addLayout(button_layout)
 
         # PDF display
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_content = QWidget()
-        self.scroll_layout = QGridLayout(self.scroll_content)
-        self.scroll_area.setWidget(self.scroll_content)
-        left_layout.addWidget(self.scroll_area)
-
-        self.page_labels = [QLabel() for _ in range(3)]
-        for i, label in enumerate(self.page_labels):
-            label.setAlignment(Qt.AlignCenter)
-            label.setScaledContents(True)
-            label.mousePressEvent = lambda event, index=i: self.page_clicked(index)
-            self.scroll_layout.addWidget(label, 0, i)
+        self.page_view = PageView(self.page_clicked)
+        left_layout.addWidget(self.page_view)
 
         main_layout.addWidget(left_panel, 4)  # Left panel takes 4/5 of the width
 
@@ -85,70 +250,62 @@ class PDFReaderApp(QMainWindow):
         self.next_button.clicked.connect(self.next_pages)
         self.bookmark_toggle.clicked.connect(self.toggle_bookmark_mode)
         self.export_button.clicked.connect(self.export_xlsx)
+        self.detect_button.clicked.connect(self.detect_splits)
+        self.page_edit.returnPressed.connect(self.go_to_page)
+        self.zoom_in_button.clicked.connect(lambda: self.page_view.set_columns(self.page_view.columns - 1))
+        self.zoom_out_button.clicked.connect(lambda: self.page_view.set_columns(self.page_view.columns + 1))
+
+        # Polls the split detection running in a worker process
+        self.detect_timer = QTimer(self)
+        self.detect_timer.timeout.connect(self.poll_detection)
+
+        # Timing overlay in the status bar: F12 shows or hides it, Shift+F12 saves the
+        # recent spans as JSONL
+        self.profile_from_env = profiler.enabled
+        self.profile_timer = QTimer(self)
+        self.profile_timer.timeout.connect(self.update_profile_status)
+        QShortcut(QKeySequence("F12"), self, self.toggle_profiling)
+        QShortcut(QKeySequence("Shift+F12"), self, self.save_trace)
 
     def load_pdf(self):
         file_name, _ = QFileDialog.getOpenFileName(self, "Open PDF file", "", "PDF files (*.pdf)")
         if file_name:
             self.pdf_document = fitz.open(file_name)
-            self.current_page = 0
-            self.update_display()
+            self.page_view.set_document(self.pdf_document, os.path.getmtime(file_name))
 
     def update_display(self):
-        if self.pdf_document:
-            available_width = self.scroll_area.width() - 30  # Subtract some padding
-            max_width_per_page = available_width // 3
-
-            for i in range(3):
-                page_num = self.current_page + i
-                if page_num < len(self.pdf_document):
-                    page = self.pdf_document[page_num]
-                    pix = page.get_pixmap()
-                    img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
-                    pixmap = QPixmap.fromImage(img)
-                    
-                    # Calculate the scaling factor to fit the width
-                    scale_factor = max_width_per_page / pixmap.width()
-                    new_height = int(pixmap.height() * scale_factor)
-                    
-                    scaled_pixmap = pixmap.scaled(max_width_per_page, new_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    self.page_labels[i].setPixmap(scaled_pixmap)
-                    self.page_labels[i].setFixedSize(QSize(max_width_per_page, new_height))
-                else:
-                    self.page_labels[i].clear()
-                    self.page_labels[i].setFixedSize(QSize(max_width_per_page, 1))  # Set minimum height
+        self.page_view.viewport().update()
 
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-        self.update_display()
+    def go_to_page(self):
+        try:
+            self.page_view.scroll_to_page(int(self.page_edit.text()) - 1)
+        except ValueError:
+            pass
 
     def prev_pages(self):
-        if self.current_page > 0:
-            self.current_page -= 3
-            self.update_display()
+        # One row up or down; the scroll bar and wheel move freely
+        self.page_view.scroll_to_page(self.page_view.first_visible_page() - self.page_view.columns)
 
     def next_pages(self):
-        if self.current_page + 3 < len(self.pdf_document):
-            self.current_page += 3
-            self.update_display()
+        self.page_view.scroll_to_page(self.page_view.first_visible_page() + self.page_view.columns)
 
     def toggle_bookmark_mode(self):
         self.bookmark_mode = not self.bookmark_mode
         self.bookmark_toggle.setText("Bookmark Mode: ON" if self.bookmark_mode else "Bookmark Mode: OFF")
 
-    def page_clicked(self, index):
+    def page_clicked(self, page_num):
         if self.bookmark_mode and self.pdf_document:
-            page_num = self.current_page + index
-            if page_num < len(self.pdf_document):
-                if page_num in self.bookmarks:
-                    self.bookmarks.remove(page_num)
-                else:
-                    self.bookmarks.add(page_num)
-                self.update_bookmark_list()
+            if page_num in self.bookmarks:
+                self.bookmarks.remove(page_num)
+            else:
+                self.bookmarks.add(page_num)
+            self.update_bookmark_list()
 
     def update_bookmark_list(self):
         self.bookmark_list.clear()
         for page_num in sorted(self.bookmarks):
             self.bookmark_list.addItem(QListWidgetItem(f"Page {page_num + 1}"))
+        self.update_display()
 
     def delete_selected_bookmark(self):
         selected_items = self.bookmark_list.selectedItems()
@@ -157,31 +314,75 @@ class PDFReaderApp(QMainWindow):
             self.bookmarks.remove(page_num)
         self.update_bookmark_list()
 
-    def export_xlsx(self):
-        if not self.pdf_document:
+    def detect_splits(self):
+        if not self.pdf_document or self.detect_job is not None:
             return
+        if self.detect_pool is None:
+            self.detect_pool = ProcessPoolExecutor(max_workers=1)
+        file_name = self.pdf_document.name
+        self.detect_job = (file_name, self.detect_pool.submit(detect_split_points, file_name))
+        self.detect_button.setEnabled(False)
+        self.detect_timer.start(100)
+
+    def poll_detection(self):
+        file_name, future = self.detect_job
+        if not future.done():
+            return
+        self.detect_timer.stop()
+        self.detect_job = None
+        self.detect_button.setEnabled(True)
+        try:
+            result = future.result()
+        except Exception as e:
+            QMessageBox.warning(self, "Detect Splits", f"Error detecting split points: {str(e)}")
+            return
+        if self.pdf_document is None or self.pdf_document.name != file_name:
+            return  # another PDF was loaded meanwhile
+        new_pages = set(result["pages"]) - self.bookmarks
+        self.bookmarks |= new_pages
+        self.update_bookmark_list()
+        QMessageBox.information(self, "Detect Splits", f"{len(new_pages)} bookmarks added. {summarize(result)}")
+
+    def toggle_profiling(self):
+        if not self.profile_timer.isActive():
+            profiler.enable()
+            self.update_profile_status()
+            self.profile_timer.start(500)
+        else:
+            self.profile_timer.stop()
+            self.statusBar().clearMessage()
+            # Profiling switched on through the environment keeps running without the overlay
+            if not self.profile_from_env:
+                profiler.disable()
+
+    def update_profile_status(self):
+        self.statusBar().showMessage(profiler.summary(["paint_pages", "render_page", "export_sections"]))
+
+    def save_trace(self):
+        file_name, _ = QFileDialog.getSaveFileName(self, "Save trace", "", "JSONL trace (*.jsonl)")
+        if file_name:
+            count = profiler.dump_trace(file_name)
+            print(profiler.report())
+            QMessageBox.information(self, "Save Trace", f"{count} spans written to {file_name}")
 
-        sorted_bookmarks = sorted(self.bookmarks)
-        sections = []
-
-        for i in range(len(sorted_bookmarks)):
-            start = sorted_bookmarks[i]
-            end = sorted_bookmarks[i+1] if i+1 < len(sorted_bookmarks) else len(self.pdf_document)
-            section_text = ""
-            for page_num in range(start, end):
-                page = self.pdf_document[page_num]
-                section_text += page.get_text()
-            sections.append(section_text)
+    def closeEvent(self, event):
+        if self.detect_pool is not None:
+            self.detect_pool.shutdown(wait=False, cancel_futures=True)
+        self.page_view.stop_rendering()
+        self.extractor.close()
+        super().closeEvent(event)
 
-        workbook = openpyxl.Workbook()
-        sheet = workbook.active
-        for i, section in enumerate(sections, start=1):
-            sheet.cell(row=i, column=1, value=section)
+    def export_xlsx(self):
+        if not self.pdf_document:
+            return
 
         file_name, _ = QFileDialog.getSaveFileName(self, "Save Excel file", "", "Excel files (*.xlsx)")
         if file_name:
-            workbook.save(file_name)
-            print(f"Exported to {file_name}")
+            self.extractor.reset_stats()
+            # Vietnamese and other non-ASCII text is kept; only characters Excel rejects are removed
+            rows = export_sections(self.pdf_document, self.bookmarks, file_name, self.extractor, keep_unicode=True,
+                                   separator="")
+            print(f"Exported {rows} sections to {file_name}. {self.extractor.summary()}")
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import fitz
+import openpyxl
+import app_paths
+app_paths.setup()
+from pdf_core.bench import peak_rss_mb
+from pdf_core.sections import export_sections
+from pdf_core.text_extraction import TextExtractor
+
+# Compares the old in-memory export_xlsx with the streaming export, serial and with parallel
+# text extraction, on a synthetic document.
+# Each variant runs in its own process so peak RSS is not shared between them.
+
+
+def make_document(path, pages):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 545, 790), f"Page {i}. " + "Lorem ipsum dolor sit amet. " * 120,
+                            fontsize=9)
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def export_in_memory(pdf_document, bookmarks, file_name):
+    # The export_xlsx implementation this benchmark replaces
+    sorted_bookmarks = sorted(bookmarks)
+    sections = []
+
+    for i in range(len(sorted_bookmarks)):
+        start = sorted_bookmarks[i]
+        end = sorted_bookmarks[i+1] if i+1 < len(sorted_bookmarks) else len(pdf_document)
+        section_text = ""
+        for page_num in range(start, end):
+            page = pdf_document[page_num]
+            section_text += page.get_text()
+        sections.append(section_text)
+
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for i, section in enumerate(sections, start=1):
+        sheet.cell(row=i, column=1, value=section)
+    workbook.save(file_name)
+
+
+def run_variant(variant, pdf_path, every, file_name):
+    pdf_document = fitz.open(pdf_path)
+    bookmarks = set(range(0, len(pdf_document), every))
+    start_time = time.perf_counter()
+    extractor = TextExtractor() if variant == "parallel" else None
+    if variant == "in-memory":
+        export_in_memory(pdf_document, bookmarks, file_name)
+    else:
+        export_sections(pdf_document, bookmarks, file_name, extractor, separator="")
+    if extractor is not None:
+        extractor.close()
+    return {
+        "seconds": round(time.perf_counter() - start_time, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "xlsx_mb": round(os.path.getsize(file_name) / (1024 * 1024), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark export_xlsx against the streaming export.")
+    parser.add_argument("--pdf", help="PDF to export (default: a generated document)")
+    parser.add_argument("--pages", type=int, default=5000, help="pages in the generated document")
+    parser.add_argument("--every", type=int, nargs="+", default=[50, 1000],
+                        help="bookmark every N pages; several values run several rounds")
+    parser.add_argument("--variant", choices=["in-memory", "streaming", "parallel"], help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.pdf, args.every[0], args.output)))
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="bench_export_")
+    try:
+        pdf_path = args.pdf
+        if not pdf_path:
+            pdf_path = os.path.join(work_dir, "document.pdf")
+            make_document(pdf_path, args.pages)
+        print(f"{pdf_path}: {os.path.getsize(pdf_path) / (1024 * 1024):.1f} MB")
+
+        for every in args.every:
+            print(f"bookmark every {every} pages")
+            for variant in ("in-memory", "streaming", "parallel"):
+                output = os.path.join(work_dir, f"{variant}.xlsx")
+                command = [sys.executable, os.path.abspath(__file__), "--variant", variant, "--pdf", pdf_path,
+                           "--every", str(every), "--output", output]
+                result = json.loads(subprocess.run(command, capture_output=True, text=True, check=True)
+                                    .stdout.strip().splitlines()[-1])
+                print(f"  {variant:10} {result['seconds']:8.3f}s  peak RSS {result['peak_rss_mb']:7.1f} MB  "
+                      f"{result['xlsx_mb']} MB xlsx")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+# GUI-free code shared by the three apps: split points and splitting, bookmark storage, folder and search indexing,
+# page rendering and caching, text extraction, cleaning and XLSX export, and profiling.
+# Each app folder's app_paths.setup() puts the repository root on sys.path.
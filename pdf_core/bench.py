@@ -0,0 +1,256 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import fitz
+from .corpus import KINDS, corpus_pdf
+from .rendering import pixmap_to_image, render_pixmap
+from .sections import export_sections
+from .splitting import PDFSplitter, get_split_points
+from .text_cleaning import clean_text_for_excel
+from .text_extraction import TextExtractor
+
+# Benchmarks the shared hot paths on the synthetic corpus and records wall time,
+# throughput and peak RSS as JSON, one file per run, so runs can be compared across
+# commits. Every benchmark runs in its own process so peak RSS is not shared.
+#
+#   python -m pdf_core.bench --pages 10 100 1000 --output before.json
+#   python -m pdf_core.bench compare before.json after.json
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOOKMARK_EVERY = 10
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize / (1024 * 1024)
+    # Include finished worker processes, e.g. of parallel splitting or extraction
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bookmarks_for(page_count):
+    return range(0, page_count, BOOKMARK_EVERY)
+
+
+# Each benchmark does its setup, untimed, and returns (run, count, unit): run() is the
+# timed part and count / seconds is the throughput in unit per second.
+
+
+def bench_split_points(pdf_path, work_dir, limit):
+    # Pure Python, so it is repeated until the timing is meaningful
+    with fitz.open(pdf_path) as doc:
+        page_count = len(doc)
+    bookmarks = list(bookmarks_for(page_count))
+    rounds = max(1, 200000 // len(bookmarks))
+
+    def run():
+        for _ in range(rounds):
+            get_split_points(bookmarks, page_count)
+    return run, len(get_split_points(bookmarks, page_count)) * rounds, "split points"
+
+
+def bench_split_pdf(pdf_path, work_dir, limit):
+    with fitz.open(pdf_path) as doc:
+        page_count = len(doc)
+
+    def run():
+        splitter = PDFSplitter(pdf_path, os.path.join(work_dir, "split"))
+        try:
+            splitter.split_pdf(bookmarks_for(page_count))
+        finally:
+            splitter.close()
+    return run, page_count, "pages"
+
+
+def bench_render(pdf_path, work_dir, limit):
+    # Full-size page images as PDFReader.show_pages shows them, for the first `limit` pages
+    with fitz.open(pdf_path) as doc:
+        pages = min(limit, len(doc))
+
+    def run():
+        with fitz.open(pdf_path) as doc:
+            for page_num in range(pages):
+                pixmap_to_image(render_pixmap(doc[page_num]))
+    return run, pages, "pages"
+
+
+def bench_extract(pdf_path, work_dir, limit):
+    # Every page through the worker pool, as PageTextStore.fill does before an export
+    with fitz.open(pdf_path) as doc:
+        page_count = len(doc)
+
+    def run():
+        extractor = TextExtractor()
+        try:
+            extractor.extract_pages(pdf_path)
+        finally:
+            extractor.close()
+    return run, page_count, "pages"
+
+
+def bench_export_xlsx(pdf_path, work_dir, limit):
+    with fitz.open(pdf_path) as doc:
+        page_count = len(doc)
+
+    def run():
+        with fitz.open(pdf_path) as doc:
+            export_sections(doc, bookmarks_for(page_count), os.path.join(work_dir, "sections.xlsx"))
+    return run, page_count, "pages"
+
+
+def bench_clean_text(pdf_path, work_dir, limit):
+    with fitz.open(pdf_path) as doc:
+        texts = [page.get_text() for page in doc]
+
+    def run():
+        for text in texts:
+            clean_text_for_excel(text)
+    return run, sum(len(text) for text in texts), "chars"
+
+
+BENCHMARKS = {
+    "split_points": bench_split_points,
+    "split_pdf": bench_split_pdf,
+    "render": bench_render,
+    "extract": bench_extract,
+    "export_xlsx": bench_export_xlsx,
+    "clean_text": bench_clean_text,
+}
+
+
+def run_benchmark(name, pdf_path, limit):
+    work_dir = tempfile.mkdtemp(prefix="pdf_core_bench_")
+    try:
+        run, count, unit = BENCHMARKS[name](pdf_path, work_dir, limit)
+        start_time = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start_time
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {
+        "seconds": round(seconds, 4),
+        "count": count,
+        "unit": unit,
+        "throughput": round(count / seconds, 1) if seconds else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args):
+    corpus_dir = args.corpus_dir or os.path.join(tempfile.gettempdir(), "pdf_core_corpus")
+    report = {
+        "commit": git_commit(),
+        "started": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "render_limit": args.render_limit,
+        "results": [],
+    }
+    for kind in args.kinds:
+        for pages in args.pages:
+            start_time = time.perf_counter()
+            pdf_path = corpus_pdf(corpus_dir, kind, pages)
+            print(f"{kind} {pages} pages: {os.path.getsize(pdf_path) / (1024 * 1024):.1f} MB "
+                  f"({time.perf_counter() - start_time:.1f}s to prepare)")
+            for name in args.benchmarks:
+                command = [sys.executable, "-m", "pdf_core.bench", "run", name, pdf_path,
+                           "--render-limit", str(args.render_limit)]
+                completed = subprocess.run(command, cwd=ROOT_DIR, capture_output=True, text=True)
+                if completed.returncode != 0:
+                    result = {"error": completed.stderr.strip().splitlines()[-1:]}
+                    print(f"  {name:12} failed: {result['error']}")
+                else:
+                    result = json.loads(completed.stdout.strip().splitlines()[-1])
+                    print(f"  {name:12} {result['seconds']:9.3f}s  {result['throughput'] or 0:12.0f} "
+                          f"{result['unit']}/s  peak RSS {result['peak_rss_mb']:7.1f} MB")
+                report["results"].append({"benchmark": name, "kind": kind, "pages": pages, **result})
+
+    output = args.output or f"bench_{report['commit'] or 'local'}_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+def compare(before_path, after_path):
+    with open(before_path, 'r', encoding='utf-8') as f:
+        before = json.load(f)
+    with open(after_path, 'r', encoding='utf-8') as f:
+        after = json.load(f)
+    print(f"{before.get('commit')} -> {after.get('commit')}")
+    old = {(r["benchmark"], r["kind"], r["pages"]): r for r in before["results"] if "seconds" in r}
+    for result in after["results"]:
+        key = (result["benchmark"], result["kind"], result["pages"])
+        if key in old and "seconds" in result and result["seconds"]:
+            speedup = old[key]["seconds"] / result["seconds"]
+            print(f"  {key[0]:12} {key[1]:8} {key[2]:6} pages  {old[key]['seconds']:9.3f}s -> "
+                  f"{result['seconds']:9.3f}s  {speedup:5.2f}x  peak RSS {old[key]['peak_rss_mb']} -> "
+                  f"{result['peak_rss_mb']} MB")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["run"]:
+        parser = argparse.ArgumentParser(prog="pdf_core.bench run")
+        parser.add_argument("benchmark", choices=list(BENCHMARKS))
+        parser.add_argument("pdf")
+        parser.add_argument("--render-limit", type=int, default=500)
+        args = parser.parse_args(argv[1:])
+        print(json.dumps(run_benchmark(args.benchmark, args.pdf, args.render_limit)))
+        return
+    if argv[:1] == ["compare"]:
+        parser = argparse.ArgumentParser(prog="pdf_core.bench compare")
+        parser.add_argument("before")
+        parser.add_argument("after")
+        args = parser.parse_args(argv[1:])
+        compare(args.before, args.after)
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark pdf_core on a synthetic PDF corpus.",
+                                     epilog="Subcommands: 'run BENCHMARK PDF' runs one benchmark in this process; "
+                                            "'compare BEFORE.json AFTER.json' prints the speedup per benchmark.")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000],
+                        help="document sizes to generate, e.g. 10 100 1000 10000")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--render-limit", type=int, default=500, help="pages rendered per document")
+    parser.add_argument("--corpus-dir", help="where generated PDFs are kept between runs (default: temp dir)")
+    parser.add_argument("-o", "--output", help="JSON results file (default: bench_<commit>_<time>.json)")
+    run_suite(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+from .file_hashes import cached_file_hash, setup_table
+
+# Page numbers in bookmarks.db, sidecars and manifests are 0-based, same as PDFReader.
+
+
+def read_pages_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return {int(page) for page in json.load(f)}
+
+
+def read_pages_csv(path):
+    pages = set()
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if row and row[0].strip().isdigit():
+                pages.add(int(row[0]))
+    return pages
+
+
+def load_sidecar(pdf_path):
+    # foo.pdf -> foo.json ([0, 12, 40]) or foo.csv (one page per row)
+    stem = os.path.splitext(pdf_path)[0]
+    if os.path.exists(stem + ".json"):
+        return read_pages_json(stem + ".json")
+    if os.path.exists(stem + ".csv"):
+        return read_pages_csv(stem + ".csv")
+    return None
+
+
+def load_manifest(manifest_path):
+    # JSON: {"a.pdf": [0, 12], ...}  CSV: rows of "pdf,page"
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = {}
+    if manifest_path.lower().endswith(".json"):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            for pdf, pages in json.load(f).items():
+                jobs.setdefault(os.path.join(base_dir, pdf), set()).update(int(p) for p in pages)
+    else:
+        with open(manifest_path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                if len(row) >= 2 and row[1].strip().isdigit():
+                    jobs.setdefault(os.path.join(base_dir, row[0].strip()), set()).add(int(row[1]))
+    return jobs
+
+
+# Bookmarks (0-based split pages) keyed by the PDF's content hash plus its absolute path,
+# so two files with the same name no longer share bookmarks and a copied or moved file
+# keeps its own. Writes are queued and written in one transaction by flush(); reads see
+# queued writes. Rows of the old basename-keyed bookmarks table are adopted the first
+# time a file without bookmarks under the new key is loaded.
+class BookmarkStore:
+    def __init__(self, db_path):
+        self.db_path = os.path.abspath(db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS bookmarks
+                (filename TEXT, page INTEGER, PRIMARY KEY (filename, page));
+            CREATE TABLE IF NOT EXISTS bookmark_files
+                (file_hash TEXT, path TEXT, PRIMARY KEY (file_hash, path));
+            CREATE TABLE IF NOT EXISTS file_bookmarks
+                (file_hash TEXT, path TEXT, page INTEGER, PRIMARY KEY (file_hash, path, page));
+            CREATE INDEX IF NOT EXISTS file_bookmarks_path ON file_bookmarks (path);
+        ''')
+        setup_table(self.conn)
+        self.conn.commit()
+        # (file_hash, path, page) -> True to add, False to remove
+        self.pending = {}
+
+    def file_key(self, pdf_path):
+        # Hashes are cached by (mtime, size) so a file is only read again after it changes
+        path = os.path.abspath(pdf_path)
+        if not os.path.exists(path):
+            return "path:" + path, path
+        return cached_file_hash(self.conn, path), path
+
+    def load(self, pdf_path):
+        key = self.file_key(pdf_path)
+        known = self.conn.execute("SELECT 1 FROM bookmark_files WHERE file_hash=? AND path=?", key).fetchone()
+        if known:
+            pages = {row[0] for row in self.conn.execute(
+                "SELECT page FROM file_bookmarks WHERE file_hash=? AND path=?", key)}
+        else:
+            pages = self.find_bookmarks(*key)
+            for page in pages:
+                self.pending.setdefault((*key, page), True)
+        for (file_hash, path, page), add in self.pending.items():
+            if (file_hash, path) == key:
+                if add:
+                    pages.add(page)
+                else:
+                    pages.discard(page)
+        return pages
+
+    def find_bookmarks(self, file_hash, path):
+        # Same content under another path (a copy or a move), then the same path before
+        # the file changed, then the old basename-keyed table
+        row = self.conn.execute("SELECT path FROM bookmark_files WHERE file_hash=? ORDER BY rowid DESC LIMIT 1",
+                                (file_hash,)).fetchone()
+        source = (file_hash, row[0]) if row else None
+        if source is None:
+            row = self.conn.execute("SELECT file_hash FROM bookmark_files WHERE path=? ORDER BY rowid DESC LIMIT 1",
+                                    (path,)).fetchone()
+            source = (row[0], path) if row else None
+        if source is not None:
+            return {row[0] for row in self.conn.execute(
+                "SELECT page FROM file_bookmarks WHERE file_hash=? AND path=?", source)}
+        return {row[0] for row in self.conn.execute(
+            "SELECT page FROM bookmarks WHERE filename=?", (os.path.basename(path),))}
+
+    def add(self, pdf_path, page):
+        self.pending[(*self.file_key(pdf_path), page)] = True
+
+    def remove(self, pdf_path, page):
+        self.pending[(*self.file_key(pdf_path), page)] = False
+
+    def flush(self):
+        # Writes every queued change in one transaction; returns the number of changes
+        if not self.pending:
+            return 0
+        changes = list(self.pending.items())
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO bookmark_files (file_hash, path) VALUES (?, ?)",
+                                  {key[:2] for key, _ in changes})
+            self.conn.executemany("INSERT OR IGNORE INTO file_bookmarks (file_hash, path, page) VALUES (?, ?, ?)",
+                                  [key for key, add in changes if add])
+            self.conn.executemany("DELETE FROM file_bookmarks WHERE file_hash=? AND path=? AND page=?",
+                                  [key for key, add in changes if not add])
+        self.pending.clear()
+        return len(changes)
+
+    def rekey(self, pdf_path, old_hash):
+        # The file was rewritten in place (e.g. rebuilt from its split files), so its content
+        # hash changed; its bookmarks move from old_hash to the new hash instead of being
+        # left behind under a hash no file has any more
+        self.flush()
+        new_hash, path = self.file_key(pdf_path)
+        if new_hash == old_hash:
+            return 0
+        with self.conn:
+            moved = self.conn.execute("UPDATE OR IGNORE file_bookmarks SET file_hash=? WHERE file_hash=? AND path=?",
+                                      (new_hash, old_hash, path)).rowcount
+            self.conn.execute("DELETE FROM file_bookmarks WHERE file_hash=? AND path=?", (old_hash, path))
+            self.conn.execute("UPDATE OR IGNORE bookmark_files SET file_hash=? WHERE file_hash=? AND path=?",
+                              (new_hash, old_hash, path))
+            self.conn.execute("DELETE FROM bookmark_files WHERE file_hash=? AND path=?", (old_hash, path))
+        return moved
+
+    def import_plans(self, plans):
+        # plans: {pdf_path: pages}; replaces the bookmarks of every listed file in one transaction
+        self.flush()
+        keys, rows = [], []
+        for pdf_path, pages in plans.items():
+            key = self.file_key(pdf_path)
+            keys.append(key)
+            rows.extend((*key, int(page)) for page in pages)
+        with self.conn:
+            self.conn.executemany("DELETE FROM file_bookmarks WHERE file_hash=? AND path=?", keys)
+            self.conn.executemany("INSERT OR IGNORE INTO bookmark_files (file_hash, path) VALUES (?, ?)", keys)
+            self.conn.executemany("INSERT OR IGNORE INTO file_bookmarks (file_hash, path, page) VALUES (?, ?, ?)", rows)
+        return len(rows)
+
+    def export_plans(self):
+        # {path: sorted pages} for the current content of every known file
+        self.flush()
+        plans = {}
+        for path, page in self.conn.execute('''
+            SELECT f.path, b.page FROM bookmark_files f
+            LEFT JOIN file_hashes h ON h.path = f.path
+            LEFT JOIN file_bookmarks b ON b.file_hash = f.file_hash AND b.path = f.path
+            WHERE f.file_hash = h.file_hash OR f.file_hash = 'path:' || f.path
+            ORDER BY f.path, b.page
+        '''):
+            pages = plans.setdefault(path, [])
+            if page is not None:
+                pages.append(page)
+        return plans
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import or export split plans in the bookmark database.")
+    parser.add_argument("--db", required=True, help="bookmark database, e.g. the PDF to PDF app's bookmarks.db")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="load a JSON/CSV manifest of PDFs and bookmark pages")
+    import_parser.add_argument("manifest")
+    export_parser = commands.add_parser("export", help="write all bookmarks as a JSON manifest")
+    export_parser.add_argument("output")
+    args = parser.parse_args(argv)
+
+    store = BookmarkStore(args.db)
+    try:
+        if args.command == "import":
+            plans = load_manifest(args.manifest)
+            print(f"Imported {store.import_plans(plans)} bookmarks for {len(plans)} PDFs")
+        else:
+            plans = store.export_plans()
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(plans, f, indent=2)
+            print(f"Exported bookmarks for {len(plans)} PDFs to {args.output}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import random
+import fitz
+
+# Synthetic PDFs for benchmarks, generated locally with PyMuPDF and deterministic for a
+# given kind and page count:
+#   text     dense body text with a large heading every 50 pages
+#   image    a caption plus two photos per page, drawn from a pool of distinct JPEGs
+#   scanned  one full-page grayscale image per page and no text layer
+KINDS = ("text", "image", "scanned")
+
+WORDS = ("product brand market story customer value design quality price service "
+         "report quarter growth strategy chapter section table figure result").split()
+
+
+def noise_jpeg(width, height, seed, gray=False):
+    # Smooth random blocks upscaled, so JPEG sizes resemble photos rather than pure noise
+    rng = random.Random(seed)
+    channels = 1 if gray else 3
+    small_w, small_h = max(1, width // 16), max(1, height // 16)
+    samples = bytes(rng.randrange(256) for _ in range(small_w * small_h * channels))
+    colorspace = fitz.csGRAY if gray else fitz.csRGB
+    pix = fitz.Pixmap(colorspace, small_w, small_h, samples, 0)
+    pix = fitz.Pixmap(pix, width, height, None)
+    return pix.tobytes("jpg", jpg_quality=75)
+
+
+def paragraph(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)) + ". "
+
+
+def make_text_pdf(path, pages, seed=0):
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        if i % 50 == 0:
+            page.insert_text((72, 80), f"Chapter {i // 50 + 1}", fontsize=24)
+        text = "".join(paragraph(rng, rng.randint(40, 90)) for _ in range(6))
+        page.insert_textbox(fitz.Rect(72, 110, 540, 770), text, fontsize=9)
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def make_image_pdf(path, pages, seed=0, pool_size=32):
+    rng = random.Random(seed)
+    images = [noise_jpeg(480, 320, seed + n) for n in range(min(pool_size, pages * 2))]
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Item {i}: " + paragraph(rng, 8), fontsize=11)
+        page.insert_image(fitz.Rect(72, 100, 540, 412), stream=images[(2 * i) % len(images)])
+        page.insert_image(fitz.Rect(72, 440, 540, 752), stream=images[(2 * i + 1) % len(images)])
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def make_scanned_pdf(path, pages, seed=0, pool_size=8):
+    # 150 dpi letter-size scans; no text layer, like the output of a scanner
+    scans = [noise_jpeg(1275, 1650, seed + n, gray=True) for n in range(min(pool_size, pages))]
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page(width=612, height=792)
+        page.insert_image(page.rect, stream=scans[i % len(scans)])
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+MAKERS = {"text": make_text_pdf, "image": make_image_pdf, "scanned": make_scanned_pdf}
+
+
+def corpus_pdf(corpus_dir, kind, pages, seed=0):
+    # Generated once per (kind, pages, seed) and reused by later runs
+    os.makedirs(corpus_dir, exist_ok=True)
+    path = os.path.join(corpus_dir, f"{kind}_{pages}_{seed}.pdf")
+    if not os.path.exists(path):
+        partial_path = path + ".part"
+        MAKERS[kind](partial_path, pages, seed)
+        os.replace(partial_path, path)
+    return path
@@ -0,0 +1,42 @@
+import hashlib
+import os
+
+# Content hashes of files, cached in a file_hashes table of the caller's SQLite database
+# and read again only after a file's mtime or size changes. Shared by the bookmark,
+# library and session stores, which key their rows by content hash.
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def setup_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS file_hashes
+            (path TEXT PRIMARY KEY, mtime REAL, size INTEGER, file_hash TEXT)
+    ''')
+
+
+def cached_file_hash(conn, path):
+    # path is used as the key as given; the stores pass absolute paths
+    stat = os.stat(path)
+    row = conn.execute("SELECT mtime, size, file_hash FROM file_hashes WHERE path=?", (path,)).fetchone()
+    if row and row[0] == stat.st_mtime and row[1] == stat.st_size:
+        return row[2]
+    file_hash = file_digest(path)
+    remember_hash(conn, path, file_hash, stat)
+    return file_hash
+
+
+def remember_hash(conn, path, file_hash, stat=None):
+    # Committed here unless the caller has a transaction open, which then carries the row
+    stat = stat or os.stat(path)
+    in_transaction = conn.in_transaction
+    conn.execute("INSERT OR REPLACE INTO file_hashes (path, mtime, size, file_hash) VALUES (?, ?, ?, ?)",
+                 (path, stat.st_mtime, stat.st_size, file_hash))
+    if not in_transaction:
+        conn.commit()
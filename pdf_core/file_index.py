@@ -0,0 +1,184 @@
+import bisect
+import os
+import re
+import threading
+import time
+
+SPLIT_MARK = "_split_"
+
+
+def split_parent(rel_path):
+    # "dir/book_split_2_5-9.pdf" belongs under "dir/book.pdf", even if that file is gone
+    name = os.path.basename(rel_path)
+    if SPLIT_MARK not in name:
+        return None
+    return os.path.join(os.path.dirname(rel_path), name.split(SPLIT_MARK)[0] + ".pdf")
+
+
+def natural_key(rel_path):
+    # book_split_10_... sorts after book_split_9_...
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', rel_path)]
+
+
+# In-memory index of the PDFs under a folder, grouped the way the file trees show them:
+# files without _split_ at the top level, split outputs under the file they came from.
+# scan() only lists folders whose mtime changed since the previous scan, and every
+# change becomes a tree operation queued for take_changes():
+#   ("insert", parent_id, index, node_id, text)    parent_id "" is the top level
+#   ("delete", node_id)
+# Node ids are paths relative to the root. Operations are queued in the order they
+# happened, so applying them in order keeps a tree in step with the index.
+class DirectoryIndex:
+    # Folder mtimes this close to the scan time may still change within the same tick
+    MTIME_SLACK_NS = 2 * 10**9
+
+    def __init__(self, root, recursive=True, suffix=".pdf"):
+        self.root = root
+        self.recursive = recursive
+        self.suffix = suffix
+        self.files = set()
+        # relative folder -> (mtime_ns, subfolders, files) as of the last listing
+        self.dirs = {}
+        # parent node id -> sorted [(natural_key, child id)], "" for the top level
+        self.children = {"": []}
+        self.parents = {}
+        # Removed from the tree by the user; left out until the file disappears from disk
+        self.ignored = set()
+        self.pending = []
+        # Reentrant, so a GUI can take_changes() and read child_ids() as one step
+        self.lock = threading.RLock()
+
+    def scan(self):
+        with self.lock:
+            now = time.time_ns()
+            seen = {}
+            stack = [""]
+            while stack:
+                rel_dir = stack.pop()
+                try:
+                    mtime = os.stat(os.path.join(self.root, rel_dir)).st_mtime_ns
+                except OSError:
+                    continue
+                cached = self.dirs.get(rel_dir)
+                if cached is not None and cached[0] == mtime and now - mtime > self.MTIME_SLACK_NS:
+                    seen[rel_dir] = cached
+                else:
+                    listing = self.list_dir(rel_dir, mtime)
+                    if listing is None:
+                        continue
+                    seen[rel_dir] = listing
+                    old_files = cached[2] if cached is not None else frozenset()
+                    self.apply(listing[2] - old_files, old_files - listing[2])
+                stack.extend(seen[rel_dir][1])
+
+            for rel_dir in self.dirs.keys() - seen.keys():
+                self.apply((), self.dirs[rel_dir][2])
+            self.dirs = seen
+            return len(self.pending)
+
+    def list_dir(self, rel_dir, mtime):
+        subdirs, files = [], set()
+        try:
+            with os.scandir(os.path.join(self.root, rel_dir)) as entries:
+                for entry in entries:
+                    rel_path = os.path.join(rel_dir, entry.name)
+                    if entry.is_dir():
+                        if self.recursive:
+                            subdirs.append(rel_path)
+                    elif entry.name.lower().endswith(self.suffix):
+                        files.add(rel_path)
+        except OSError:
+            return None
+        return mtime, tuple(subdirs), frozenset(files)
+
+    def apply(self, added, removed):
+        # Caller holds self.lock
+        for rel_path in sorted(removed, key=natural_key):
+            self.files.discard(rel_path)
+            if rel_path in self.ignored:
+                self.ignored.discard(rel_path)
+            else:
+                self.drop_node(rel_path)
+        for rel_path in sorted(added, key=natural_key):
+            self.files.add(rel_path)
+            if rel_path not in self.ignored:
+                parent = split_parent(rel_path)
+                if parent is not None:
+                    self.add_node(parent, "")
+                self.add_node(rel_path, parent or "")
+
+    def add_node(self, node_id, parent):
+        if node_id in self.parents:
+            return
+        siblings = self.children.setdefault(parent, [])
+        entry = (natural_key(node_id), node_id)
+        index = bisect.bisect(siblings, entry)
+        siblings.insert(index, entry)
+        self.parents[node_id] = parent
+        self.pending.append(("insert", parent, index, node_id, os.path.basename(node_id)))
+
+    def drop_node(self, node_id):
+        # A top-level node stays while it has split outputs under it, or while its file exists
+        if node_id not in self.parents or self.children.get(node_id):
+            return
+        if self.parents[node_id] == "" and node_id in self.files and node_id not in self.ignored:
+            return
+        self.unlink(node_id)
+
+    def unlink(self, node_id):
+        parent = self.parents.pop(node_id)
+        siblings = self.children[parent]
+        siblings.pop(bisect.bisect_left(siblings, (natural_key(node_id), node_id)))
+        self.children.pop(node_id, None)
+        self.pending.append(("delete", node_id))
+        if parent:
+            self.drop_node(parent)
+
+    def forget(self, node_id):
+        # The node was deleted from the tree together with its children. Their files stay
+        # out of the index until they disappear from disk (at once if already deleted).
+        with self.lock:
+            for rel_path in self.child_ids(node_id) + [node_id]:
+                if rel_path in self.files:
+                    self.ignored.add(rel_path)
+            for child in self.child_ids(node_id):
+                self.unlink(child)
+            if node_id in self.parents:
+                self.unlink(node_id)
+
+    def take_changes(self):
+        with self.lock:
+            changes, self.pending = self.pending, []
+            return changes
+
+    def child_ids(self, parent=""):
+        return [node_id for _, node_id in self.children.get(parent, ())]
+
+    def __contains__(self, node_id):
+        return node_id in self.parents
+
+
+# Rescans a DirectoryIndex in a background thread, so neither tree lists the folder on
+# the UI thread. The GUI collects the queued changes with take_changes() on its own timer;
+# refresh() asks for a scan right away, e.g. after a split wrote new files.
+class DirectoryWatcher:
+    def __init__(self, index, interval=2.0):
+        self.index = index
+        self.interval = interval
+        self.wake = threading.Event()
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, name="DirectoryWatcher", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stopped:
+            self.index.scan()
+            self.wake.wait(self.interval)
+            self.wake.clear()
+
+    def refresh(self):
+        self.wake.set()
+
+    def stop(self):
+        self.stopped = True
+        self.wake.set()
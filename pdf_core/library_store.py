@@ -0,0 +1,255 @@
+import argparse
+import os
+import re
+import shutil
+import sqlite3
+from .file_hashes import cached_file_hash, remember_hash, setup_table
+from .optimize import optimize_outputs
+from .profiling import timed
+from .splitting import find_outputs, get_output_filename
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl that makes dst share src's extents (Btrfs, XFS, bcachefs); writes to either copy
+# then diverge, unlike a hardlink
+FICLONE = 0x40049409
+
+NUMBERED_NAME = re.compile(r'^(\d+)_(.+)$')
+
+
+def reflink(src, dst):
+    if fcntl is None:
+        return False
+    with open(src, 'rb') as s, open(dst, 'xb') as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            cloned = True
+        except OSError:
+            cloned = False
+    if not cloned:
+        os.remove(dst)
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def copy_file(src, dst):
+    # A new file in the library: a reflink where the filesystem supports it, else a copy.
+    # Never a hardlink, so editing the original outside the library leaves this one alone.
+    if reflink(src, dst):
+        return "reflinked"
+    shutil.copy2(src, dst)
+    return "copied"
+
+
+def link_file(src, dst):
+    # A second name for a file already in the library: reflink, hardlink, then copy
+    if reflink(src, dst):
+        return "reflinked"
+    try:
+        os.link(src, dst)
+        return "hardlinked"
+    except OSError:
+        shutil.copy2(src, dst)
+        return "copied"
+
+
+# Content-addressed bookkeeping for a PDF library folder, in a SQLite file next to
+# bookmarks.db. Imports are hashed (cached by mtime and size, like BookmarkStore), so a
+# file imported again under its old name opens the existing copy and one imported under
+# a new name becomes a link to it. Split outputs are recorded by source hash and page
+# range, so splitting the same content again only writes the segments that changed.
+# NNN_ numbers for imports are handed out from a per-name counter.
+class LibraryStore:
+    def __init__(self, db_path, library_dir):
+        self.db_path = os.path.abspath(db_path)
+        self.library_dir = os.path.abspath(library_dir)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS library_files
+                (path TEXT PRIMARY KEY, file_hash TEXT, source_name TEXT);
+            CREATE INDEX IF NOT EXISTS library_files_hash ON library_files (file_hash);
+            CREATE TABLE IF NOT EXISTS split_outputs
+                (file_hash TEXT, start INTEGER, end INTEGER, path TEXT, mtime REAL, size INTEGER,
+                 PRIMARY KEY (file_hash, start, end, path));
+            CREATE TABLE IF NOT EXISTS name_counters
+                (name TEXT PRIMARY KEY, counter INTEGER);
+        ''')
+        setup_table(self.conn)
+        self.conn.commit()
+        self.seed_counters()
+
+    def seed_counters(self):
+        # One listing of the library, so numbers of files added by hand are not handed out
+        # again. Counters never go down: a deleted NNN_ name is not reused, and bookmarks
+        # or search rows left under it cannot attach to a different file.
+        highest = {}
+        if os.path.isdir(self.library_dir):
+            for name in os.listdir(self.library_dir):
+                match = NUMBERED_NAME.match(name)
+                if match:
+                    key = match.group(2).lower()
+                    highest[key] = max(highest.get(key, 0), int(match.group(1)))
+        with self.conn:
+            self.conn.executemany('''
+                INSERT INTO name_counters (name, counter) VALUES (?, ?)
+                ON CONFLICT (name) DO UPDATE SET counter = MAX(counter, excluded.counter)
+            ''', highest.items())
+
+    def next_filename(self, filename):
+        # "book.pdf" -> "004_book.pdf": one counter read and write instead of probing 001, 002, ...
+        key = filename.lower()
+        row = self.conn.execute("SELECT counter FROM name_counters WHERE name=?", (key,)).fetchone()
+        counter = row[0] if row else 0
+        while True:
+            counter += 1
+            candidate = f"{counter:03d}_{filename}"
+            # Only a file copied in since seed_counters() can be in the way
+            if not os.path.exists(os.path.join(self.library_dir, candidate)):
+                break
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO name_counters (name, counter) VALUES (?, ?)", (key, counter))
+        return candidate
+
+    def file_hash(self, path):
+        # Content hash, read again only after the file's mtime or size changes
+        return cached_file_hash(self.conn, os.path.abspath(path))
+
+    def library_copies(self, file_hash):
+        # Library files that still hold this content, oldest import first
+        copies = []
+        for path, source_name in self.conn.execute(
+                "SELECT path, source_name FROM library_files WHERE file_hash=? ORDER BY rowid", (file_hash,)).fetchall():
+            if os.path.exists(path) and self.file_hash(path) == file_hash:
+                copies.append((path, source_name))
+        return copies
+
+    def import_file(self, src_path):
+        # Returns (library path, how): "existing" when the same content was already imported
+        # under the same name, otherwise how the new NNN_ file was made
+        file_hash = self.file_hash(src_path)
+        source_name = os.path.basename(src_path)
+        copies = self.library_copies(file_hash)
+        for path, name in copies:
+            if name == source_name:
+                return path, "existing"
+
+        dst_path = os.path.join(self.library_dir, self.next_filename(source_name))
+        how = link_file(copies[0][0], dst_path) if copies else copy_file(src_path, dst_path)
+        # The new file has the source's content, so it is not read again to hash it
+        remember_hash(self.conn, dst_path, file_hash)
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO library_files (path, file_hash, source_name) VALUES (?, ?, ?)",
+                              (dst_path, file_hash, source_name))
+        return dst_path, how
+
+    def split_copies(self, file_hash, start, end):
+        # Recorded outputs for this source content and range that are unchanged on disk
+        copies = []
+        for path, mtime, size in self.conn.execute(
+                "SELECT path, mtime, size FROM split_outputs WHERE file_hash=? AND start=? AND end=?",
+                (file_hash, start, end)):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if (stat.st_mtime, stat.st_size) == (mtime, size):
+                copies.append(path)
+        return copies
+
+    def record_split(self, file_hash, start, end, path):
+        stat = os.stat(path)
+        with self.conn:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO split_outputs (file_hash, start, end, path, mtime, size)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (file_hash, start, end, os.path.abspath(path), stat.st_mtime, stat.st_size))
+
+    @timed("split_pdf")
+    def split(self, splitter, bookmarks, optimize=None, **options):
+        # PDFSplitter.split_pdf, skipping segments already written for the same source
+        # content and range. A segment written under another name (the same PDF imported
+        # twice, or a number that moved) is linked to its new name, and outputs of ranges
+        # no longer wanted are removed. optimize: optimize_pdf() options for the newly
+        # written segments, or None. Returns (output paths, report) where the report has
+        # the reused and written counts, the removed paths and the optimize reports.
+        source_path = os.path.abspath(splitter.pdf_document.name)
+        file_hash = self.file_hash(source_path)
+        base_name = os.path.splitext(os.path.basename(source_path))[0]
+        os.makedirs(splitter.output_dir, exist_ok=True)
+
+        output_paths, missing = [], []
+        for i, (start, end) in enumerate(splitter.get_split_points(bookmarks)):
+            path = os.path.abspath(os.path.join(splitter.output_dir, get_output_filename(base_name, i, start, end)))
+            output_paths.append(path)
+            copies = self.split_copies(file_hash, start, end)
+            if path in copies:
+                continue
+            # A stale file is unlinked rather than overwritten, so a hardlinked twin keeps its content
+            if os.path.exists(path):
+                os.remove(path)
+            if copies:
+                link_file(copies[0], path)
+                self.record_split(file_hash, start, end, path)
+            else:
+                missing.append((i, start, end))
+
+        reports = []
+        if missing:
+            splitter.split_segments(missing, **options)
+            if optimize is not None:
+                # Before recording, so the recorded size is that of the optimized file
+                reports = optimize_outputs([output_paths[i] for i, _, _ in missing], **optimize)
+            for i, start, end in missing:
+                self.record_split(file_hash, start, end, output_paths[i])
+
+        # Only after the new names are linked, so a renumbered segment keeps its content
+        wanted = set(output_paths)
+        removed = [path for paths in find_outputs(base_name, splitter.output_dir).values() for path in paths
+                   if os.path.abspath(path) not in wanted]
+        for path in removed:
+            os.remove(path)
+        with self.conn:
+            self.conn.executemany("DELETE FROM split_outputs WHERE path=?", [(os.path.abspath(p),) for p in removed])
+        return output_paths, {"reused": len(output_paths) - len(missing), "written": len(missing),
+                              "removed": removed, "optimized": reports}
+
+    def stats(self):
+        files, hashes = self.conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT file_hash) FROM library_files").fetchone()
+        outputs = self.conn.execute("SELECT COUNT(*) FROM split_outputs").fetchone()[0]
+        return {"imports": files, "distinct_imports": hashes, "split_outputs": outputs}
+
+    def close(self):
+        self.conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import PDFs into a library folder, linking duplicates.")
+    parser.add_argument("--db", required=True, help="library database, e.g. library.db next to bookmarks.db")
+    parser.add_argument("--library", required=True, help="library folder, e.g. the app's pdf_files")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="import PDFs into the library")
+    import_parser.add_argument("files", nargs="+")
+    commands.add_parser("stats", help="print counts of imports and recorded split outputs")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.library, exist_ok=True)
+    store = LibraryStore(args.db, args.library)
+    try:
+        if args.command == "import":
+            for src_path in args.files:
+                path, how = store.import_file(src_path)
+                print(f"{src_path} -> {path} ({how})")
+        else:
+            print(store.stats())
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
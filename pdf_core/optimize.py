@@ -0,0 +1,115 @@
+import argparse
+import functools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import fitz
+from .profiling import profiler
+
+# Post-split size optimization. Each segment written by PDFSplitter carries whole copies
+# of the fonts and images its pages use, plus objects no page refers to. optimize_pdf()
+# subsets the fonts to the glyphs used, downsamples images above a target resolution,
+# and saves with garbage collection and compressed streams. A file is only replaced when
+# the result is smaller, through a temporary file, so a failed run leaves it as it was.
+#
+#   python -m pdf_core.optimize out/*.pdf --dpi 150 -j 8
+
+
+def optimize_pdf(path, dpi=None, subset_fonts=True, garbage=4, deflate=True, jpeg_quality=80):
+    # Returns a report: file, bytes_before, bytes_after, bytes_saved, seconds, status
+    start_time = time.perf_counter()
+    before = os.path.getsize(path)
+    report = {"file": path, "bytes_before": before, "bytes_after": before, "bytes_saved": 0}
+    temp_path = path + ".optimizing"
+    try:
+        doc = fitz.open(path)
+        try:
+            if dpi:
+                # Only images noticeably above the target are resampled. MuPDF halves the
+                # resolution until it is near the target, so an image gets smaller only once
+                # it is at least about twice the target (300 dpi scans at dpi=150).
+                doc.rewrite_images(dpi_threshold=dpi * 4 // 3, dpi_target=dpi, quality=jpeg_quality)
+            if subset_fonts:
+                doc.subset_fonts()
+            doc.save(temp_path, garbage=garbage, deflate=deflate, deflate_images=deflate,
+                     deflate_fonts=deflate, use_objstms=1)
+        finally:
+            doc.close()
+        after = os.path.getsize(temp_path)
+        if after < before:
+            # Replacing the name (not writing into the file) leaves hardlinked twins untouched
+            os.replace(temp_path, path)
+            report.update(bytes_after=after, bytes_saved=before - after, status="ok")
+        else:
+            os.remove(temp_path)
+            report["status"] = "unchanged"
+    except Exception as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        report.update(status="error", error=str(e))
+    report["seconds"] = round(time.perf_counter() - start_time, 4)
+    return report
+
+
+def optimize_outputs(paths, workers=None, **options):
+    # Optimizes every file in parallel; reports come back in the order of paths
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        reports = [optimize_pdf(path, **options) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            reports = list(pool.map(functools.partial(optimize_pdf, **options), paths))
+    for report in reports:
+        profiler.record("optimize_pdf", report["seconds"], bytes_saved=report["bytes_saved"])
+    return reports
+
+
+def summarize(reports):
+    before = sum(report["bytes_before"] for report in reports)
+    after = sum(report["bytes_after"] for report in reports)
+    return {
+        "files": len(reports),
+        "errors": sum(1 for report in reports if report["status"] == "error"),
+        "bytes_before": before,
+        "bytes_after": after,
+        "bytes_saved": before - after,
+        "seconds": round(sum(report["seconds"] for report in reports), 4),
+    }
+
+
+def format_reports(reports):
+    lines = [
+        f"{os.path.basename(r['file'])}: {r['bytes_before'] / 1e6:.2f} -> {r['bytes_after'] / 1e6:.2f} MB "
+        f"(-{r['bytes_saved'] / 1e6:.2f} MB) in {r['seconds']:.2f}s {r['status']}{': ' + r['error'] if 'error' in r else ''}"
+        for r in reports
+    ]
+    total = summarize(reports)
+    lines.append(f"{total['files']} files, {total['bytes_saved'] / 1e6:.2f} MB saved "
+                 f"({total['bytes_before'] / 1e6:.2f} -> {total['bytes_after'] / 1e6:.2f} MB), "
+                 f"{total['seconds']:.1f}s of work, {total['errors']} errors")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shrink PDFs in place: subset fonts, downsample images, "
+                                                 "collect garbage and compress streams.")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--dpi", type=int, default=None, help="downsample images above this resolution")
+    parser.add_argument("--jpeg-quality", type=int, default=80, help="JPEG quality of downsampled images")
+    parser.add_argument("--no-subset", action="store_true", help="keep embedded fonts whole")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--json", action="store_true", help="print one JSON report per file")
+    args = parser.parse_args(argv)
+
+    reports = optimize_outputs(args.files, args.workers, dpi=args.dpi, subset_fonts=not args.no_subset,
+                               jpeg_quality=args.jpeg_quality)
+    if args.json:
+        for report in reports:
+            print(json.dumps(report))
+    else:
+        print(format_reports(reports))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+def cache_key(file_path, mtime, page_num, zoom=1.0, size=None):
+    return (os.path.abspath(file_path), mtime, page_num, zoom, size)
+
+
+# Rendered page bitmaps keyed by (file path, mtime, page, zoom, size), evicted least
+# recently used first once max_bytes is exceeded. A changed file gets a new mtime and
+# therefore new keys; its old entries simply age out.
+class PageCache:
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def __contains__(self, key):
+        # Membership checks do not count as hits or misses
+        with self.lock:
+            return key in self.entries
+
+    def put(self, key, value, nbytes):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            if nbytes > self.max_bytes:
+                return
+            self.entries[key] = (value, nbytes)
+            self.size += nbytes
+            self.evict_to_budget()
+
+    def set_max_bytes(self, max_bytes):
+        with self.lock:
+            self.max_bytes = max_bytes
+            self.evict_to_budget()
+
+    def evict_to_budget(self):
+        # Caller holds self.lock
+        while self.size > self.max_bytes:
+            _, (_, evicted_bytes) = self.entries.popitem(last=False)
+            self.size -= evicted_bytes
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# One cache per process, shared by every viewer that imports it
+shared_cache = PageCache()
@@ -0,0 +1,71 @@
+import bisect
+
+
+def page_sizes(doc):
+    # (width, height) in points after rotation, read once per document
+    return [(rect.width, rect.height) for rect in (page.rect for page in doc)]
+
+
+# Positions of every page in a continuous, virtualized view: pages flow left to right
+# in rows of `columns`, rows stacked top to bottom, all at one zoom that fits the widest
+# page into its column. Only offsets are stored, so a viewer can ask which pages meet
+# the viewport and draw just those; nothing here depends on a GUI toolkit.
+class PageLayout:
+    def __init__(self, sizes, columns=1, width=800, gap=8):
+        self.sizes = sizes
+        self.gap = gap
+        self.set_geometry(width, columns)
+
+    def set_geometry(self, width, columns=None):
+        self.columns = max(1, columns or self.columns)
+        self.width = width
+        widest = max((w for w, _ in self.sizes), default=1)
+        column_width = max(1, (width - self.gap * (self.columns + 1)) // self.columns)
+        self.zoom = column_width / widest
+        self.column_width = column_width
+
+        # row_tops[r] is the y of row r; the extra last entry is the total height
+        self.row_tops = [self.gap]
+        for start in range(0, len(self.sizes), self.columns):
+            row_height = max(h for _, h in self.sizes[start:start + self.columns]) * self.zoom
+            self.row_tops.append(self.row_tops[-1] + round(row_height) + self.gap)
+
+    @property
+    def total_height(self):
+        return self.row_tops[-1]
+
+    @property
+    def page_count(self):
+        return len(self.sizes)
+
+    def row_of(self, page_num):
+        return page_num // self.columns
+
+    def page_rect(self, page_num):
+        # (x0, y0, x1, y1) in view coordinates, centred in its column
+        row, column = divmod(page_num, self.columns)
+        width, height = self.sizes[page_num]
+        width, height = round(width * self.zoom), round(height * self.zoom)
+        x0 = self.gap + column * (self.column_width + self.gap) + (self.column_width - width) // 2
+        y0 = self.row_tops[row]
+        return x0, y0, x0 + width, y0 + height
+
+    def pages_in(self, top, bottom):
+        # Pages whose row intersects [top, bottom), found by bisecting the row offsets; a
+        # row whose gap alone is in view does not count
+        if not self.sizes:
+            return range(0)
+        rows = len(self.row_tops) - 1
+        first_row = min(rows - 1, max(0, bisect.bisect_right(self.row_tops, top + self.gap) - 1))
+        last_row = max(first_row, bisect.bisect_left(self.row_tops, bottom) - 1)
+        return range(first_row * self.columns, min(self.page_count, (last_row + 1) * self.columns))
+
+    def page_at(self, x, y):
+        for page_num in self.pages_in(y, y + 1):
+            x0, y0, x1, y1 = self.page_rect(page_num)
+            if x0 <= x < x1 and y0 <= y < y1:
+                return page_num
+        return None
+
+    def page_top(self, page_num):
+        return self.row_tops[self.row_of(page_num)] - self.gap
@@ -0,0 +1,233 @@
+import argparse
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Timing spans for the slow paths of the viewers (rendering, extraction, splitting,
+# export), aggregated into per-operation histograms and optionally streamed to a JSONL
+# trace file. Profiling is off unless enabled from the GUI overlay or the environment:
+#
+#   PDF_CORE_PROFILE=1              collect histograms from startup
+#   PDF_CORE_TRACE=trace.jsonl      also append every span to trace.jsonl
+#
+# While disabled, span() returns a shared no-op context manager and timed() wrappers
+# only test one attribute before calling through.
+#
+#   python -m pdf_core.profiling trace.jsonl      histograms of a recorded trace
+
+
+class Histogram:
+    # Durations in power-of-two millisecond buckets: bucket 0 holds everything below
+    # 1 ms, bucket n holds [2^(n-1), 2^n) ms. Percentiles report the bucket's upper bound.
+    BUCKETS = 20
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, ms):
+        bucket = min(self.BUCKETS - 1, int(ms).bit_length())
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = max(self.max, ms)
+        self.last = ms
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(float(1 << bucket), self.max)
+        return self.max
+
+    def stats(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min or 0.0, 3),
+            "p50_ms": round(self.percentile(0.5), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "max_ms": round(self.max, 3),
+            "last_ms": round(self.last, 3),
+            "buckets": self.counts,
+        }
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ("profiler", "name", "fields", "start")
+
+    def __init__(self, profiler, name, fields):
+        self.profiler = profiler
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.fields["error"] = exc_type.__name__
+        self.profiler.record(self.name, seconds, **self.fields)
+        return False
+
+
+class Profiler:
+    def __init__(self, keep=10000):
+        self.enabled = False
+        self.histograms = {}
+        # The most recent spans, for dump_trace() when no trace file was streaming
+        self.recent = deque(maxlen=keep)
+        self.trace_file = None
+        self.lock = threading.Lock()
+
+    def enable(self, trace_path=None):
+        with self.lock:
+            if trace_path and self.trace_file is None:
+                self.trace_file = open(trace_path, 'a', encoding='utf-8')
+            self.enabled = True
+
+    def disable(self):
+        with self.lock:
+            self.enabled = False
+            if self.trace_file is not None:
+                self.trace_file.close()
+                self.trace_file = None
+
+    def span(self, name, **fields):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, fields)
+
+    def timed(self, name=None):
+        # Decorator form of span(); the name defaults to the function's name
+        def decorate(function):
+            span_name = name or function.__name__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with Span(self, span_name, {}):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def record(self, name, seconds, **fields):
+        # Also used directly for durations measured elsewhere, e.g. across processes
+        if not self.enabled:
+            return
+        ms = seconds * 1000
+        event = {"name": name, "time": round(time.time(), 6), "ms": round(ms, 3),
+                 "pid": os.getpid(), "thread": threading.current_thread().name, **fields}
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(ms)
+            self.recent.append(event)
+            if self.trace_file is not None:
+                self.trace_file.write(json.dumps(event) + "\n")
+                self.trace_file.flush()
+
+    def stats(self):
+        with self.lock:
+            return {name: histogram.stats() for name, histogram in sorted(self.histograms.items())}
+
+    def summary(self, names=None):
+        # One line for a status bar: last and p95 per operation, in milliseconds
+        with self.lock:
+            names = names or sorted(self.histograms)
+            parts = [
+                f"{name} {histogram.last:.0f}ms (p95 {histogram.percentile(0.95):.0f}, n={histogram.count})"
+                for name in names
+                for histogram in [self.histograms.get(name)] if histogram is not None
+            ]
+        return " | ".join(parts) or "No spans recorded yet"
+
+    def report(self):
+        return "\n".join(
+            f"{name:20} n={s['count']:<6} mean {s['mean_ms']:9.1f}ms  p50 {s['p50_ms']:8.0f}ms  "
+            f"p95 {s['p95_ms']:8.0f}ms  max {s['max_ms']:9.1f}ms"
+            for name, s in self.stats().items()
+        )
+
+    def dump_trace(self, path):
+        with self.lock:
+            events = list(self.recent)
+        with open(path, 'w', encoding='utf-8') as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+        return len(events)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.recent.clear()
+
+    @classmethod
+    def from_environment(cls):
+        profiler = cls()
+        trace_path = os.environ.get("PDF_CORE_TRACE")
+        if trace_path or os.environ.get("PDF_CORE_PROFILE"):
+            profiler.enable(trace_path)
+        return profiler
+
+
+# One profiler per process, shared by every app that imports it
+profiler = Profiler.from_environment()
+span = profiler.span
+timed = profiler.timed
+
+
+def load_trace(path):
+    histograms = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                event = json.loads(line)
+                histograms.setdefault(event["name"], Histogram()).add(event["ms"])
+    return histograms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a JSONL trace written by pdf_core.profiling.")
+    parser.add_argument("trace")
+    parser.add_argument("--json", action="store_true", help="print the histograms as JSON")
+    args = parser.parse_args()
+
+    trace = Profiler()
+    trace.histograms = load_trace(args.trace)
+    if args.json:
+        print(json.dumps(trace.stats(), indent=2))
+    else:
+        print(trace.report() or "Empty trace")
+
+
+if __name__ == "__main__":
+    main()
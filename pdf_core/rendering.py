@@ -0,0 +1,41 @@
+import fitz
+from .profiling import timed
+
+# Each worker process of a viewer's render pool keeps the last document it rendered from open
+_documents = {}
+
+
+def fit_zoom(page, width=None, height=None, max_zoom=None):
+    # Zoom at which the page fits the given box; None leaves that side unconstrained
+    zooms = [max_zoom] if max_zoom is not None else []
+    if width is not None:
+        zooms.append(width / page.rect.width)
+    if height is not None:
+        zooms.append(height / page.rect.height)
+    return min(zooms) if zooms else 1.0
+
+
+@timed()
+def render_pixmap(page, zoom=1.0):
+    # Renders straight at the target scale instead of scaling a full-size pixmap afterwards
+    if zoom == 1.0:
+        return page.get_pixmap()
+    return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+
+
+def render_page(file_path, mtime, page_num, zoom=1.0):
+    # Runs in a worker process; returns (width, height, RGB samples) for the GUI to wrap
+    doc = _documents.get((file_path, mtime))
+    if doc is None:
+        for old_doc in _documents.values():
+            old_doc.close()
+        _documents.clear()
+        doc = _documents[(file_path, mtime)] = fitz.open(file_path)
+    pix = render_pixmap(doc[page_num], zoom)
+    return pix.width, pix.height, pix.samples
+
+
+def pixmap_to_image(pix):
+    # Copied once, straight from the pixmap's memory, without an intermediate bytes object
+    from PIL import Image
+    return Image.frombuffer("RGB", (pix.width, pix.height), pix.samples_mv, "raw", "RGB", pix.stride, 1)
@@ -0,0 +1,224 @@
+import argparse
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+import fitz
+from .file_index import DirectoryIndex
+
+
+def setup_tables(conn):
+    # Page text lives in search_pages; search_text is an FTS5 index over it, kept in step
+    # by triggers, so a file's pages can be deleted through the path index
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS search_files
+            (path TEXT PRIMARY KEY, mtime REAL, size INTEGER, page_count INTEGER);
+        CREATE TABLE IF NOT EXISTS search_pages
+            (id INTEGER PRIMARY KEY, path TEXT, page INTEGER, text TEXT);
+        CREATE INDEX IF NOT EXISTS search_pages_path ON search_pages (path, page);
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_text USING fts5
+            (text, content='search_pages', content_rowid='id', tokenize='unicode61 remove_diacritics 2');
+        CREATE TRIGGER IF NOT EXISTS search_pages_insert AFTER INSERT ON search_pages BEGIN
+            INSERT INTO search_text (rowid, text) VALUES (new.id, new.text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS search_pages_delete AFTER DELETE ON search_pages BEGIN
+            INSERT INTO search_text (search_text, rowid, text) VALUES ('delete', old.id, old.text);
+        END;
+    ''')
+    conn.commit()
+
+
+def is_current(conn, file_path, stat):
+    row = conn.execute("SELECT mtime, size FROM search_files WHERE path=?", (file_path,)).fetchone()
+    return row == (stat.st_mtime, stat.st_size)
+
+
+def index_file(db_path, file_path, batch_size=64):
+    # Runs in a worker process; commits every batch_size pages so earlier pages are
+    # searchable while the rest of a long document is still being extracted. The file
+    # row is written last, so an interrupted run is redone next time.
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return remove_file(db_path, file_path)
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        if is_current(conn, file_path, stat):
+            return 0
+        with conn:
+            conn.execute("DELETE FROM search_files WHERE path=?", (file_path,))
+            conn.execute("DELETE FROM search_pages WHERE path=?", (file_path,))
+        with fitz.open(file_path) as doc:
+            rows = []
+            for page_num in range(len(doc)):
+                rows.append((file_path, page_num, doc[page_num].get_text()))
+                if len(rows) >= batch_size:
+                    with conn:
+                        conn.executemany("INSERT INTO search_pages (path, page, text) VALUES (?, ?, ?)", rows)
+                    rows = []
+            with conn:
+                conn.executemany("INSERT INTO search_pages (path, page, text) VALUES (?, ?, ?)", rows)
+                conn.execute("INSERT INTO search_files (path, mtime, size, page_count) VALUES (?, ?, ?, ?)",
+                             (file_path, stat.st_mtime, stat.st_size, len(doc)))
+            return len(doc)
+    finally:
+        conn.close()
+
+
+def index_split_outputs(db_path, source_path, outputs):
+    # Split outputs hold page ranges of the source, so while the source is indexed their
+    # text is copied from its rows instead of being extracted again.
+    # outputs: (output_path, start, end) with 0-based inclusive source pages
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        if is_current(conn, source_path, os.stat(source_path)):
+            with conn:
+                for output_path, start, end in outputs:
+                    stat = os.stat(output_path)
+                    conn.execute("DELETE FROM search_files WHERE path=?", (output_path,))
+                    conn.execute("DELETE FROM search_pages WHERE path=?", (output_path,))
+                    conn.execute('''
+                        INSERT INTO search_pages (path, page, text)
+                        SELECT ?, page - ?, text FROM search_pages WHERE path=? AND page BETWEEN ? AND ? ORDER BY page
+                    ''', (output_path, start, source_path, start, end))
+                    conn.execute("INSERT INTO search_files (path, mtime, size, page_count) VALUES (?, ?, ?, ?)",
+                                 (output_path, stat.st_mtime, stat.st_size, end - start + 1))
+            return sum(end - start + 1 for _, start, end in outputs)
+    finally:
+        conn.close()
+    return sum(index_file(db_path, output_path) for output_path, _, _ in outputs)
+
+
+def remove_file(db_path, file_path):
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        with conn:
+            conn.execute("DELETE FROM search_files WHERE path=?", (file_path,))
+            conn.execute("DELETE FROM search_pages WHERE path=?", (file_path,))
+        return 0
+    finally:
+        conn.close()
+
+
+def match_query(text):
+    # Words of the query, all required, each quoted so FTS5 syntax characters are taken
+    # literally; the last word also matches as a prefix, for search as you type
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    terms = ['"' + word + '"' for word in words]
+    terms[-1] += '*'
+    return " ".join(terms)
+
+
+# Full-text index of page text for every PDF of a library, in a SQLite file next to
+# bookmarks.db. Files are indexed once in a background process and again when their
+# mtime or size changes; split outputs reuse the text of their source.
+class SearchIndex:
+    def __init__(self, db_path):
+        self.db_path = os.path.abspath(db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        # WAL lets the viewer search while the worker process writes
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        setup_tables(self.conn)
+        self.pool = None
+        self.jobs = {}
+        self.prune_at = 1000
+
+    def submit(self, key, function, *args):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=1)
+        job = self.jobs.get(key)
+        if job is None or job.done():
+            self.jobs[key] = self.pool.submit(function, self.db_path, *args)
+        # Finished jobs are dropped so the table does not grow with the library
+        if len(self.jobs) > self.prune_at:
+            self.jobs = {k: job for k, job in self.jobs.items() if not job.done()}
+            self.prune_at = max(1000, 2 * len(self.jobs))
+
+    def ensure(self, file_path):
+        # Indexes the file if it is new or changed, or drops it once it is gone
+        self.submit(os.path.abspath(file_path), index_file, os.path.abspath(file_path))
+
+    def ensure_split(self, source_path, outputs):
+        outputs = [(os.path.abspath(path), start, end) for path, start, end in outputs]
+        self.submit(("split", os.path.abspath(source_path)), index_split_outputs, os.path.abspath(source_path), outputs)
+
+    def pending(self):
+        return sum(1 for job in self.jobs.values() if not job.done())
+
+    def release(self, file_path):
+        # Cancels the file's queued job or waits for its running one, which has the file
+        # open; Windows refuses to replace a file while any process holds it
+        job = self.jobs.pop(os.path.abspath(file_path), None)
+        if job is not None and not job.cancel():
+            wait([job])
+
+    def search(self, text, limit=100):
+        # (path, page, snippet) hits, best first; pages of deleted files are skipped
+        query = match_query(text)
+        if query is None:
+            return []
+        rows = self.conn.execute('''
+            SELECT p.path, p.page, snippet(search_text, 0, '[', ']', '...', 12)
+            FROM search_text JOIN search_pages p ON p.id = search_text.rowid
+            WHERE search_text MATCH ? ORDER BY rank LIMIT ?
+        ''', (query, limit)).fetchall()
+        return [(path, page, " ".join(snippet.split())) for path, page, snippet in rows if os.path.exists(path)]
+
+    def stats(self):
+        files, pages = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(page_count), 0) FROM search_files").fetchone()
+        return {"files": files, "pages": pages}
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+        self.conn.close()
+
+
+def build(db_path, root):
+    # Indexes every PDF under root in this process; files already current are skipped
+    index = DirectoryIndex(root)
+    index.scan()
+    db_path = os.path.abspath(db_path)
+    SearchIndex(db_path).close()
+    pages = 0
+    for rel_path in sorted(index.files):
+        pages += index_file(db_path, os.path.abspath(os.path.join(root, rel_path)))
+    conn = sqlite3.connect(db_path)
+    indexed = [row[0] for row in conn.execute("SELECT path FROM search_files")]
+    conn.close()
+    for path in indexed:
+        if not os.path.exists(path):
+            remove_file(db_path, path)
+    return len(index.files), pages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the full-text index of a PDF library.")
+    parser.add_argument("--db", required=True, help="index database, e.g. search.db next to bookmarks.db")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="index every PDF under a folder")
+    build_parser.add_argument("root")
+    query_parser = subparsers.add_parser("query", help="print the pages matching the words")
+    query_parser.add_argument("text")
+    query_parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    if args.command == "build":
+        files, pages = build(args.db, args.root)
+        print(f"{files} files, {pages} pages (re)indexed in {time.perf_counter() - start_time:.1f}s")
+    else:
+        index = SearchIndex(args.db)
+        hits = index.search(args.text, args.limit)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        for path, page, snippet in hits:
+            print(f"{path} p.{page + 1}: {snippet}")
+        print(f"{len(hits)} hits in {elapsed_ms:.1f} ms")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
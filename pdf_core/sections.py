@@ -0,0 +1,85 @@
+import os
+from itertools import islice
+import fitz
+import openpyxl
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from .profiling import timed
+from .splitting import get_output_filename, get_split_points
+from .text_cleaning import clean_text_for_excel
+
+# Bookmark sections as text, read straight from the source PDF in one ordered pass.
+# Sections follow get_split_points, so the pages before the first bookmark are a section
+# of their own, exactly as when the PDF is split.
+
+
+def iter_sections(pdf_document, bookmarks, extractor=None, separator="\n"):
+    # Yields (index, start, end, text) with 0-based inclusive page ranges; only the current
+    # section's text is held. A TextExtractor extracts the pages in its worker pool. Pages
+    # are joined with separator: newlines like PDFManagerApp's export, or "" like the
+    # Bookmark_Split to XLSX app has always written its cells.
+    if not bookmarks:
+        return
+    page_count = len(pdf_document)
+    if extractor is None:
+        page_texts = (pdf_document[page_num].get_text() for page_num in range(page_count))
+    else:
+        page_texts = (text for _, _, text in extractor.iter_pages([(pdf_document.name, 0, page_count)]))
+
+    for i, (start, end) in enumerate(get_split_points(bookmarks, page_count)):
+        yield i, start, end, separator.join(islice(page_texts, end - start + 1))
+
+
+def clean_cell(text, clean=True, keep_unicode=False):
+    if clean:
+        return clean_text_for_excel(text, keep_unicode)
+    # Characters openpyxl refuses to write are dropped even when cleaning is off
+    return ILLEGAL_CHARACTERS_RE.sub("", text)
+
+
+@timed()
+def write_xlsx(xlsx_path, header, rows):
+    # Write-only workbooks stream rows to disk instead of keeping every cell in memory
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header)
+    count = 0
+    for row in rows:
+        sheet.append(row)
+        count += 1
+    workbook.save(xlsx_path)
+    return count
+
+
+@timed()
+def export_sections(pdf_document, bookmarks, xlsx_path, extractor=None, clean=True, keep_unicode=False,
+                    separator="\n", progress=None):
+    # One row per section: the file split_pdf would write for it, its page range and its text.
+    # progress, if given, is called with (sections written, section count) after each row.
+    base_name = os.path.splitext(os.path.basename(pdf_document.name))[0]
+    section_count = len(get_split_points(bookmarks, len(pdf_document))) if bookmarks else 0
+
+    def rows():
+        for i, start, end, text in iter_sections(pdf_document, bookmarks, extractor, separator):
+            yield [get_output_filename(base_name, i, start, end), f"{start + 1}-{end + 1}",
+                   clean_cell(text.strip(), clean, keep_unicode)]
+            if progress is not None:
+                progress(i + 1, section_count)
+    return write_xlsx(xlsx_path, ["File", "Range", "Content"], rows())
+
+
+# Set in worker processes by set_progress_queue; a multiprocessing queue can only be
+# handed to pool workers when they start, not with each job
+_progress_queue = None
+
+
+def set_progress_queue(queue):
+    # ProcessPoolExecutor initializer for pools running export_file
+    global _progress_queue
+    _progress_queue = queue
+
+
+def export_file(pdf_path, bookmarks, xlsx_path, **options):
+    # Runs in a worker process; export_sections progress goes on the set_progress_queue queue
+    progress = None if _progress_queue is None else lambda *counts: _progress_queue.put(counts)
+    with fitz.open(pdf_path) as pdf_document:
+        return export_sections(pdf_document, bookmarks, xlsx_path, progress=progress, **options)
@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import time
+from collections import Counter
+import fitz
+
+# Image blocks are left out of page.get_text("dict"); they carry the image bytes
+TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+def page_spans(page, clip=None):
+    for block in page.get_text("dict", flags=TEXT_FLAGS, clip=clip)["blocks"]:
+        for line in block.get("lines", ()):
+            for span in line["spans"]:
+                if span["text"].strip():
+                    yield span
+
+
+def body_font_size(doc, sample_pages=50):
+    # Most common font size, weighted by characters, over pages spread across the document
+    sizes = Counter()
+    step = max(1, len(doc) // sample_pages)
+    for page_num in range(0, len(doc), step):
+        for span in page_spans(doc[page_num]):
+            sizes[round(span["size"] * 2) / 2] += len(span["text"])
+    return sizes.most_common(1)[0][0] if sizes else 0
+
+
+def toc_pages(doc, toc_level=1):
+    # Outline entries carry 1-based pages; -1 marks entries pointing nowhere
+    return [page - 1 for level, _, page in doc.get_toc(simple=True) if level <= toc_level and page > 0]
+
+
+def top_spans(page, top_fraction=0.33):
+    # Only the top of the page is laid out as spans; the rest of the page is not needed
+    rect = page.rect
+    return list(page_spans(page, fitz.Rect(rect.x0, rect.y0, rect.x1, rect.y0 + rect.height * top_fraction)))
+
+
+def has_heading(spans, body_size, heading_ratio=1.5):
+    # A chapter or section starts a page: text clearly larger than the body, near the top
+    return any(span["size"] >= body_size * heading_ratio and len(span["text"].strip()) >= 2 for span in spans)
+
+
+def is_blank(page, spans):
+    if spans or page.get_text("text").strip():
+        return False
+    return not page.get_images() and not page.get_drawings()
+
+
+def detect_split_points(pdf_path, use_toc=True, headings=True, blank_pages=True, toc_level=1,
+                        heading_ratio=1.5, min_gap=1):
+    # One pass over the pages, holding a single page's text at a time, so memory does not
+    # grow with the document. Returns {"pages": {page: reason}, "page_count", "seconds"}
+    # with 0-based pages, same as bookmarks.db.
+    start_time = time.perf_counter()
+    doc = fitz.open(pdf_path)
+    try:
+        candidates = {}
+        if use_toc:
+            for page_num in toc_pages(doc, toc_level):
+                candidates.setdefault(page_num, "toc")
+
+        body_size = body_font_size(doc) if headings else 0
+        previous_blank = False
+        for page_num in range(len(doc) if headings or blank_pages else 0):
+            page = doc[page_num]
+            spans = top_spans(page)
+            blank = blank_pages and is_blank(page, spans)
+            if blank_pages and previous_blank and not blank:
+                # The first page after a run of blank separator pages
+                candidates.setdefault(page_num, "blank")
+            elif headings and body_size and has_heading(spans, body_size, heading_ratio):
+                candidates.setdefault(page_num, "heading")
+            previous_blank = blank
+
+        pages = {}
+        last = None
+        for page_num in sorted(candidates):
+            if last is None or page_num - last >= min_gap:
+                pages[page_num] = candidates[page_num]
+                last = page_num
+        return {"pages": pages, "page_count": len(doc), "seconds": round(time.perf_counter() - start_time, 3)}
+    finally:
+        doc.close()
+
+
+def summarize(result):
+    reasons = Counter(result["pages"].values())
+    found = ", ".join(f"{n} {reason}" for reason, n in sorted(reasons.items())) or "none"
+    return f"{len(result['pages'])} split points ({found}) in {result['page_count']} pages, {result['seconds']}s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Propose split points from the outline, headings and blank pages.")
+    parser.add_argument("pdf", nargs="+")
+    parser.add_argument("--no-toc", action="store_true", help="ignore the PDF outline")
+    parser.add_argument("--no-headings", action="store_true", help="ignore large-font headings")
+    parser.add_argument("--no-blank", action="store_true", help="ignore blank separator pages")
+    parser.add_argument("--toc-level", type=int, default=1, help="deepest outline level used")
+    parser.add_argument("--heading-ratio", type=float, default=1.5, help="heading size relative to the body text")
+    parser.add_argument("--min-gap", type=int, default=1, help="minimum pages between two split points")
+    parser.add_argument("--manifest", help="write the split points as a JSON manifest for batch_split or bookmark_store")
+    args = parser.parse_args(argv)
+
+    plans = {}
+    for pdf_path in args.pdf:
+        result = detect_split_points(pdf_path, not args.no_toc, not args.no_headings, not args.no_blank,
+                                     args.toc_level, args.heading_ratio, args.min_gap)
+        plans[os.path.abspath(pdf_path)] = sorted(result["pages"])
+        print(f"{pdf_path}: {summarize(result)}")
+    if args.manifest:
+        with open(args.manifest, 'w', encoding='utf-8') as f:
+            json.dump(plans, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import fitz
+import heapq
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from .profiling import timed
+from .search_index import index_split_outputs, remove_file
+
+
+OUTPUT_NAME = re.compile(r'^(.*)_split_(\d+)_(\d+)-(\d+)\.pdf$', re.IGNORECASE)
+
+
+def get_output_filename(base_name, index, start, end):
+    return f"{base_name}_split_{index+1}_{start+1}-{end+1}.pdf"
+
+
+def parse_output_filename(filename):
+    # Inverse of get_output_filename: (base_name, index, start, end), 0-based, or None
+    match = OUTPUT_NAME.match(os.path.basename(filename))
+    if match is None:
+        return None
+    base_name, index, start, end = match.groups()
+    return base_name, int(index) - 1, int(start) - 1, int(end) - 1
+
+
+def find_outputs(base_name, output_dir):
+    # Split outputs of base_name in output_dir: {(start, end): [paths]}. Outputs of an
+    # output ("book_split_1_1-9_split_2_4-9.pdf") belong to that output, not to book.
+    outputs = {}
+    if os.path.isdir(output_dir):
+        for name in sorted(os.listdir(output_dir)):
+            parsed = parse_output_filename(name)
+            if parsed is not None and parsed[0] == base_name:
+                outputs.setdefault(parsed[2:], []).append(os.path.join(output_dir, name))
+    return outputs
+
+
+def plan_resplit(base_name, output_dir, split_points):
+    # Compares the wanted segments with the outputs on disk, going by their names:
+    #   keep:   (index, path) of outputs that already have the right name
+    #   rename: (index, old path, new path) of outputs whose number moved
+    #   write:  (index, start, end) of segments without an output
+    #   stale:  outputs of ranges no longer wanted, and extra copies of wanted ones
+    existing = find_outputs(base_name, output_dir)
+    plan = {"keep": [], "rename": [], "write": [], "stale": []}
+    for i, (start, end) in enumerate(split_points):
+        path = os.path.join(output_dir, get_output_filename(base_name, i, start, end))
+        paths = existing.pop((start, end), [])
+        if path in paths:
+            paths.remove(path)
+            plan["keep"].append((i, path))
+        elif paths:
+            plan["rename"].append((i, paths.pop(0), path))
+        else:
+            plan["write"].append((i, start, end))
+        plan["stale"].extend(paths)
+    for paths in existing.values():
+        plan["stale"].extend(paths)
+    return plan
+
+
+def merge_chain(ranges):
+    # Fewest contiguous (start, end) ranges that cover page 0 to the last page any of them
+    # reaches, in page order; None when the ranges leave a gap
+    if not ranges:
+        return None
+    target = max(end for _, end in ranges) + 1
+    by_start = {}
+    for start, end in ranges:
+        by_start.setdefault(start, []).append((start, end))
+    previous = {0: None}
+    queue = deque([0])
+    while queue and target not in previous:
+        page = queue.popleft()
+        for start, end in by_start.get(page, ()):
+            if end + 1 not in previous:
+                previous[end + 1] = (start, end)
+                queue.append(end + 1)
+    if target not in previous:
+        return None
+    chain = []
+    while target:
+        chain.append(previous[target])
+        target = chain[-1][0]
+    return chain[::-1]
+
+
+def merge_outputs(paths, output_path, garbage=4, deflate=True):
+    # Concatenates the PDFs by copying their page objects, nothing is rendered. garbage=4
+    # folds the fonts and images the parts each carried back into one copy. Written
+    # through a temporary file, so output_path may be one of the parts' parent.
+    merged = fitz.open()
+    temp_path = output_path + ".merging"
+    try:
+        for path in paths:
+            with fitz.open(path) as part:
+                merged.insert_pdf(part)
+        merged.save(temp_path, garbage=garbage, deflate=deflate)
+        merged.close()
+        os.replace(temp_path, output_path)
+    except BaseException:
+        merged.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return output_path
+
+
+@timed()
+def merge_split_outputs(base_name, output_dir, output_path=None):
+    # Rebuilds base_name.pdf from its split outputs in output_dir; returns (path, ranges used)
+    existing = find_outputs(base_name, output_dir)
+    chain = merge_chain(list(existing))
+    if chain is None:
+        raise ValueError(f"The split files of {base_name} do not cover its pages without gaps")
+    output_path = output_path or os.path.join(output_dir, base_name + ".pdf")
+    merge_outputs([existing[pages][0] for pages in chain], output_path)
+    return output_path, chain
+
+
+def get_split_points(bookmarks, page_count):
+    split_points = []
+    bookmarked_pages = sorted(bookmarks)
+    
+    if bookmarked_pages[0] > 0:
+        split_points.append((0, bookmarked_pages[0] - 1))
+    
+    for i in range(len(bookmarked_pages)):
+        start = bookmarked_pages[i]
+        end = bookmarked_pages[i+1] - 1 if i + 1 < len(bookmarked_pages) else page_count - 1
+        split_points.append((start, end))
+
+    return split_points
+
+
+def open_source(pdf_path, in_memory=False):
+    if in_memory:
+        # Reads the file into memory so every segment's insert_pdf reads from RAM instead of
+        # the disk. Shared fonts and images are still copied into each output on its own:
+        # every output is a separate document with its own graft map, and PyMuPDF has no way
+        # to resolve them once for all outputs, so no single-pass split is offered. Costs one
+        # copy of the file in memory; helps most on slow or network drives.
+        with open(pdf_path, 'rb') as f:
+            return fitz.open("pdf", f.read())
+    return fitz.open(pdf_path)
+
+
+def write_segments(source, base_name, output_dir, segments, garbage=0, deflate=False):
+    output_paths = []
+    for i, start, end in segments:
+        output = fitz.open()
+        output.insert_pdf(source, from_page=start, to_page=end)
+        output_path = os.path.join(output_dir, get_output_filename(base_name, i, start, end))
+        output.save(output_path, garbage=garbage, deflate=deflate)
+        output.close()
+        output_paths.append(output_path)
+    return output_paths
+
+
+def split_worker(pdf_path, output_dir, segments, in_memory=False, garbage=0, deflate=False):
+    # PyMuPDF documents cannot cross process boundaries, so each worker opens its own copy
+    source = open_source(pdf_path, in_memory)
+    try:
+        base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+        return write_segments(source, base_name, output_dir, segments, garbage, deflate)
+    finally:
+        source.close()
+
+
+def partition_segments(segments, workers):
+    # Longest segments first, each onto the worker with the fewest pages so far
+    loads = [(0, w) for w in range(workers)]
+    shares = [[] for _ in range(workers)]
+    for segment in sorted(segments, key=lambda s: s[2] - s[1], reverse=True):
+        pages, w = heapq.heappop(loads)
+        shares[w].append(segment)
+        heapq.heappush(loads, (pages + segment[2] - segment[1] + 1, w))
+    return [sorted(share) for share in shares if share]
+
+
+class PDFSplitter:
+    def __init__(self, pdf_path, output_dir, search_db=None):
+        self.pdf_document = fitz.open(pdf_path)
+        self.output_dir = output_dir
+        # Full-text index (search.db, tables already created) kept in step with the
+        # outputs split_pdf and resplit write, or None
+        self.search_db = search_db
+
+    @timed()
+    def split_pdf(self, bookmarks, in_memory=False, garbage=0, deflate=False, workers=1):
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
+
+        split_points = self.get_split_points(bookmarks)
+        segments = [(i, start, end) for i, (start, end) in enumerate(split_points)]
+        output_paths = self.split_segments(segments, in_memory, garbage, deflate, workers)
+        self.index_outputs(output_paths, split_points)
+
+        print(f"PDF split into {len(split_points)} files in {self.output_dir}")
+        return output_paths
+
+    @timed()
+    def resplit(self, bookmarks, **options):
+        # split_pdf after the bookmarks changed: outputs of page ranges that are still
+        # wanted are kept (renamed when their number moved), only new ranges are written,
+        # and outputs of ranges no longer wanted are removed. Outputs are matched by name,
+        # so after the source itself changed use split_pdf. Returns (output paths, plan).
+        os.makedirs(self.output_dir, exist_ok=True)
+        base_name = os.path.splitext(os.path.basename(self.pdf_document.name))[0]
+        split_points = self.get_split_points(bookmarks)
+        plan = plan_resplit(base_name, self.output_dir, split_points)
+
+        for _, old_path, new_path in plan["rename"]:
+            os.replace(old_path, new_path)
+        if plan["write"]:
+            self.split_segments(plan["write"], **options)
+        for path in plan["stale"]:
+            os.remove(path)
+
+        output_paths = [os.path.join(self.output_dir, get_output_filename(base_name, i, start, end))
+                        for i, (start, end) in enumerate(split_points)]
+        self.index_outputs(output_paths, split_points, [old_path for _, old_path, _ in plan["rename"]] + plan["stale"])
+
+        print(f"PDF split into {len(split_points)} files in {self.output_dir} "
+              f"({len(plan['write'])} written, {len(plan['stale'])} removed)")
+        return output_paths, plan
+
+    def index_outputs(self, output_paths, split_points, removed=()):
+        # The outputs' text is copied from the source's rows when the source is indexed,
+        # otherwise extracted; files that are gone are dropped from the index
+        if self.search_db is None:
+            return
+        for path in removed:
+            remove_file(self.search_db, os.path.abspath(path))
+        index_split_outputs(self.search_db, os.path.abspath(self.pdf_document.name),
+                            [(os.path.abspath(path), start, end)
+                             for path, (start, end) in zip(output_paths, split_points)])
+
+    def split_segments(self, segments, in_memory=False, garbage=0, deflate=False, workers=1):
+        # segments: (index, start, end); output paths in the same order
+        if workers > 1 and len(segments) > 1:
+            return self.split_parallel(segments, workers, in_memory, garbage, deflate)
+        base_name = os.path.splitext(os.path.basename(self.pdf_document.name))[0]
+        source = open_source(self.pdf_document.name, in_memory=True) if in_memory else self.pdf_document
+        try:
+            return write_segments(source, base_name, self.output_dir, segments, garbage, deflate)
+        finally:
+            if source is not self.pdf_document:
+                source.close()
+
+    def split_parallel(self, segments, workers, in_memory=False, garbage=0, deflate=False):
+        shares = partition_segments(segments, min(workers, len(segments)))
+        positions = {segment[0]: n for n, segment in enumerate(segments)}
+        output_paths = [None] * len(segments)
+        with ProcessPoolExecutor(max_workers=len(shares)) as pool:
+            futures = [
+                pool.submit(split_worker, self.pdf_document.name, self.output_dir, share,
+                            in_memory, garbage, deflate)
+                for share in shares
+            ]
+            for share, future in zip(shares, futures):
+                for (i, _, _), path in zip(share, future.result()):
+                    output_paths[positions[i]] = path
+        return output_paths
+
+    def get_split_points(self, bookmarks):
+        return get_split_points(bookmarks, len(self.pdf_document))
+
+    def close(self):
+        self.pdf_document.close()
\ No newline at end of file
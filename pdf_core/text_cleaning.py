@@ -0,0 +1,52 @@
+import re
+
+# ASCII control characters, except \n, \t and \r, and DEL. \r is removed after the '='
+# fix-up, as in the original four passes, so "\n\r=" is not treated as a line start.
+_DELETE_BYTES = bytes(c for c in range(128) if not chr(c).isprintable() and chr(c) not in "\n\t\r")
+_CONTROL_CHARS = re.compile("[%s]" % re.escape(_DELETE_BYTES.decode('ascii')))
+
+
+class _UnicodeTable(dict):
+    # str.translate table for keep_unicode, built on first sight of each character so the
+    # per-character rules run once per distinct character instead of once per character
+    def __missing__(self, code):
+        char = chr(code)
+        if code < 128:
+            value = None if code in _DELETE_BYTES else char
+        elif char.isprintable():
+            value = char
+        elif char.isspace():
+            value = " "
+        else:
+            # Control, format, surrogate and unassigned characters cannot go into a cell
+            value = None
+        self[code] = value
+        return value
+
+
+_UNICODE_TABLE = _UnicodeTable()
+
+
+def clean_text_for_excel(text, keep_unicode=False):
+    # Removes control and non-printable characters, replaces non-ASCII characters with
+    # '?' (kept as-is with keep_unicode) and quotes '=' at the start of a line so Excel
+    # does not read it as a formula
+    if keep_unicode and not text.isascii():
+        text = _CONTROL_CHARS.sub("", text)
+        # Most text is printable once ASCII controls are gone; only the rest goes through
+        # the much slower per-character table
+        if not text.replace("\n", " ").replace("\t", " ").replace("\r", " ").isprintable():
+            text = text.translate(_UNICODE_TABLE)
+        if "=" in text:
+            if text.startswith("="):
+                text = "'" + text
+            text = text.replace("\n=", "\n'=")
+        return text.replace("\r", "")
+
+    # Byte-level passes are far cheaper than per-character work on str
+    data = text.encode('ascii', 'replace').translate(None, _DELETE_BYTES)
+    if b"=" in data:
+        if data.startswith(b"="):
+            data = b"'" + data
+        data = data.replace(b"\n=", b"\n'=")
+    return data.replace(b"\r", b"").decode('ascii')
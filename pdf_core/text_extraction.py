@@ -0,0 +1,230 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
+import fitz
+
+
+class PyMuPDFBackend:
+    name = "pymupdf"
+    uses_fitz = True
+
+    def open(self, pdf_path):
+        return fitz.open(pdf_path)
+
+    def page_count(self, doc):
+        return len(doc)
+
+    def page_text(self, doc, page_num):
+        return doc[page_num].get_text()
+
+    def close(self, doc):
+        doc.close()
+
+
+class LayoutBackend(PyMuPDFBackend):
+    # Rebuilds each line from word positions, padding horizontal gaps with spaces so
+    # columns and tables keep their shape
+    name = "layout"
+
+    def page_text(self, doc, page_num):
+        words = doc[page_num].get_text("words")
+        if not words:
+            return ""
+        # Degenerate or rotated text can give words no width at all; 1pt keeps columns finite
+        char_width = max(1.0, sum(w[2] - w[0] for w in words) / max(1, sum(len(w[4]) for w in words)))
+
+        rows = []
+        for word in sorted(words, key=lambda w: (w[3], w[0])):
+            if rows and abs(rows[-1][0] - word[3]) <= 3:
+                rows[-1][1].append(word)
+            else:
+                rows.append((word[3], [word]))
+
+        lines = []
+        for _, row in rows:
+            line = ""
+            for x0, _, _, _, text, *_ in sorted(row, key=lambda w: w[0]):
+                column = int(x0 / char_width)
+                line += " " * max(1 if line else 0, column - len(line)) + text
+            lines.append(line)
+        return "\n".join(lines) + "\n"
+
+
+class PyPDF2Backend:
+    name = "pypdf2"
+    uses_fitz = False
+
+    def open(self, pdf_path):
+        import PyPDF2
+        return PyPDF2.PdfReader(pdf_path)
+
+    def page_count(self, doc):
+        return len(doc.pages)
+
+    def page_text(self, doc, page_num):
+        return doc.pages[page_num].extract_text()
+
+    def close(self, doc):
+        pass
+
+
+BACKENDS = {backend.name: backend for backend in (PyMuPDFBackend(), LayoutBackend(), PyPDF2Backend())}
+
+
+def extract_chunk(pdf_path, backend_name, start, end):
+    # Opened per chunk so workers never keep files open (and locked on Windows) between jobs
+    backend = BACKENDS[backend_name]
+    doc = backend.open(pdf_path)
+    try:
+        return [backend.page_text(doc, page_num) for page_num in range(start, end)]
+    finally:
+        backend.close(doc)
+
+
+def count_pages(pdf_path, backend_name="pymupdf"):
+    backend = BACKENDS[backend_name]
+    doc = backend.open(pdf_path)
+    try:
+        return backend.page_count(doc)
+    finally:
+        backend.close(doc)
+
+
+# Splits page ranges of one or more PDFs into chunks, extracts them in a process pool
+# and hands the text back in page order. Small jobs run in-process, where starting
+# the pool would cost more than it saves; an already open fitz document is reused there.
+class TextExtractor:
+    def __init__(self, backend="pymupdf", workers=None, chunk_size=32):
+        self.backend = backend
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.pool = None
+        self.local_reader = None
+        self.pages = 0
+        self.seconds = 0.0
+        # backend name -> [pages, seconds] over the life of the extractor
+        self.timings = {}
+
+    # Every extracting method takes an optional backend name for that call, so a caller
+    # can keep one backend for a whole file while self.backend is changed for new files.
+
+    def page_text(self, doc, page_num, backend=None):
+        # Single page from an open fitz document, for callers that extract on demand
+        start_time = time.perf_counter()
+        texts = self.extract_local(doc.name, page_num, page_num + 1, doc, backend)
+        self.record(1, time.perf_counter() - start_time, backend)
+        return texts[0]
+
+    def chunk_pages(self, pages, backend=None):
+        # Opening a fitz document only reads its xref, so small chunks cost little and
+        # balance the workers. PyPDF2 parses the whole file on every open, so its chunks
+        # are as large as the workers allow: one parse per worker, not one per 32 pages.
+        if BACKENDS[backend or self.backend].uses_fitz:
+            return self.chunk_size
+        return max(self.chunk_size, -(-pages // self.workers))
+
+    def make_chunks(self, jobs, backend=None):
+        # jobs: (pdf_path, start, end) ranges -> (pdf_path, start, end) chunks
+        chunks = deque()
+        for pdf_path, start, end in jobs:
+            size = self.chunk_pages(end - start, backend)
+            chunks.extend((pdf_path, chunk_start, min(chunk_start + size, end))
+                          for chunk_start in range(start, end, size))
+        return chunks
+
+    def submit(self, jobs, backend=None):
+        # Queues the ranges on the worker pool without waiting: [(pdf_path, start, future)],
+        # each future giving the texts of the pages from start on
+        backend = backend or self.backend
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return [(pdf_path, start, self.pool.submit(extract_chunk, pdf_path, backend, start, end))
+                for pdf_path, start, end in self.make_chunks(jobs, backend)]
+
+    def iter_pages(self, jobs, doc=None, backend=None):
+        # jobs: (pdf_path, start, end) ranges; yields (pdf_path, page_num, text)
+        backend = backend or self.backend
+        chunks = self.make_chunks(jobs, backend)
+        start_time = time.perf_counter()
+        emitted = 0
+        try:
+            if len(chunks) <= 1 or self.workers == 1:
+                for pdf_path, start, end in chunks:
+                    texts = self.extract_local(pdf_path, start, end, doc, backend)
+                    emitted += len(texts)
+                    yield from self.emit(pdf_path, start, texts)
+                return
+
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            # Keep two chunks per worker in flight so memory stays bounded on huge jobs
+            running = deque()
+            while chunks or running:
+                while chunks and len(running) < self.workers * 2:
+                    pdf_path, start, end = chunks.popleft()
+                    running.append((pdf_path, start, self.pool.submit(extract_chunk, pdf_path, backend, start, end)))
+                pdf_path, start, future = running.popleft()
+                texts = future.result()
+                emitted += len(texts)
+                yield from self.emit(pdf_path, start, texts)
+        finally:
+            self.record(emitted, time.perf_counter() - start_time, backend)
+
+    def extract_local(self, pdf_path, start, end, doc=None, backend=None):
+        name = backend or self.backend
+        backend = BACKENDS[name]
+        if doc is not None and backend.uses_fitz and doc.name == pdf_path:
+            return [backend.page_text(doc, page_num) for page_num in range(start, end)]
+        if not backend.uses_fitz:
+            # PyPDF2 reads the whole file into memory on open, so the last reader is kept for
+            # on-demand page requests instead of parsing the file again for each one
+            if self.local_reader is None or self.local_reader[0] != (pdf_path, name):
+                self.local_reader = ((pdf_path, name), backend.open(pdf_path))
+            return [backend.page_text(self.local_reader[1], page_num) for page_num in range(start, end)]
+        return extract_chunk(pdf_path, name, start, end)
+
+    def emit(self, pdf_path, start, texts):
+        for offset, text in enumerate(texts):
+            yield pdf_path, start + offset, text
+
+    def record(self, pages, seconds, backend=None):
+        self.pages += pages
+        self.seconds += seconds
+        timing = self.timings.setdefault(backend or self.backend, [0, 0.0])
+        timing[0] += pages
+        timing[1] += seconds
+
+    def extract_pages(self, pdf_path, doc=None):
+        page_count = len(doc) if doc is not None else count_pages(pdf_path, self.backend)
+        return [text for _, _, text in self.iter_pages([(pdf_path, 0, page_count)], doc)]
+
+    def extract_files(self, pdf_paths):
+        content = {pdf_path: [] for pdf_path in pdf_paths}
+        jobs = [(pdf_path, 0, count_pages(pdf_path, self.backend)) for pdf_path in pdf_paths]
+        for pdf_path, _, text in self.iter_pages(jobs):
+            content[pdf_path].append(text)
+        return content
+
+    @property
+    def pages_per_second(self):
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        return (f"Extracted {self.pages} pages with {self.backend} in {self.seconds:.2f}s "
+                f"({self.pages_per_second:.0f} pages/s)")
+
+    def timing_report(self):
+        return "\n".join(
+            f"{name}: {pages} pages in {seconds:.2f}s ({pages / seconds if seconds else 0:.0f} pages/s)"
+            for name, (pages, seconds) in sorted(self.timings.items())
+        )
+
+    def reset_stats(self):
+        self.pages = 0
+        self.seconds = 0.0
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
@@ -0,0 +1,32 @@
+import os
+import sys
+import fitz
+import pytest
+
+# The apps run as scripts, so pdf_core is imported from the repository root rather than
+# from an installed package
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+def page_text(page_num):
+    return f"page {page_num}"
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    # make_pdf("book.pdf", 10) -> path of a 10-page PDF whose page n reads "page n"
+    def make(name, pages, directory=None):
+        path = os.path.join(directory or tmp_path, name)
+        doc = fitz.open()
+        for page_num in range(pages):
+            doc.new_page().insert_text((72, 72), page_text(page_num))
+        doc.save(path)
+        doc.close()
+        return path
+    return make
+
+
+def pdf_texts(path):
+    with fitz.open(path) as doc:
+        return [page.get_text().strip() for page in doc]
@@ -0,0 +1,101 @@
+import os
+import shutil
+import sqlite3
+import pytest
+from pdf_core.bookmark_store import BookmarkStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "bookmarks.db")
+
+
+def saved_pages(db_path, pdf_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[0] for row in conn.execute("SELECT page FROM file_bookmarks WHERE path=?",
+                                               (os.path.abspath(pdf_path),))}
+    finally:
+        conn.close()
+
+
+def test_legacy_bookmarks_are_adopted_and_written_on_flush(db_path, make_pdf):
+    pdf_path = make_pdf("book.pdf", 5)
+    store = BookmarkStore(db_path)
+    with store.conn:
+        # Rows of the old table, keyed by basename only
+        store.conn.executemany("INSERT INTO bookmarks (filename, page) VALUES (?, ?)",
+                               [("book.pdf", 1), ("book.pdf", 3), ("other.pdf", 2)])
+
+    assert store.load(pdf_path) == {1, 3}
+    assert saved_pages(db_path, pdf_path) == set()
+    assert store.flush() == 2
+    assert saved_pages(db_path, pdf_path) == {1, 3}
+    store.close()
+
+    # Adopted once: the new rows win over the old table from now on
+    store = BookmarkStore(db_path)
+    store.remove(pdf_path, 1)
+    store.close()
+    store = BookmarkStore(db_path)
+    assert store.load(pdf_path) == {3}
+    store.close()
+
+
+def test_writes_are_queued_until_flush(db_path, make_pdf):
+    pdf_path = make_pdf("book.pdf", 5)
+    store = BookmarkStore(db_path)
+    store.add(pdf_path, 2)
+    store.add(pdf_path, 4)
+    store.remove(pdf_path, 4)
+    assert store.load(pdf_path) == {2}
+    assert saved_pages(db_path, pdf_path) == set()
+
+    assert store.flush() == 2
+    assert saved_pages(db_path, pdf_path) == {2}
+    assert store.flush() == 0
+    store.close()
+
+
+def test_close_flushes(db_path, make_pdf):
+    pdf_path = make_pdf("book.pdf", 5)
+    store = BookmarkStore(db_path)
+    store.add(pdf_path, 1)
+    store.close()
+    assert saved_pages(db_path, pdf_path) == {1}
+
+
+def test_files_with_the_same_name_keep_their_own_bookmarks(db_path, make_pdf, tmp_path):
+    first = make_pdf("book.pdf", 5)
+    os.mkdir(tmp_path / "other")
+    second = make_pdf("book.pdf", 6, str(tmp_path / "other"))
+    store = BookmarkStore(db_path)
+    store.add(first, 1)
+    store.add(second, 4)
+    assert store.load(first) == {1}
+    assert store.load(second) == {4}
+    store.close()
+
+
+def test_a_copy_starts_with_the_bookmarks_of_its_original(db_path, make_pdf, tmp_path):
+    pdf_path = make_pdf("book.pdf", 5)
+    store = BookmarkStore(db_path)
+    store.add(pdf_path, 3)
+    store.flush()
+    copy_path = str(tmp_path / "copy.pdf")
+    shutil.copy(pdf_path, copy_path)
+    assert store.load(copy_path) == {3}
+    store.close()
+
+
+def test_rekey_moves_bookmarks_to_the_new_content(db_path, make_pdf, tmp_path):
+    pdf_path = make_pdf("book.pdf", 5)
+    store = BookmarkStore(db_path)
+    store.add(pdf_path, 2)
+    old_hash, _ = store.file_key(pdf_path)
+    # Rewritten in place, as when merge_splits rebuilds it from its split files
+    make_pdf("book.pdf", 6)
+    assert store.rekey(pdf_path, old_hash) == 1
+    assert store.load(pdf_path) == {2}
+    assert store.conn.execute("SELECT COUNT(*) FROM file_bookmarks WHERE file_hash=?", (old_hash,)).fetchone()[0] == 0
+    store.close()
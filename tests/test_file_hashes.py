@@ -0,0 +1,36 @@
+import sqlite3
+import pytest
+from pdf_core import file_hashes
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    file_hashes.setup_table(conn)
+    yield conn
+    conn.close()
+
+
+def test_hash_is_read_again_only_after_a_change(conn, make_pdf, monkeypatch):
+    path = make_pdf("book.pdf", 3)
+    first = file_hashes.cached_file_hash(conn, path)
+    assert first == file_hashes.file_digest(path)
+    monkeypatch.setattr(file_hashes, "file_digest", lambda path: pytest.fail("hashed again"))
+    assert file_hashes.cached_file_hash(conn, path) == first
+    monkeypatch.undo()
+
+    make_pdf("book.pdf", 4)
+    assert file_hashes.cached_file_hash(conn, path) != first
+
+
+def test_remember_hash_leaves_an_open_transaction_to_the_caller(conn, make_pdf):
+    path = make_pdf("book.pdf", 3)
+    file_hashes.remember_hash(conn, path, "abc")
+    assert not conn.in_transaction
+
+    conn.execute("CREATE TABLE other (x)")
+    conn.execute("INSERT INTO other VALUES (1)")
+    file_hashes.remember_hash(conn, path, "def")
+    assert conn.in_transaction
+    conn.rollback()
+    assert conn.execute("SELECT file_hash FROM file_hashes").fetchall() == [("abc",)]
@@ -0,0 +1,107 @@
+import os
+import shutil
+import pytest
+from conftest import page_text, pdf_texts
+from pdf_core.library_store import LibraryStore
+from pdf_core.splitting import PDFSplitter
+
+
+@pytest.fixture
+def library(tmp_path):
+    library_dir = tmp_path / "library"
+    library_dir.mkdir()
+    store = LibraryStore(str(tmp_path / "library.db"), str(library_dir))
+    yield store
+    store.close()
+
+
+def test_import_numbers_new_files(library, make_pdf):
+    path, how = library.import_file(make_pdf("book.pdf", 3))
+    assert os.path.basename(path) == "001_book.pdf"
+    assert how in ("reflinked", "copied")
+
+
+def test_same_content_under_the_same_name_is_imported_once(library, make_pdf):
+    src_path = make_pdf("book.pdf", 3)
+    first, _ = library.import_file(src_path)
+    assert library.import_file(src_path) == (first, "existing")
+    assert os.listdir(library.library_dir) == ["001_book.pdf"]
+    assert library.stats()["imports"] == 1
+
+
+def test_same_content_under_a_new_name_is_linked(library, make_pdf, tmp_path):
+    src_path = make_pdf("book.pdf", 3)
+    first, _ = library.import_file(src_path)
+    renamed = str(tmp_path / "renamed.pdf")
+    shutil.copy(src_path, renamed)
+    second, how = library.import_file(renamed)
+    assert os.path.basename(second) == "001_renamed.pdf"
+    assert how in ("reflinked", "hardlinked", "copied")
+    assert library.stats() == {"imports": 2, "distinct_imports": 1, "split_outputs": 0}
+
+
+def test_changed_content_gets_the_next_number(library, make_pdf):
+    library.import_file(make_pdf("book.pdf", 3))
+    path, _ = library.import_file(make_pdf("book.pdf", 4))
+    assert os.path.basename(path) == "002_book.pdf"
+
+
+def test_numbers_of_files_added_by_hand_are_not_reused(make_pdf, tmp_path):
+    library_dir = tmp_path / "library"
+    library_dir.mkdir()
+    shutil.copy(make_pdf("book.pdf", 3), library_dir / "007_book.pdf")
+    store = LibraryStore(str(tmp_path / "library.db"), str(library_dir))
+    try:
+        path, _ = store.import_file(make_pdf("book.pdf", 4))
+    finally:
+        store.close()
+    assert os.path.basename(path) == "008_book.pdf"
+
+
+def split(library, pdf_path, output_dir, bookmarks):
+    splitter = PDFSplitter(pdf_path, output_dir)
+    try:
+        return library.split(splitter, bookmarks)
+    finally:
+        splitter.close()
+
+
+def test_split_again_reuses_unchanged_segments(library, make_pdf, tmp_path):
+    pdf_path = make_pdf("book.pdf", 6)
+    output_dir = str(tmp_path / "out")
+    output_paths, report = split(library, pdf_path, output_dir, {2, 4})
+    assert (report["reused"], report["written"]) == (0, 3)
+    mtimes = [os.path.getmtime(path) for path in output_paths]
+
+    output_paths, report = split(library, pdf_path, output_dir, {2, 4})
+    assert (report["reused"], report["written"], report["removed"]) == (3, 0, [])
+    assert [os.path.getmtime(path) for path in output_paths] == mtimes
+
+
+def test_split_with_new_bookmarks_writes_only_new_ranges(library, make_pdf, tmp_path):
+    pdf_path = make_pdf("book.pdf", 6)
+    output_dir = str(tmp_path / "out")
+    split(library, pdf_path, output_dir, {2, 4})
+
+    output_paths, report = split(library, pdf_path, output_dir, {4})
+    # 5-6 moved from the third name to the second and is linked, not written again
+    assert (report["reused"], report["written"]) == (1, 1)
+    assert sorted(os.path.basename(path) for path in report["removed"]) == [
+        "book_split_1_1-2.pdf", "book_split_2_3-4.pdf", "book_split_3_5-6.pdf"]
+    assert sorted(os.listdir(output_dir)) == ["book_split_1_1-4.pdf", "book_split_2_5-6.pdf"]
+    assert pdf_texts(output_paths[1]) == [page_text(4), page_text(5)]
+
+
+def test_split_of_a_duplicate_import_links_the_segments(library, make_pdf, tmp_path):
+    src_path = make_pdf("book.pdf", 6)
+    first, _ = library.import_file(src_path)
+    split(library, first, library.library_dir, {3})
+    copy_path = str(tmp_path / "copy.pdf")
+    shutil.copy(src_path, copy_path)
+    second, _ = library.import_file(copy_path)
+
+    output_paths, report = split(library, second, library.library_dir, {3})
+    assert (report["reused"], report["written"]) == (2, 0)
+    assert [os.path.basename(path) for path in output_paths] == [
+        "001_copy_split_1_1-3.pdf", "001_copy_split_2_4-6.pdf"]
+    assert pdf_texts(output_paths[1]) == [page_text(n) for n in range(3, 6)]
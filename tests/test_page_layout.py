@@ -0,0 +1,67 @@
+import pytest
+from pdf_core.page_layout import PageLayout
+
+LETTER = (612, 792)
+
+
+@pytest.fixture
+def layout():
+    # 10 letter pages in 3 columns; zoom 1 gives rows of 792 + 8 points
+    return PageLayout([LETTER] * 10, columns=3, width=3 * 612 + 4 * 8)
+
+
+def test_geometry(layout):
+    assert layout.zoom == 1
+    assert layout.row_tops == [8, 808, 1608, 2408, 3208]
+    assert layout.total_height == 3208
+    assert layout.page_rect(4) == (628, 808, 1240, 1600)
+
+
+def test_pages_in_the_first_row(layout):
+    assert layout.pages_in(0, 500) == range(0, 3)
+
+
+def test_pages_in_spanning_rows(layout):
+    assert layout.pages_in(500, 1700) == range(0, 9)
+
+
+def test_pages_in_the_last_row_is_cut_at_the_page_count(layout):
+    assert layout.pages_in(2500, 5000) == range(9, 10)
+
+
+def test_pages_in_ignores_a_row_whose_gap_alone_is_visible(layout):
+    # [1600, 1608) is the gap above row 2; only row 1 is on screen
+    assert layout.pages_in(900, 1604) == range(3, 6)
+    assert layout.pages_in(1602, 1700) == range(6, 9)
+
+
+def test_pages_in_an_empty_layout():
+    assert PageLayout([], columns=2).pages_in(0, 1000) == range(0)
+
+
+def test_page_at(layout):
+    assert layout.page_at(10, 10) == 0
+    assert layout.page_at(628 + 100, 808 + 100) == 4
+    assert layout.page_at(100, 2500) == 9
+
+
+def test_page_at_in_a_gap_or_past_the_last_page(layout):
+    assert layout.page_at(4, 100) is None
+    assert layout.page_at(100, 804) is None
+    assert layout.page_at(1300, 3000) is None
+
+
+def test_narrow_pages_are_centred_and_hit(layout):
+    mixed = PageLayout([LETTER, (306, 792)], columns=2, width=2 * 612 + 3 * 8)
+    x0, y0, x1, y1 = mixed.page_rect(1)
+    assert (x0, x1) == (628 + 153, 628 + 153 + 306)
+    assert mixed.page_at(630, 100) is None
+    assert mixed.page_at(x0, 100) == 1
+
+
+def test_set_geometry_keeps_the_columns(layout):
+    layout.set_geometry(2 * 612 + 3 * 8)
+    assert layout.columns == 3
+    layout.set_geometry(2 * 612 + 3 * 8, columns=2)
+    assert layout.zoom == 1
+    assert layout.pages_in(0, 500) == range(0, 2)
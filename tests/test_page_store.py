@@ -0,0 +1,45 @@
+import os
+import sys
+from concurrent.futures import wait
+import pytest
+from conftest import ROOT_DIR
+from pdf_core.text_extraction import TextExtractor, extract_chunk
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "Add Text to split PDF to XLSX (done)"))
+from page_store import PageTextStore  # noqa: E402
+
+
+@pytest.fixture
+def extractor():
+    extractor = TextExtractor(workers=1)
+    yield extractor
+    extractor.close()
+
+
+def backend_texts(pdf_path, backend, page_count):
+    return extract_chunk(pdf_path, backend, 0, page_count)
+
+
+def test_pages_keep_the_backend_the_store_was_opened_with(make_pdf, extractor):
+    pdf_path = make_pdf("book.pdf", 6)
+    store = PageTextStore.open(pdf_path, extractor)
+    assert store[0] == backend_texts(pdf_path, "pymupdf", 1)[0]
+
+    # Chosen in the app after the file was opened: only files opened later use it
+    extractor.backend = "layout"
+    expected = backend_texts(pdf_path, "pymupdf", 6)
+    assert expected != backend_texts(pdf_path, "layout", 6)
+    assert store[1] == expected[1]
+    store.start_warm_up()
+    wait([future for _, _, future in store.warm_up_jobs])
+    store.collect_warm_up()
+    assert list(store) == expected
+
+    assert PageTextStore.open(pdf_path, extractor)[0] == backend_texts(pdf_path, "layout", 1)[0]
+
+
+def test_fill_uses_the_store_backend(make_pdf, extractor):
+    pdf_path = make_pdf("book.pdf", 4)
+    store = PageTextStore.open(pdf_path, extractor, backend="pypdf2")
+    store.fill()
+    assert [store.extracted[p] for p in range(4)] == backend_texts(pdf_path, "pypdf2", 4)
@@ -0,0 +1,17 @@
+from pdf_core.search_index import SearchIndex
+
+
+def test_release_leaves_no_job_on_the_file(make_pdf, tmp_path):
+    index = SearchIndex(str(tmp_path / "search.db"))
+    try:
+        paths = [make_pdf(f"book{n}.pdf", 3) for n in range(3)]
+        for path in paths:
+            index.ensure(path)
+        index.release(paths[2])
+        index.release(paths[0])
+        assert str(tmp_path / "book0.pdf") not in index.jobs and len(index.jobs) == 1
+        # The other file's job is left to run
+        index.jobs[str(tmp_path / "book1.pdf")].result(timeout=60)
+        assert index.search("page")
+    finally:
+        index.close()
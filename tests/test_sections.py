@@ -0,0 +1,74 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import fitz
+import openpyxl
+import pytest
+from pdf_core.sections import export_file, export_sections, iter_sections, set_progress_queue
+from pdf_core.text_extraction import TextExtractor
+
+
+@pytest.fixture
+def book(make_pdf):
+    doc = fitz.open(make_pdf("book.pdf", 6))
+    yield doc
+    doc.close()
+
+
+def test_pages_before_the_first_bookmark_are_a_section(book):
+    sections = list(iter_sections(book, {2, 4}))
+    assert [(i, start, end) for i, start, end, _ in sections] == [(0, 0, 1), (1, 2, 3), (2, 4, 5)]
+    assert "page 0" in sections[0][3] and "page 1" in sections[0][3]
+    assert "page 2" not in sections[0][3]
+
+
+def test_no_leading_section_when_the_first_page_is_bookmarked(book):
+    assert [(start, end) for _, start, end, _ in iter_sections(book, {0, 3})] == [(0, 2), (3, 5)]
+
+
+def test_no_bookmarks_no_sections(book):
+    assert list(iter_sections(book, set())) == []
+
+
+def test_pages_are_joined_with_the_separator(book):
+    page_texts = [book[n].get_text() for n in range(2)]
+    (_, _, _, text), *_ = iter_sections(book, {2})
+    assert text == "\n".join(page_texts)
+    (_, _, _, text), *_ = iter_sections(book, {2}, separator="")
+    # The Bookmark_Split to XLSX app has always written its cells without a separator
+    assert text == "".join(page_texts)
+
+
+def test_export_sections_writes_a_row_per_section(book, tmp_path):
+    xlsx_path = str(tmp_path / "book.xlsx")
+    assert export_sections(book, {2, 4}, xlsx_path) == 3
+
+    workbook = openpyxl.load_workbook(xlsx_path)
+    rows = list(workbook.active.iter_rows(values_only=True))
+    assert rows[0] == ("File", "Range", "Content")
+    assert [row[:2] for row in rows[1:]] == [
+        ("book_split_1_1-2.pdf", "1-2"), ("book_split_2_3-4.pdf", "3-4"), ("book_split_3_5-6.pdf", "5-6")]
+    assert rows[1][2] == "\n".join(book[n].get_text() for n in range(2)).strip()
+
+
+def test_export_sections_reports_progress(book, tmp_path):
+    counts = []
+    export_sections(book, {2, 4}, str(tmp_path / "book.xlsx"), progress=lambda *args: counts.append(args))
+    assert counts == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_export_file_reports_progress_from_a_worker(make_pdf, tmp_path):
+    progress = multiprocessing.Queue()
+    with ProcessPoolExecutor(max_workers=1, initializer=set_progress_queue, initargs=(progress,)) as pool:
+        xlsx_path = str(tmp_path / "book.xlsx")
+        assert pool.submit(export_file, make_pdf("book.pdf", 6), {3}, xlsx_path).result(timeout=60) == 2
+    assert [progress.get(timeout=10) for _ in range(2)] == [(1, 2), (2, 2)]
+
+
+def test_sections_from_a_text_extractor(book):
+    # The same sections whether the pages are read here or by the extractor's workers
+    extractor = TextExtractor(workers=1)
+    try:
+        expected = list(iter_sections(book, {2, 4}))
+        assert list(iter_sections(book, {2, 4}, extractor)) == expected
+    finally:
+        extractor.close()
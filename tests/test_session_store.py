@@ -0,0 +1,133 @@
+import os
+import sys
+from functools import partial
+import pytest
+from conftest import ROOT_DIR, page_text
+from pdf_core.text_extraction import TextExtractor, extract_chunk
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "Add Text to split PDF to XLSX (done)"))
+from page_store import PageTextStore  # noqa: E402
+from session_store import SessionStore  # noqa: E402
+
+STATE = {"pdf_dir": "", "selected_files": [], "current_pdf": None, "current_page": 0}
+
+
+@pytest.fixture
+def extractor():
+    extractor = TextExtractor(workers=1)
+    yield extractor
+    extractor.close()
+
+
+@pytest.fixture
+def session_path(tmp_path):
+    return str(tmp_path / "work.session")
+
+
+def saved_edits(session_path):
+    session = SessionStore(session_path)
+    try:
+        return {page: text for _, file_hash, _ in session.load_files()
+                for page, text in session.conn.execute("SELECT page, text FROM edits WHERE file_hash=?",
+                                                       (file_hash,))}
+    finally:
+        session.close()
+
+
+def reload(session_path, extractor):
+    # What the app's load_session does with a .session file
+    session = SessionStore(session_path)
+    stores = {}
+    for pdf_path, file_hash, page_count in session.load_files():
+        if session.changed(pdf_path, file_hash):
+            stores[pdf_path] = PageTextStore.open(pdf_path, extractor)
+            continue
+        store = PageTextStore(pdf_path, page_count, extractor)
+        store.edit_source = partial(session.load_edits, pdf_path, file_hash)
+        stores[pdf_path] = store
+    return session, stores
+
+
+def test_only_edited_pages_are_saved(make_pdf, extractor, session_path):
+    pdf_path = make_pdf("book.pdf", 5)
+    store = PageTextStore.open(pdf_path, extractor)
+    store[1] = "edited 1"
+    store[3] = store[3].strip()
+    session = SessionStore(session_path)
+    try:
+        assert session.save(STATE, [store], full=True) == 1
+        assert session.save(STATE, [store]) == 0
+        store[4] = "edited 4"
+        assert session.save(STATE, [store]) == 1
+        assert session.load_state() == STATE
+    finally:
+        session.close()
+    assert saved_edits(session_path) == {1: "edited 1", 4: "edited 4"}
+
+    session, stores = reload(session_path, extractor)
+    try:
+        assert [text.strip() for text in stores[pdf_path]] == [
+            page_text(0), "edited 1", page_text(2), page_text(3), "edited 4"]
+    finally:
+        session.close()
+
+
+def test_reverting_an_edit_deletes_its_row(make_pdf, extractor, session_path):
+    pdf_path = make_pdf("book.pdf", 3)
+    store = PageTextStore.open(pdf_path, extractor)
+    store[1] = "edited 1"
+    session = SessionStore(session_path)
+    try:
+        session.save(STATE, [store], full=True)
+        store[1] = page_text(1)
+        assert store.edits == {} and store.dirty == {1}
+        assert session.save(STATE, [store]) == 1
+    finally:
+        session.close()
+    assert saved_edits(session_path) == {}
+
+
+def test_legacy_json_import_keeps_only_real_edits(make_pdf, extractor, session_path):
+    pytest.importorskip("PyPDF2")
+    pdf_path = make_pdf("book.pdf", 4)
+    # Old JSON sessions held PyPDF2's text of every page, edited or not
+    pages = extract_chunk(pdf_path, "pypdf2", 0, 4)
+    pages[2] = "edited 2"
+    store = PageTextStore.from_session(pdf_path, pages, extractor)
+    assert store.full_copy and len(store.edits) == 4
+
+    store.drop_unchanged_edits()
+    assert store.edits == {2: "edited 2"}
+    assert not store.full_copy
+    session = SessionStore(session_path)
+    try:
+        assert session.save(STATE, [store], full=True) == 1
+    finally:
+        session.close()
+    assert saved_edits(session_path) == {2: "edited 2"}
+
+
+def test_a_pdf_changed_after_saving_is_reopened_without_the_edits(make_pdf, extractor, session_path):
+    pdf_path = make_pdf("book.pdf", 3)
+    store = PageTextStore.open(pdf_path, extractor)
+    store[1] = "edited 1"
+    session = SessionStore(session_path)
+    try:
+        session.save(STATE, [store], full=True)
+    finally:
+        session.close()
+
+    make_pdf("book.pdf", 5)
+    session, stores = reload(session_path, extractor)
+    try:
+        store = stores[pdf_path]
+        assert len(store) == 5
+        assert store.edits == {}
+        assert store[1].strip() == page_text(1)
+        # The old edits are kept in the session file under the previous hash
+        (_, file_hash, _), = session.load_files()
+        assert session.changed(pdf_path, file_hash)
+        assert session.load_edits(pdf_path, file_hash) == {}
+    finally:
+        session.close()
+    assert saved_edits(session_path) == {1: "edited 1"}
@@ -0,0 +1,111 @@
+import os
+import pytest
+from conftest import page_text, pdf_texts
+from pdf_core.splitting import (PDFSplitter, get_output_filename, get_split_points, merge_chain,
+                                merge_split_outputs, plan_resplit)
+
+
+def test_split_points_start_with_the_pages_before_the_first_bookmark():
+    assert get_split_points({3, 7}, 10) == [(0, 2), (3, 6), (7, 9)]
+
+
+def test_split_points_from_the_first_page():
+    assert get_split_points([5, 0], 8) == [(0, 4), (5, 7)]
+    assert get_split_points({0}, 4) == [(0, 3)]
+
+
+def test_split_point_on_the_last_page():
+    assert get_split_points({9}, 10) == [(0, 8), (9, 9)]
+
+
+def test_split_pdf_writes_one_file_per_section(make_pdf, tmp_path):
+    pdf_path = make_pdf("book.pdf", 6)
+    splitter = PDFSplitter(pdf_path, str(tmp_path / "out"))
+    try:
+        output_paths = splitter.split_pdf({2, 4})
+    finally:
+        splitter.close()
+    assert [os.path.basename(path) for path in output_paths] == [
+        "book_split_1_1-2.pdf", "book_split_2_3-4.pdf", "book_split_3_5-6.pdf"]
+    assert pdf_texts(output_paths[1]) == [page_text(2), page_text(3)]
+
+
+def touch(directory, *names):
+    for name in names:
+        (directory / name).write_bytes(b"")
+    return [str(directory / name) for name in names]
+
+
+def test_plan_resplit_keeps_renames_writes_and_removes(tmp_path):
+    kept, moved, gone = touch(tmp_path, "book_split_1_1-2.pdf", "book_split_3_5-6.pdf", "book_split_2_3-4.pdf")
+    # Output of another PDF, and an output of an output: neither belongs to book
+    touch(tmp_path, "other_split_1_1-2.pdf", "book_split_1_1-2_split_1_1-1.pdf")
+
+    plan = plan_resplit("book", str(tmp_path), [(0, 1), (2, 2), (3, 3), (4, 5)])
+    assert plan["keep"] == [(0, kept)]
+    assert plan["rename"] == [(3, moved, str(tmp_path / get_output_filename("book", 3, 4, 5)))]
+    assert plan["write"] == [(1, 2, 2), (2, 3, 3)]
+    assert plan["stale"] == [gone]
+
+
+def test_plan_resplit_removes_extra_copies_of_a_range(tmp_path):
+    right, extra = touch(tmp_path, "book_split_1_1-2.pdf", "book_split_4_1-2.pdf")
+    plan = plan_resplit("book", str(tmp_path), [(0, 1)])
+    assert plan["keep"] == [(0, right)]
+    assert plan["stale"] == [extra]
+
+
+def test_resplit_only_writes_new_ranges(make_pdf, tmp_path):
+    pdf_path = make_pdf("book.pdf", 6)
+    output_dir = str(tmp_path / "out")
+    splitter = PDFSplitter(pdf_path, output_dir)
+    try:
+        splitter.split_pdf({2, 4})
+        output_paths, plan = splitter.resplit({4})
+    finally:
+        splitter.close()
+    assert plan["write"] == [(0, 0, 3)]
+    assert plan["rename"] == [(1, os.path.join(output_dir, "book_split_3_5-6.pdf"), output_paths[1])]
+    assert sorted(os.listdir(output_dir)) == ["book_split_1_1-4.pdf", "book_split_2_5-6.pdf"]
+    assert pdf_texts(output_paths[0]) == [page_text(n) for n in range(4)]
+
+
+def test_merge_chain_takes_the_fewest_ranges():
+    assert merge_chain([(0, 1), (2, 3), (0, 3), (4, 5)]) == [(0, 3), (4, 5)]
+    assert merge_chain([(4, 5), (0, 1), (2, 3)]) == [(0, 1), (2, 3), (4, 5)]
+
+
+def test_merge_chain_with_a_gap():
+    assert merge_chain([(0, 1), (3, 5)]) is None
+    assert merge_chain([(1, 3)]) is None
+    assert merge_chain([]) is None
+
+
+def test_merge_split_outputs_rebuilds_the_source(make_pdf, tmp_path):
+    pdf_path = make_pdf("book.pdf", 6)
+    output_dir = str(tmp_path / "out")
+    splitter = PDFSplitter(pdf_path, output_dir)
+    try:
+        splitter.split_pdf({2, 4})
+        splitter.split_pdf({3})
+    finally:
+        splitter.close()
+
+    merged_path, chain = merge_split_outputs("book", output_dir, str(tmp_path / "merged.pdf"))
+    assert chain == [(0, 2), (3, 5)]
+    assert pdf_texts(merged_path) == [page_text(n) for n in range(6)]
+    assert not os.path.exists(merged_path + ".merging")
+
+
+def test_merge_split_outputs_with_a_gap(make_pdf, tmp_path):
+    pdf_path = make_pdf("book.pdf", 6)
+    output_dir = str(tmp_path / "out")
+    splitter = PDFSplitter(pdf_path, output_dir)
+    try:
+        output_paths = splitter.split_pdf({2, 4})
+    finally:
+        splitter.close()
+    os.remove(output_paths[1])
+    with pytest.raises(ValueError):
+        merge_split_outputs("book", output_dir)
+    assert not os.path.exists(os.path.join(output_dir, "book.pdf"))
@@ -0,0 +1,110 @@
+import random
+import re
+import pytest
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from pdf_core.text_cleaning import clean_text_for_excel
+
+
+def clean_text_four_pass(text):
+    # The clean_text_for_excel that text_cleaning replaced; the default mode must match it
+    text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f]', '', text)
+    text = text.encode('ascii', 'replace').decode('ascii')
+    text = re.sub(r'(?m)^=', "'=", text)
+    text = ''.join(char for char in text if char.isprintable() or char in '\n\t')
+    return text
+
+
+def clean_text_per_character(text):
+    # keep_unicode spelled out one character at a time
+    text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f]', '', text)
+    text = ''.join(char if char.isprintable() or char in '\n\t\r' else ' ' if char.isspace() else ''
+                   for char in text)
+    text = re.sub(r'(?m)^=', "'=", text)
+    return text.replace('\r', '')
+
+
+# Characters the cleaning treats differently: controls around line breaks, '=' at line
+# starts, Latin-1, Vietnamese, separators, format characters, surrogates and astral
+ALPHABET = (
+    [chr(c) for c in range(0, 128)] * 3 + list("\n\n\r\t====") +
+    [chr(c) for c in range(0x80, 0x100)] + list("ạảấầẩẫậắằẳẵặẹẻẽếềểễệỉịọỏốồổỗộớờởỡợụủứừửữựỳỵỷỹđ") +
+    ["\u00a0", "\u2028", "\u3000", "\u200b", "\ufeff", "\ufffe", "\ud800", "\U0001f600", "\U000e0001"]
+)
+
+EDGE_CASES = ["", "=", "==", "\n=", "\r\n=", "\n\r=", "\x01=", "\n\x01=", "é=", "a\n\n=b\n=c",
+              "\n\u200b=", "\n\u00a0="]
+
+
+def random_texts(count=5000, seed=0, max_length=60):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, max_length))) for _ in range(count)]
+
+
+def is_cell_safe(text):
+    return ILLEGAL_CHARACTERS_RE.search(text) is None and all(c.isprintable() or c in "\n\t" for c in text)
+
+
+@pytest.mark.parametrize("keep_unicode", [False, True])
+def test_control_characters_are_removed(keep_unicode):
+    assert clean_text_for_excel("a\x00b\x07c\x0bd\x0ce\x1bf\x7fg", keep_unicode) == "abcdefg"
+
+
+@pytest.mark.parametrize("keep_unicode", [False, True])
+def test_line_breaks_and_tabs_are_kept_and_carriage_returns_dropped(keep_unicode):
+    assert clean_text_for_excel("a\r\nb\tc\n", keep_unicode) == "a\nb\tc\n"
+
+
+@pytest.mark.parametrize("keep_unicode", [False, True])
+def test_formulas_at_line_starts_are_quoted(keep_unicode):
+    assert clean_text_for_excel("=SUM(A1)\nx = 1\n=A2", keep_unicode) == "'=SUM(A1)\nx = 1\n'=A2"
+    # Control characters go first, so '=' behind one is quoted; '\r' goes after the quoting,
+    # so '=' behind "\n\r" is not
+    assert clean_text_for_excel("\x01=A1", keep_unicode) == "'=A1"
+    assert clean_text_for_excel("a\n\r=A1", keep_unicode) == "a\n=A1"
+
+
+def test_non_ascii_is_replaced():
+    assert clean_text_for_excel("Điều 1. café – ok") == "?i?u 1. caf? ? ok"
+
+
+def test_non_ascii_is_kept_with_keep_unicode():
+    assert clean_text_for_excel("Điều 1. café – ok", keep_unicode=True) == "Điều 1. café – ok"
+    assert clean_text_for_excel("=Điều\n=é", keep_unicode=True) == "'=Điều\n'=é"
+
+
+def test_keep_unicode_drops_what_a_cell_cannot_hold():
+    # Zero-width space and BOM (format), a noncharacter and a lone surrogate are dropped,
+    # other separators become spaces
+    assert clean_text_for_excel("\u00e9\u200bx\ufeffy\ufffez\ud800!", keep_unicode=True) == "\u00e9xyz!"
+    assert clean_text_for_excel("\u00e9\u00a0x\u2028y", keep_unicode=True) == "\u00e9 x y"
+
+
+@pytest.mark.parametrize("template", ["{c}", "a{c}b", "{c}=x", "x\n{c}=y", "é{c}\n=z"])
+def test_every_character_matches_the_reference(template):
+    # All of Latin-1, which holds every ASCII and C1 control, plus the odd cases above it
+    for code in list(range(0x100)) + [0x2028, 0x200b, 0xfeff, 0xfffe, 0xd800, 0x1f600, 0xe0001]:
+        text = template.format(c=chr(code))
+        assert clean_text_for_excel(text) == clean_text_four_pass(text), text
+        assert clean_text_for_excel(text, keep_unicode=True) == clean_text_per_character(text), text
+
+
+def test_random_text_matches_the_four_pass_function():
+    for text in random_texts() + EDGE_CASES:
+        expected = clean_text_four_pass(text)
+        assert clean_text_for_excel(text) == expected, text
+        if text.isascii():
+            assert clean_text_for_excel(text, keep_unicode=True) == expected, text
+
+
+def test_random_text_keep_unicode_matches_the_per_character_version():
+    for text in random_texts(seed=1) + EDGE_CASES:
+        assert clean_text_for_excel(text, keep_unicode=True) == clean_text_per_character(text), text
+
+
+@pytest.mark.parametrize("keep_unicode", [False, True])
+def test_output_can_always_be_written_to_a_cell(keep_unicode):
+    # Every character openpyxl rejects is removed, as is anything else non-printable
+    illegal = "".join(chr(c) for c in range(0x20) if ILLEGAL_CHARACTERS_RE.match(chr(c)))
+    assert len(illegal) == 29
+    for text in random_texts(1000, seed=2) + [illegal, illegal + "é" + illegal]:
+        assert is_cell_safe(clean_text_for_excel(text, keep_unicode)), text